@@ -1,5 +1,6 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory, session # <-- Ensure 'session' is imported!
 import os
+import sys
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
@@ -7,23 +8,57 @@ from datetime import datetime, timedelta
 load_dotenv()
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from flask_mail import Mail, Message
+from flask_mail import Mail, Message, BadHeaderError
 import re
+import smtplib
 from PyPDF2 import PdfReader
 import string
 import random
-from sqlalchemy import func
-from flask import request, jsonify
+import json
+import hashlib
+import pickle
+import io
+import csv
+import base64
+import threading
+import time
+import uuid
+import shutil
+import multiprocessing
+import signal
+import zipfile
+import math
+import struct
+import click
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice, accumulate
+from array import array
+from contextlib import contextmanager
+from sqlalchemy import event, func, insert, update, and_, or_, tuple_
+from markupsafe import Markup, escape
+from functools import lru_cache
+from collections import Counter, OrderedDict
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.engine import Engine
+import sqlite3
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process file locks
+    fcntl = None
+from flask import request, jsonify, Response, stream_with_context
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import send_from_directory
 from sqlalchemy import join
 from sqlalchemy.orm import joinedload
-import spacy
 
 # ✅ NLP/ML imports
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, ENGLISH_STOP_WORDS
 from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+import numpy as np
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'secret123')
@@ -35,8 +70,40 @@ app.secret_key = os.getenv('SECRET_KEY', 'secret123')
 database_url = os.getenv('DATABASE_URL', 'sqlite:///instance/smarthire.db')
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Connection pool for PostgreSQL/MySQL, sized per gunicorn worker
+if not database_url.startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    }
+
+# SQLite: WAL lets readers run alongside the single writer, and busy_timeout makes
+# concurrent writers from other workers wait instead of failing with "database is locked"
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+
+@event.listens_for(Engine, "connect")
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+
+def include_in_autogenerate(obj, name, type_, reflected, compare_to):
+    # The candidate search table (and FTS5's shadow tables) is managed by hand in migration 0007
+    return not (type_ == 'table' and reflected and compare_to is None and name.startswith('resume_search'))
+
+migrate = Migrate(app, db, include_object=include_in_autogenerate)
 
 # -------------------- FOLDER DEFINITIONS (CLEANUP) --------------------
 # Define Python Variables for the folder paths once
@@ -53,16 +120,107 @@ def allowed_file(filename):
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['SCREENING_FOLDER'] = SCREENING_FOLDER
 
+# -------------------- UPLOAD LIMITS --------------------
+# Request bodies are capped before Werkzeug parses the form: MAX_CONTENT_LENGTH for every
+# request (also enforced while reading chunked bodies) and a tighter Content-Length cap per
+# upload route. Files are then streamed to disk in chunks while hashed, and rejected as soon
+# as their magic bytes or size are wrong, so memory stays flat whatever the upload size.
+RESUME_MAX_BYTES = int(os.getenv('RESUME_MAX_BYTES', 10 * 1024 * 1024))
+PHOTO_MAX_BYTES = int(os.getenv('PHOTO_MAX_BYTES', 5 * 1024 * 1024))
+BULK_UPLOAD_MAX_BYTES = int(os.getenv('BULK_UPLOAD_MAX_BYTES', 100 * 1024 * 1024))
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024  # Multipart boundaries and the other form fields
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Request size limit per endpoint
+UPLOAD_SIZE_LIMITS = {
+    'upload_resume': RESUME_MAX_BYTES,
+    'upload_screening': BULK_UPLOAD_MAX_BYTES,
+    'edit_profile': PHOTO_MAX_BYTES,
+}
+app.config['MAX_CONTENT_LENGTH'] = max(UPLOAD_SIZE_LIMITS.values()) + UPLOAD_FORM_OVERHEAD_BYTES
+
+# Magic bytes each accepted extension must start with
+FILE_SIGNATURES = {
+    'pdf': (b'%PDF-',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'gif': (b'GIF87a', b'GIF89a'),
+    'webp': (b'RIFF',),
+}
+
+def has_file_signature(head, extension):
+    """Check the first bytes of a file against the magic bytes of its extension."""
+    if extension == 'pdf':
+        # Readers accept the header anywhere in the first 1024 bytes
+        return b'%PDF-' in head[:1024]
+    if extension == 'webp' and head[8:12] != b'WEBP':
+        return False
+    return head.startswith(FILE_SIGNATURES.get(extension, ()))
+
+def save_upload(stream, filepath, max_bytes, extension):
+    """
+    Copy an uploaded file stream to filepath in UPLOAD_CHUNK_SIZE chunks and return its SHA-256.
+    Raises ValueError if the content does not match the extension or exceeds max_bytes; the
+    file is written under a temporary name first, so a rejected upload never replaces filepath.
+    """
+    head = stream.read(UPLOAD_CHUNK_SIZE)
+    if not has_file_signature(head, extension):
+        raise ValueError(f"The file is not a valid {extension.upper()} file.")
+
+    sha256 = hashlib.sha256()
+    size = 0
+    partial_path = filepath + '.part'
+    try:
+        with open(partial_path, 'wb') as f:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"The file is larger than {max_bytes // (1024 * 1024)} MB.")
+                sha256.update(chunk)
+                f.write(chunk)
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+        os.replace(partial_path, filepath)
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return sha256.hexdigest()
+
+@app.before_request
+def enforce_upload_size_limit():
+    """Reject oversized uploads from their Content-Length, before the body is read."""
+    limit = UPLOAD_SIZE_LIMITS.get(request.endpoint)
+    if limit is not None and (request.content_length or 0) > limit + UPLOAD_FORM_OVERHEAD_BYTES:
+        raise RequestEntityTooLarge()
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    limit = UPLOAD_SIZE_LIMITS.get(request.endpoint, app.config['MAX_CONTENT_LENGTH'])
+    flash(f"Upload too large. The limit is {limit // (1024 * 1024)} MB.", "error")
+    dashboards = {'employer': 'employer_dashboard', 'applicant': 'applicant_dashboard', 'admin': 'admin_dashboard'}
+    return redirect(url_for(dashboards.get(session.get('role'), 'login')))
+
 # -------------------- EMAIL CONFIGURATION --------------------
-# Email configuration (Update these with your email credentials)
+# Email configuration: set MAIL_USERNAME / MAIL_PASSWORD (and MAIL_DEFAULT_SENDER if it
+# differs from the username) in the environment; credentials are never kept in the code.
 # For Gmail: Use App Password (not regular password)
 # Enable 2-factor authentication and generate App Password
-app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-app.config['MAIL_PORT'] = 587
-app.config['MAIL_USE_TLS'] = True
-app.config['MAIL_USERNAME'] = 'caragutierrez.may14@gmail.com'  # ⚠️ UPDATE THIS with your email address
-app.config['MAIL_PASSWORD'] = 'hojmgyrwsajbmhre'      # ⚠️ UPDATE THIS with your Gmail App Password
-app.config['MAIL_DEFAULT_SENDER'] = 'caragutierrez.may14@gmail.com'  # ⚠️ UPDATE THIS with your email address
+app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', '587'))
+app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', '1') == '1'
+app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME', '')
+app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD', '')
+app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', app.config['MAIL_USERNAME'])
+
+# Emails are not sent inside the request: they are queued in the email_outbox table and
+# delivered by a background sender (see EMAIL OUTBOX). MAIL_TRANSPORT picks how they go out:
+#   - 'smtp' (default): one reused SMTP connection. For load runs point MAIL_SERVER/MAIL_PORT
+#     at a local SMTP stand-in (e.g. `python -m aiosmtpd -n -l localhost:1025`) with MAIL_USE_TLS=0
+#   - 'console': print each email instead of sending it
+#   - 'memory': keep the sent messages in the sent_emails list (tests)
+MAIL_TRANSPORT = os.getenv('MAIL_TRANSPORT', 'smtp')
 
 mail = Mail(app)
 
@@ -72,12 +230,11 @@ def generate_otp():
     return ''.join([str(random.randint(0, 9)) for _ in range(6)])
 
 def send_otp_email(email, otp):
-    """Send OTP to user's email"""
-    try:
-        msg = Message(
-            subject='SmartHire - Email Verification OTP',
-            recipients=[email],
-            body=f'''
+    """Queue the OTP email for the user (delivered in the background). Returns False if it could not be queued."""
+    return queue_email(
+        email,
+        subject='SmartHire - Email Verification OTP',
+        body=f'''
 Hello!
 
 Thank you for signing up with SmartHire!
@@ -90,8 +247,8 @@ If you didn't request this code, please ignore this email.
 
 Best regards,
 SmartHire Team
-            ''',
-            html=f'''
+        ''',
+        html=f'''
             <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <h2 style="color: #08106E;">SmartHire - Email Verification</h2>
                 <p>Hello!</p>
@@ -103,15 +260,14 @@ SmartHire Team
                 <p>If you didn't request this code, please ignore this email.</p>
                 <p style="margin-top: 30px;">Best regards,<br>SmartHire Team</p>
             </div>
-            '''
-        )
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        return False
+        '''
+    )
 
 # -------------------- DATABASE MODELS --------------------
+def prefix_index(name, column):
+    """Index on lower(column) that on PostgreSQL also serves prefix searches (text_pattern_ops)."""
+    return db.Index(name, func.lower(column).label(name), postgresql_ops={name: 'text_pattern_ops'})
+
 class User(db.Model):
     __tablename__ = 'User'
     id = db.Column(db.Integer, primary_key=True)
@@ -119,6 +275,9 @@ class User(db.Model):
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(50), nullable=False)
 
+    # Logins and sign-ups look usernames up case-insensitively
+    __table_args__ = (db.Index('ix_user_username_lower', func.lower(username)),)
+
 def is_hashed(password):
     # Detect if the password is already hashed (scrypt or pbkdf2)
     return password.startswith("scrypt:") or password.startswith("pbkdf2:")
@@ -147,6 +306,13 @@ class Job(db.Model):
     employer = db.relationship('Employer', backref='jobs')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_job_status_created_at', func.lower(status), created_at),
+        db.Index('ix_job_employer_id', employer_id),
+        prefix_index('ix_job_title_lower', title),
+        prefix_index('ix_job_company_lower', company),
+    )
+
 
 # --- Applicant Model (Removed incorrect Job linkage) ---
 class Applicant(db.Model):
@@ -163,6 +329,11 @@ class Applicant(db.Model):
     resume_filename = db.Column(db.String(255))
     photo_filename = db.Column(db.String(255))
     # 2. ENSURE INDENTATION IS CONSISTENT HERE
+
+    __table_args__ = (
+        prefix_index('ix_applicant_email_lower', email),
+        prefix_index('ix_applicant_fullname_lower', fullname),
+    )
     
     @property
     def photo_url(self):
@@ -193,6 +364,9 @@ class Application(db.Model):
     status = db.Column(db.String(50), default='Submitted')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # One application per applicant and job; apply_job relies on this
+    __table_args__ = (db.Index('uq_application_applicant_job', applicant_id, job_id, unique=True),)
+
 class Employer(db.Model):
     __tablename__ = 'employer' # Or 'Employer', match your database if it exists
     id = db.Column(db.Integer, primary_key=True)
@@ -205,6 +379,12 @@ class Employer(db.Model):
     phone = db.Column(db.String(20), nullable=True)
     website = db.Column(db.String(100), nullable=True)
 
+    __table_args__ = (
+        prefix_index('ix_employer_email_lower', email),
+        prefix_index('ix_employer_fullname_lower', fullname),
+        prefix_index('ix_employer_company_lower', company),
+    )
+
     def __repr__(self):
         return f"<Employer {self.company}>"
 
@@ -214,10 +394,16 @@ class Resume(db.Model):
     filename = db.Column(db.String(255), nullable=False) 
     owner_name = db.Column(db.String(255), nullable=False)
     applicant_id = db.Column(db.Integer, db.ForeignKey('applicant.user_id'), nullable=True)  # Connect to Applicant
-    uploaded_at = db.Column(db.DateTime, default=func.now())
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship to Applicant
     applicant = db.relationship('Applicant', foreign_keys=[applicant_id], backref='resumes')
+
+    __table_args__ = (
+        db.Index('ix_resume_applicant_id', applicant_id),
+        prefix_index('ix_resume_owner_name_lower', owner_name),
+        prefix_index('ix_resume_filename_lower', filename),
+    )
     
     def __repr__(self):
         return f"<Resume id={self.id} owner='{self.owner_name}' applicant_id={self.applicant_id}>"
@@ -241,6 +427,11 @@ class Screening(db.Model):
     
     # Resume Text Summary (first 500 chars for quick reference)
     resume_text_summary = db.Column(db.Text, nullable=True)
+
+    # Memoization key: the same resume content against the same job text and scoring version is not re-scored
+    resume_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the resume file
+    job_version = db.Column(db.String(40), nullable=True)  # Content version of job_description_text
+    scoring_version = db.Column(db.String(20), nullable=True)  # SCORING_MODEL_VERSION that produced the score
     
     # Timestamps
     screened_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -249,10 +440,121 @@ class Screening(db.Model):
     resume = db.relationship('Resume', backref='screenings')
     job = db.relationship('Job', backref='screenings')
     employer = db.relationship('Employer', backref='screenings')
+
+    __table_args__ = (
+        db.Index('ix_screening_employer_screened_at', employer_id, screened_at),
+        # One screening per employer, job and resume content (rows from before memoization have no hash)
+        db.Index('uq_screening_employer_job_resume', employer_id, job_id, resume_hash, unique=True),
+    )
     
     def __repr__(self):
         return f"<Screening id={self.id} applicant='{self.applicant_name}' score={self.match_score}%>"
 
+class JobVector(db.Model):
+    """Normalized text and TF-IDF vector of a job, recomputed only when the job text or model changes."""
+    __tablename__ = 'job_vector'
+    job_id = db.Column(db.Integer, db.ForeignKey('Job.id'), primary_key=True)
+    content_version = db.Column(db.String(40), nullable=False)  # SHA-1 of normalized_text
+    model_version = db.Column(db.String(32), nullable=True)  # TF-IDF model the vector belongs to
+    normalized_text = db.Column(db.Text, nullable=False)
+    vector = db.Column(db.LargeBinary, nullable=True)  # 1 x V CSR matrix serialized with scipy.sparse.save_npz
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    job = db.relationship('Job', backref=db.backref('vector', uselist=False, cascade='all, delete-orphan'))
+
+    def load_vector(self):
+        """Deserialize the stored sparse vector"""
+        if self.vector is None:
+            return None
+        return sparse.load_npz(io.BytesIO(self.vector))
+
+    def __repr__(self):
+        return f"<JobVector job_id={self.job_id} version={self.content_version[:8]} model={self.model_version}>"
+
+class JobSkill(db.Model):
+    """Inverted index of taxonomy skills/professions mentioned by each job (skill -> job IDs)."""
+    __tablename__ = 'job_skill'
+    job_id = db.Column(db.Integer, db.ForeignKey('Job.id'), primary_key=True)
+    skill = db.Column(db.String(255), primary_key=True)
+
+    job = db.relationship('Job', backref=db.backref('skill_index', cascade='all, delete-orphan'))
+
+    __table_args__ = (db.Index('ix_job_skill_skill', 'skill', 'job_id'),)
+
+class ResumeBlob(db.Model):
+    """A resume file stored once as <content_hash>.pdf in RESUME_BLOB_FOLDER, shared by every upload of the same bytes."""
+    __tablename__ = 'resume_blob'
+    content_hash = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # Resume rows and queued screening uploads using it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ResumeBlob {self.content_hash[:12]} refs={self.ref_count}>"
+
+class ResumeText(db.Model):
+    """Extracted resume text, cached by the SHA-256 hash of the PDF bytes."""
+    __tablename__ = 'resume_text'
+    content_hash = db.Column(db.String(64), primary_key=True)
+    text = db.Column(db.Text, nullable=False)
+    pages = db.Column(db.Text, nullable=False)  # JSON list with the text of each page
+    page_count = db.Column(db.Integer, default=0)
+    extracted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def page_texts(self):
+        """Per-page text as a Python list"""
+        return json.loads(self.pages or "[]")
+
+    def __repr__(self):
+        return f"<ResumeText {self.content_hash[:12]} pages={self.page_count}>"
+
+class ScreeningTask(db.Model):
+    """A queued screening run. Workers claim queued tasks and store the result page data as JSON."""
+    __tablename__ = 'screening_task'
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    employer_id = db.Column(db.Integer, db.ForeignKey('employer.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('Job.id'), nullable=True)
+    job_description_text = db.Column(db.Text, nullable=True)  # Pasted description when no job is selected
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'), nullable=True)  # Screening an existing resume
+    upload_filename = db.Column(db.String(255), nullable=True)  # Or an uploaded file (blob filename)
+    upload_filenames = db.Column(db.Text, nullable=True)  # Or a bulk upload as JSON {blob filename: uploaded name}
+    screening_id = db.Column(db.Integer, db.ForeignKey('screening.id'), nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON context for ai_resume_result.html (per-file results for bulk uploads)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.Index('ix_screening_task_status_id', status, id),)
+
+    def __repr__(self):
+        return f"<ScreeningTask id={self.id} status={self.status}>"
+
+class OutboxEmail(db.Model):
+    """An email waiting to be sent. The background sender claims queued rows and retries failures with backoff."""
+    __tablename__ = 'email_outbox'
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, sending, sent, failed
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=True)  # Cleared once sent (OTP codes should not outlive delivery)
+    html = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32), nullable=True)  # Set by the sender that claimed the row
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.Index('ix_email_outbox_status_next_attempt', status, next_attempt_at),)
+
+    def __repr__(self):
+        return f"<OutboxEmail id={self.id} to='{self.recipient}' status={self.status}>"
+
 # -------------------- FILE FOLDERS --------------------
 # Define the base directory of the current script (app.py)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -268,6 +570,171 @@ os.makedirs(SCREENING_FOLDER, exist_ok=True)
 # Update Flask configuration (if not already done later in the code)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# -------------------- RESUME FILE STORAGE --------------------
+# Uploaded resumes are stored once per content: the file is named after its SHA-256
+# (<hash>.pdf in RESUME_BLOB_FOLDER) and Resume.filename points at it. ResumeBlob counts
+# the references (Resume rows and uploads still queued for screening), and the file is
+# removed with the last one. The hash in the name also keys the ResumeText cache.
+# Files uploaded before this layout keep their names until `flask dedupe-resume-files`.
+RESUME_BLOB_FOLDER = os.path.join(BASE_DIR, "static", "resume_blobs")
+os.makedirs(RESUME_BLOB_FOLDER, exist_ok=True)
+BLOB_FILENAME_PATTERN = re.compile(r'^([0-9a-f]{64})\.pdf$')
+
+def blob_content_hash(filename):
+    """The content hash of a blob filename, or None for files stored under their upload name."""
+    match = BLOB_FILENAME_PATTERN.match(filename or '')
+    return match.group(1) if match else None
+
+def resume_directory(filename):
+    """Folder holding a resume file: blobs, employer screening uploads (screen_*) or applicant uploads."""
+    if blob_content_hash(filename):
+        return RESUME_BLOB_FOLDER
+    if filename.startswith('screen_'):
+        return SCREENING_FOLDER
+    return app.config['UPLOAD_FOLDER']
+
+def resolve_resume_path(filename):
+    """Full path of a resume file named by Resume.filename."""
+    return os.path.join(resume_directory(filename), filename)
+
+def remove_file_after_commit(filepath):
+    """Delete a file once the current transaction commits (kept if it rolls back)."""
+    db.session.info.setdefault('remove_after_commit', set()).add(filepath)
+
+@event.listens_for(db.session, "after_commit")
+def _remove_released_files(session):
+    if session.in_nested_transaction():
+        return  # A savepoint was released; wait for the real commit
+    for filepath in session.info.pop('remove_after_commit', ()):
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[ERROR] Could not remove {filepath}: {e}")
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _keep_released_files(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('remove_after_commit', None)
+
+def retain_resume_blob(content_hash, size):
+    """Add one reference to a blob, creating its row on first use."""
+    # Released earlier in this transaction: the file is in use again
+    db.session.info.get('remove_after_commit', set()).discard(os.path.join(RESUME_BLOB_FOLDER, f"{content_hash}.pdf"))
+    updated = ResumeBlob.query.filter_by(content_hash=content_hash).update(
+        {'ref_count': ResumeBlob.ref_count + 1}, synchronize_session=False
+    )
+    if updated:
+        return
+    try:
+        # Savepoint: a concurrent upload of the same file may create the row meanwhile
+        with db.session.begin_nested():
+            db.session.add(ResumeBlob(content_hash=content_hash, size=size, ref_count=1))
+    except IntegrityError:
+        ResumeBlob.query.filter_by(content_hash=content_hash).update(
+            {'ref_count': ResumeBlob.ref_count + 1}, synchronize_session=False
+        )
+
+def store_resume_blob(stream, max_bytes):
+    """
+    Stream an uploaded PDF into the blob store and return its blob filename, holding one
+    new reference for the caller. Identical content reuses the stored file.
+    Raises ValueError like save_upload() for files that are not PDFs or too large.
+    """
+    incoming_path = os.path.join(RESUME_BLOB_FOLDER, f"incoming_{uuid.uuid4().hex}")
+    content_hash = save_upload(stream, incoming_path, max_bytes, 'pdf')
+    size = os.path.getsize(incoming_path)
+    retain_resume_blob(content_hash, size)
+    filename = f"{content_hash}.pdf"
+    # Same bytes, so replacing an existing copy is harmless and avoids racing a delete
+    os.replace(incoming_path, os.path.join(RESUME_BLOB_FOLDER, filename))
+    return filename
+
+def release_resume_blob(filename):
+    """
+    Drop one reference to a resume file; the file is deleted once nothing uses it, after
+    the transaction commits (a failed delete keeps both the row and its file).
+    """
+    content_hash = blob_content_hash(filename)
+    if content_hash is None:
+        # Files stored under their upload name belong to a single resume
+        remove_file_after_commit(resolve_resume_path(filename))
+        return
+
+    ResumeBlob.query.filter_by(content_hash=content_hash).update(
+        {'ref_count': ResumeBlob.ref_count - 1}, synchronize_session=False
+    )
+    unused = ResumeBlob.query.filter(
+        ResumeBlob.content_hash == content_hash, ResumeBlob.ref_count <= 0
+    ).delete(synchronize_session=False)
+    if unused:
+        remove_file_after_commit(os.path.join(RESUME_BLOB_FOLDER, filename))
+
+def discard_unreferenced_blob(filename):
+    """After a rollback dropped a new reference, remove the stored file if nothing else uses it."""
+    content_hash = blob_content_hash(filename)
+    filepath = os.path.join(RESUME_BLOB_FOLDER, filename)
+    if content_hash and db.session.get(ResumeBlob, content_hash) is None and os.path.exists(filepath):
+        os.remove(filepath)
+
+@app.cli.command("dedupe-resume-files")
+def dedupe_resume_files_command():
+    """Move resume files stored under their upload names into the blob store and recount references."""
+    moved = {}  # old filename -> blob filename
+
+    def to_blob(filename):
+        if not filename or blob_content_hash(filename) or filename in moved:
+            return moved.get(filename, filename)
+        filepath = resolve_resume_path(filename)
+        if not os.path.exists(filepath):
+            print(f"[WARN] Resume file not found: {filename}")
+            return filename
+        blob_filename = f"{file_content_hash(filepath)}.pdf"
+        blob_path = os.path.join(RESUME_BLOB_FOLDER, blob_filename)
+        if not os.path.exists(blob_path):
+            shutil.copyfile(filepath, blob_path)
+        moved[filename] = blob_filename
+        return blob_filename
+
+    for resume in Resume.query.all():
+        resume.filename = to_blob(resume.filename)
+    for applicant in Applicant.query.filter(Applicant.resume_filename.isnot(None)):
+        applicant.resume_filename = to_blob(applicant.resume_filename)
+
+    # Recount references from the rows that use each blob
+    refs = Counter(filename for (filename,) in db.session.query(Resume.filename) if blob_content_hash(filename))
+    for task in ScreeningTask.query.filter(ScreeningTask.status.in_(['queued', 'running'])):
+        refs.update(filename for filename in task_upload_filenames(task) if blob_content_hash(filename))
+    ResumeBlob.query.filter(ResumeBlob.content_hash.not_in([blob_content_hash(f) for f in refs])).delete(synchronize_session=False)
+    for filename, count in refs.items():
+        blob_path = os.path.join(RESUME_BLOB_FOLDER, filename)
+        if not os.path.exists(blob_path):
+            continue
+        blob = db.session.get(ResumeBlob, blob_content_hash(filename))
+        if blob is None:
+            blob = ResumeBlob(content_hash=blob_content_hash(filename), size=os.path.getsize(blob_path))
+            db.session.add(blob)
+        blob.ref_count = count
+    db.session.commit()
+
+    # Only now that the rows point at the blobs are the old copies (and unused blobs) deleted
+    freed = 0
+    for filename in moved:
+        filepath = resolve_resume_path(filename)
+        if os.path.exists(filepath):
+            freed += os.path.getsize(filepath)
+            os.remove(filepath)
+    for filename in os.listdir(RESUME_BLOB_FOLDER):
+        filepath = os.path.join(RESUME_BLOB_FOLDER, filename)
+        stale_upload = filename.startswith('incoming_') and time.time() - os.path.getmtime(filepath) > 3600
+        if stale_upload or (blob_content_hash(filename) and filename not in refs):
+            os.remove(filepath)
+    stored = sum(os.path.getsize(os.path.join(RESUME_BLOB_FOLDER, filename)) for filename in refs
+                 if os.path.exists(os.path.join(RESUME_BLOB_FOLDER, filename)))
+    print(f"[OK] Moved {len(moved)} resume file(s) into {len(refs)} blob(s): removed {freed / 1024:.0f} KB of old copies, "
+          f"blob store holds {stored / 1024:.0f} KB")
+
 # -------------------- SKILL KEYWORDS --------------------
 # app.py: Replace the list with this (Expanded list)
 SKILL_KEYWORDS = [
@@ -292,6 +759,401 @@ PROFESSIONS = [
     "accountant", "auditor", "bookeeper", "architect"
     # Add other common titles here
 ]
+
+class KeywordMatcher:
+    """
+    Finds every keyword of a list in a single pass over the text.
+    The keywords are compiled once into one regex shaped like a trie (shared
+    prefixes are factored out), so the cost per position depends on keyword
+    length rather than on how many keywords there are. At each position the
+    longest keyword wins. A space inside a keyword also matches hyphens and
+    line breaks ("machine-learning", "rest\napi").
+    """
+
+    def __init__(self, keywords, whole_words=True):
+        self.keywords = list(dict.fromkeys(k.strip().lower() for k in keywords if k.strip()))
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        body = self._trie_to_regex(trie) or '(?!)'
+        if whole_words:
+            # Lookarounds instead of \b so keywords like "c++" and "c#" match too
+            body = rf"(?<!\w)(?:{body})(?!\w)"
+        self.pattern = re.compile(body, re.IGNORECASE)
+
+    @classmethod
+    def _trie_to_regex(cls, node):
+        branches = []
+        for char, child in sorted(node.items()):
+            if char == '':
+                continue
+            char_regex = r"[\s\-]+" if char == ' ' else re.escape(char)
+            branches.append(char_regex + cls._trie_to_regex(child))
+        if not branches:
+            return ''
+        if '' in node:
+            return '(?:' + '|'.join(branches) + ')?'
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    @staticmethod
+    def normalize(matched_text):
+        return re.sub(r"[\s\-]+", " ", matched_text.lower())
+
+    def finditer(self, text):
+        """Yield (start, end, keyword) for every non-overlapping match"""
+        for match in self.pattern.finditer(text):
+            yield match.start(), match.end(), self.normalize(match.group())
+
+    def find_all(self, text):
+        """Matched keywords, in order of first appearance"""
+        return list(dict.fromkeys(keyword for _, _, keyword in self.finditer(text)))
+
+    def __len__(self):
+        return len(self.keywords)
+
+# -------------------- SKILL TAXONOMY --------------------
+# The skill/profession taxonomy lives in a CSV file (term,kind,aliases with aliases
+# separated by "|", e.g. "kubernetes,skill,k8s"). It is compiled into KeywordMatchers
+# once per worker and hot-reloaded in the background when the file changes, so the
+# file can be edited without restarting gunicorn. SKILL_KEYWORDS / PROFESSIONS above
+# are only the fallback when the file is missing.
+SKILL_TAXONOMY_PATH = os.getenv('SKILL_TAXONOMY_PATH', os.path.join(BASE_DIR, "data", "skill_taxonomy.csv"))
+TAXONOMY_RELOAD_CHECK_SECONDS = 30
+
+class SkillTaxonomy:
+    """In-memory index of canonical skills/professions and their aliases."""
+
+    def __init__(self, skills, professions):
+        # skills / professions: {canonical term: [aliases]}
+        self.skills = skills
+        self.professions = professions
+        self.canonical = {}
+        for terms in (skills, professions):
+            for term, aliases in terms.items():
+                for alias in [term] + aliases:
+                    self.canonical.setdefault(KeywordMatcher.normalize(alias), term)
+        self.skill_matcher = KeywordMatcher(self._all_terms(skills))
+        # Professions keep substring semantics ("engineer" in "engineering")
+        self.profession_matcher = KeywordMatcher(self._all_terms(professions), whole_words=False)
+
+    @staticmethod
+    def _all_terms(terms):
+        return [alias for term, aliases in terms.items() for alias in [term] + aliases]
+
+    @classmethod
+    def from_csv(cls, path):
+        skills, professions = {}, {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                term = (row.get('term') or '').strip().lower()
+                if not term:
+                    continue
+                aliases = [a.strip().lower() for a in (row.get('aliases') or '').split('|') if a.strip()]
+                target = professions if (row.get('kind') or '').strip().lower() == 'profession' else skills
+                target.setdefault(term, []).extend(aliases)
+        return cls(skills, professions)
+
+    @classmethod
+    def builtin(cls):
+        return cls({skill: [] for skill in SKILL_KEYWORDS}, {prof: [] for prof in PROFESSIONS})
+
+    def _canonical_matches(self, matcher, text):
+        return list(dict.fromkeys(self.canonical.get(keyword, keyword) for _, _, keyword in matcher.finditer(text)))
+
+    def match_skills(self, text):
+        """Canonical skills found in the text (aliases resolved), in order of appearance"""
+        return self._canonical_matches(self.skill_matcher, text)
+
+    def match_professions(self, text):
+        return self._canonical_matches(self.profession_matcher, text)
+
+    def terms_for(self, term):
+        """A canonical term together with all of its aliases"""
+        aliases = self.skills.get(term, self.professions.get(term, []))
+        return [term] + aliases
+
+    def __len__(self):
+        return len(self.skills) + len(self.professions)
+
+_taxonomy_state = {'taxonomy': None, 'mtime': None, 'checked_at': 0.0, 'reloading': False}
+_taxonomy_lock = threading.Lock()
+
+def load_skill_taxonomy():
+    """Build the taxonomy index from SKILL_TAXONOMY_PATH (or the built-in lists)."""
+    if os.path.exists(SKILL_TAXONOMY_PATH):
+        mtime = os.path.getmtime(SKILL_TAXONOMY_PATH)
+        taxonomy = SkillTaxonomy.from_csv(SKILL_TAXONOMY_PATH)
+    else:
+        mtime = None
+        taxonomy = SkillTaxonomy.builtin()
+    with _taxonomy_lock:
+        _taxonomy_state['taxonomy'] = taxonomy
+        _taxonomy_state['mtime'] = mtime
+    return taxonomy
+
+def _reload_taxonomy_in_background():
+    """Recompile a changed taxonomy while the current index keeps serving requests."""
+    def run():
+        try:
+            taxonomy = load_skill_taxonomy()
+            print(f"[OK] Skill taxonomy reloaded: {len(taxonomy)} terms")
+        except Exception as e:
+            print(f"[ERROR] Skill taxonomy reload failed: {e}")
+        finally:
+            _taxonomy_state['reloading'] = False
+
+    with _taxonomy_lock:
+        if _taxonomy_state['reloading']:
+            return
+        _taxonomy_state['reloading'] = True
+    threading.Thread(target=run, name="taxonomy-reload", daemon=True).start()
+
+def get_skill_taxonomy():
+    """Return the compiled taxonomy, picking up edits to the taxonomy file."""
+    taxonomy = _taxonomy_state['taxonomy']
+    if taxonomy is None:
+        return load_skill_taxonomy()
+
+    now = time.time()
+    if now - _taxonomy_state['checked_at'] >= TAXONOMY_RELOAD_CHECK_SECONDS:
+        _taxonomy_state['checked_at'] = now
+        mtime = os.path.getmtime(SKILL_TAXONOMY_PATH) if os.path.exists(SKILL_TAXONOMY_PATH) else None
+        if mtime != _taxonomy_state['mtime']:
+            _reload_taxonomy_in_background()
+    return taxonomy
+# -------------------- JOB SKILL INDEX --------------------
+MATCHED_JOBS_LIMIT = 10
+
+def extract_job_skills(job):
+    """Taxonomy skills and professions mentioned in a job's title, company and description"""
+    taxonomy = get_skill_taxonomy()
+    job_text = f"{job.title} {job.company} {job.description}"
+    return set(taxonomy.match_skills(job_text)) | set(taxonomy.match_professions(job_text.lower()))
+
+def index_job_skills(job):
+    """Replace the JobSkill rows of a job. The caller commits."""
+    JobSkill.query.filter_by(job_id=job.id).delete(synchronize_session=False)
+    db.session.add_all(JobSkill(job_id=job.id, skill=skill) for skill in extract_job_skills(job))
+
+def find_matching_jobs(skills, limit=MATCHED_JOBS_LIMIT):
+    """Jobs sharing the most skills with the given list, best first, from the skill index"""
+    skills = {skill.lower() for skill in skills}
+    if not skills:
+        return []
+
+    hits = func.count(JobSkill.skill).label('hits')
+    ranked = db.session.query(JobSkill.job_id, hits).\
+        filter(JobSkill.skill.in_(skills)).\
+        group_by(JobSkill.job_id).\
+        order_by(hits.desc(), JobSkill.job_id.desc()).\
+        limit(limit).all()
+
+    jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in ranked]))}
+    return [jobs_by_id[job_id] for job_id, _ in ranked if job_id in jobs_by_id]
+
+@app.cli.command("reindex-jobs")
+def reindex_jobs_command():
+    """Rebuild the job skill index (e.g. after editing the skill taxonomy)."""
+    count = 0
+    for job in Job.query.yield_per(500):
+        index_job_skills(job)
+        count += 1
+    db.session.commit()
+    print(f"Indexed skills for {count} jobs.")
+
+# -------------------- JOB RECOMMENDATIONS --------------------
+RECOMMENDATION_LIMIT = 10
+RECOMMENDATION_MIN_SCORE = 5.0  # Match % from which a recommended job counts as a "match"
+RECOMMENDATION_CACHE_SIZE = int(os.getenv('RECOMMENDATION_CACHE_SIZE', 2048))  # Applicants per worker
+JOB_VECTOR_INLINE_REFRESH = 100  # More stale approved jobs than this are re-vectorized in the background
+
+_approved_job_matrix = {'key': None, 'model': None, 'job_ids': [], 'matrix': None}
+_recommendation_cache = OrderedDict()  # applicant user_id -> (cache key, [(job_id, score)]), least recent first
+_recommendation_lock = threading.Lock()
+
+def is_approved_job():
+    return func.lower(Job.status) == 'approved'
+
+def approved_jobs_version():
+    """Cheap fingerprint of the approved job set; changes when a job is approved, edited or removed"""
+    return tuple(db.session.query(
+        func.count(Job.id), func.coalesce(func.sum(Job.id), 0), func.max(JobVector.updated_at)
+    ).outerjoin(JobVector, JobVector.job_id == Job.id).filter(is_approved_job()).one())
+
+def get_approved_job_matrix(model, jobs_version):
+    """
+    Stack the stored vectors of all approved jobs into one sparse matrix (one row per job).
+    Rebuilt only when the approved job set or the TF-IDF model changes. Returns
+    (matrix model, job_ids, matrix): after a refit the previous model's matrix is served
+    until the job vectors have been refreshed in the background.
+    """
+    key = (model.version, jobs_version)
+    if _approved_job_matrix['key'] != key:
+        # Jobs created before vectors were stored, or not yet re-vectorized after a refit
+        stale_ids = [job_id for (job_id,) in db.session.query(Job.id).
+                     outerjoin(JobVector, JobVector.job_id == Job.id).
+                     filter(is_approved_job(), stale_job_vector_filter(model)).
+                     limit(JOB_VECTOR_INLINE_REFRESH + 1)]
+        if len(stale_ids) > JOB_VECTOR_INLINE_REFRESH:
+            _refresh_job_vectors_in_background(model)
+            if _approved_job_matrix['model'] is not None:
+                return _approved_job_matrix['model'], _approved_job_matrix['job_ids'], _approved_job_matrix['matrix']
+            # Nothing to serve yet in this worker: rank the jobs already refreshed
+        elif stale_ids:
+            for job in Job.query.filter(Job.id.in_(stale_ids)):
+                refresh_job_vector(job, model)
+            db.session.commit()
+            key = (model.version, approved_jobs_version())
+
+        job_ids, vectors = [], []
+        rows = db.session.query(Job.id, JobVector.vector).\
+            join(JobVector, JobVector.job_id == Job.id).\
+            filter(is_approved_job(), JobVector.model_version == model.version, JobVector.vector.isnot(None)).\
+            order_by(Job.id).yield_per(1000)
+        for job_id, vector in rows:
+            job_ids.append(job_id)
+            vectors.append(sparse.load_npz(io.BytesIO(vector)))
+        matrix = sparse.vstack(vectors).tocsr() if vectors else None
+        _approved_job_matrix.update(key=key, model=model, job_ids=job_ids, matrix=matrix)
+    return _approved_job_matrix['model'], _approved_job_matrix['job_ids'], _approved_job_matrix['matrix']
+
+def recommend_jobs(applicant, limit=RECOMMENDATION_LIMIT):
+    """
+    Top approved jobs for an applicant as [(job, score)], scored against their resume
+    text, skills and target job using the precomputed job vectors. Results are cached
+    per applicant until their resume/profile, the approved job set or the model changes.
+    """
+    model = get_tfidf_model()
+    if model is None:
+        return []
+
+    resume_text, resume_hash = "", None
+    if applicant.resume_filename:
+        resume_path = resolve_resume_path(applicant.resume_filename)
+        if os.path.exists(resume_path):
+            resume_hash = blob_content_hash(applicant.resume_filename) or file_content_hash(resume_path)
+            resume_text = get_resume_text(resume_path, content_hash=resume_hash)
+
+    skills = applicant.skills if applicant.skills and applicant.skills != "N/A" else ""
+    profile_text = "\n".join(part for part in (applicant.target_job, skills, resume_text) if part)
+    if not profile_text.strip():
+        return []
+
+    jobs_version = approved_jobs_version()
+    cache_key = (resume_hash, skills, applicant.target_job, jobs_version, model.version, limit)
+    with _recommendation_lock:
+        cached = _recommendation_cache.get(applicant.user_id)
+        if cached:
+            _recommendation_cache.move_to_end(applicant.user_id)
+    if cached and cached[0] == cache_key:
+        ranked = cached[1]
+    else:
+        matrix_model, job_ids, matrix = get_approved_job_matrix(model, jobs_version)
+        ranked = []
+        if job_ids:
+            profile_vector = matrix_model.transform([clean_text(profile_text)])
+            scores = (matrix @ profile_vector.T).toarray().ravel()
+            k = min(limit, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            ranked = [(job_ids[i], round(float(scores[i]) * 100, 2)) for i in top if scores[i] > 0]
+        with _recommendation_lock:
+            _recommendation_cache[applicant.user_id] = (cache_key, ranked)
+            _recommendation_cache.move_to_end(applicant.user_id)
+            while len(_recommendation_cache) > RECOMMENDATION_CACHE_SIZE:
+                _recommendation_cache.popitem(last=False)
+
+    jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in ranked]))}
+    return [(jobs_by_id[job_id], score) for job_id, score in ranked if job_id in jobs_by_id]
+
+# -------------------- DASHBOARD COUNTERS --------------------
+# Dashboard stat cards are SQL COUNTs cached per scope ("global" or ("employer", id))
+# for COUNTER_TTL_SECONDS. Inserts/deletes of the counted models drop the affected
+# scopes right away; the TTL only bounds staleness across workers.
+COUNTER_TTL_SECONDS = int(os.getenv("COUNTER_TTL_SECONDS", "60"))
+GLOBAL_SCOPE = "global"
+
+_counter_cache = {}
+_counter_lock = threading.Lock()
+_counter_generation = [0]
+
+def cached_counts(scope, compute):
+    """Return compute() for scope, reusing a cached result younger than the TTL."""
+    now = time.monotonic()
+    with _counter_lock:
+        entry = _counter_cache.get(scope)
+        if entry and now - entry[0] < COUNTER_TTL_SECONDS:
+            return entry[1]
+        generation = _counter_generation[0]
+
+    counts = compute()
+    with _counter_lock:
+        # Skip storing if an invalidation ran while we were counting
+        if _counter_generation[0] == generation:
+            _counter_cache[scope] = (now, counts)
+    return counts
+
+def invalidate_counters(*scopes):
+    """Drop the given scopes, or every scope when called without arguments."""
+    with _counter_lock:
+        _counter_generation[0] += 1
+        if not scopes:
+            _counter_cache.clear()
+        for scope in scopes:
+            _counter_cache.pop(scope, None)
+
+def employer_counts(employer):
+    def compute():
+        return {
+            "uploaded_resumes": employer_resumes_query(employer).count(),
+            "screened_resumes": Screening.query.filter_by(employer_id=employer.id).count(),
+            "job_posts": Job.query.filter_by(employer_id=employer.id).count(),
+            "shortlisted": Screening.query.filter(
+                Screening.employer_id == employer.id, Screening.match_score > SHORTLIST_MIN_SCORE
+            ).count()
+        }
+    return cached_counts(("employer", employer.id), compute)
+
+def global_counts():
+    def compute():
+        jobs_by_status = dict(
+            db.session.query(func.lower(Job.status), func.count(Job.id)).group_by(func.lower(Job.status)).all()
+        )
+        return {
+            "applicants": db.session.query(func.count(Applicant.id)).scalar(),
+            "employers": db.session.query(func.count(Employer.id)).scalar(),
+            "jobs": jobs_by_status.get("approved", 0) + jobs_by_status.get("pending", 0),
+            "resumes": db.session.query(func.count(Resume.id)).scalar(),
+        }
+    return cached_counts(GLOBAL_SCOPE, compute)
+
+@event.listens_for(Job, "after_insert")
+@event.listens_for(Job, "after_update")
+@event.listens_for(Job, "after_delete")
+@event.listens_for(Screening, "after_insert")
+@event.listens_for(Screening, "after_update")  # screen_resume() refreshes stale rows in place
+@event.listens_for(Screening, "after_delete")
+def _invalidate_employer_counters(mapper, connection, target):
+    invalidate_counters(("employer", target.employer_id), GLOBAL_SCOPE)
+
+# A resume or application can move the "uploaded resumes" count of any employer
+@event.listens_for(Resume, "after_insert")
+@event.listens_for(Resume, "after_delete")
+@event.listens_for(Application, "after_insert")
+@event.listens_for(Application, "after_delete")
+@event.listens_for(Applicant, "after_insert")
+@event.listens_for(Applicant, "after_delete")
+@event.listens_for(Employer, "after_insert")
+@event.listens_for(Employer, "after_delete")
+def _invalidate_all_counters(mapper, connection, target):
+    invalidate_counters()
+
 # -------------------- AUTH --------------------
 
 @app.route("/")
@@ -527,33 +1389,432 @@ def employer_dashboard():
         flash("Employer profile not found.", "error")
         return redirect(url_for("login"))
 
-    # Fetches jobs posted by this employer
-    jobs_list = Job.query.filter_by(employer_id=employer.id).order_by(Job.created_at.desc()).all()
-
-    resumes_list = Resume.query.all()
-    # Load job and employer relationships for screenings - filter by current employer
-    screenings_list = Screening.query.options(
-        joinedload(Screening.job),
-        joinedload(Screening.employer)
-    ).filter_by(employer_id=employer.id).order_by(Screening.screened_at.desc()).all()
-
-    stats = {
-        "uploaded_resumes": len(resumes_list),
-        "screened_resumes": len(screenings_list),
-        "job_posts": len(jobs_list)
-    }
+    # Lists are fetched page by page from the /api/employer/* endpoints; only counts are loaded here
+    stats = employer_counts(employer)
 
     return render_template(
         "employer_dashboard.html",
         employer=employer,
-        jobs=jobs_list,
-        resumes=resumes_list,
-        screenings=screenings_list,
         stats=stats,
-        shortlisted=[],
+        shortlist_min_score=SHORTLIST_MIN_SCORE,
+        page_size=DEFAULT_PAGE_SIZE,
         interviews=[]
     )
 
+# -------------------- EMPLOYER DASHBOARD API --------------------
+# Keyset-paginated JSON lists behind the employer dashboard. Each response is
+# {"items": [...], "next_cursor": "..."}; pass next_cursor back as ?after= for the
+# next page. Pages are found with an indexed (sort value, id) comparison instead of
+# OFFSET, so page N costs the same as page 1.
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+SHORTLIST_MIN_SCORE = 80
+EPOCH = datetime(1970, 1, 1)
+
+def encode_cursor(value, row_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, parse_value=None):
+    """Return (value, id) from an ?after= cursor, or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (parse_value(value) if parse_value else value), int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+def page_size_arg():
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def keyset_page(query, id_column, sort_expression, descending, serialize, parse_value=None):
+    """
+    Fetch one page of `query` ordered by (sort_expression, id) and serialize it.
+    sort_expression must never be NULL (wrap nullable columns in func.coalesce).
+    """
+    limit = page_size_arg()
+    after = decode_cursor(request.args.get('after'), parse_value)
+    if after is not None:
+        key = tuple_(sort_expression, id_column)
+        query = query.filter(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(sort_expression.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_expression.asc(), id_column.asc())
+
+    rows = query.add_columns(sort_expression).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_value = rows[-1]
+        next_cursor = encode_cursor(last_value, last.id)
+    return jsonify({'items': [serialize(row) for row, _ in rows], 'next_cursor': next_cursor})
+
+def parse_datetime(value):
+    return datetime.fromisoformat(value)
+
+def current_employer():
+    if 'user_id' not in session or session.get('role') != 'employer':
+        return None
+    return Employer.query.filter_by(user_id=session['user_id']).first()
+
+def employer_resume_sources(employer):
+    """(user ids of applicants to this employer's jobs, IDs of resumes this employer has screened) as subqueries"""
+    applicant_ids = db.session.query(Application.applicant_id).\
+        join(Job, Job.id == Application.job_id).filter(Job.employer_id == employer.id)
+    screened_resume_ids = db.session.query(Screening.resume_id).filter(Screening.employer_id == employer.id)
+    return applicant_ids, screened_resume_ids
+
+def employer_resumes_query(employer):
+    """Resumes of applicants to this employer's jobs, plus resumes this employer has screened"""
+    applicant_ids, screened_resume_ids = employer_resume_sources(employer)
+    return Resume.query.filter(or_(Resume.applicant_id.in_(applicant_ids), Resume.id.in_(screened_resume_ids)))
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'company': job.company,
+        'location': job.location,
+        'job_type': job.job_type,
+        'status': job.status,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'edit_url': url_for('edit_job', job_id=job.id),
+        'delete_url': url_for('delete_job', job_id=job.id),
+        'screen_all_url': url_for('screen_all_resumes', job_id=job.id),
+    }
+
+def serialize_resume(resume):
+    return {
+        'id': resume.id,
+        'owner_name': resume.owner_name,
+        'filename': resume.filename,
+        'applicant_id': resume.applicant_id,
+        'uploaded_at': resume.uploaded_at.isoformat() if resume.uploaded_at else None,
+        'download_url': url_for('download_resume', filename=resume.filename),
+        'delete_url': url_for('delete_resume', resume_id=resume.id),
+    }
+
+def serialize_screening(screening):
+    return {
+        'id': screening.id,
+        'resume_id': screening.resume_id,
+        'job_id': screening.job_id,
+        'job_title': screening.job.title if screening.job else None,
+        'applicant_name': screening.applicant_name,
+        'applicant_email': screening.applicant_email,
+        'applicant_phone': screening.applicant_phone,
+        'matched_skills': screening.matched_skills,
+        'match_score': screening.match_score,
+        'screened_at': screening.screened_at.isoformat() if screening.screened_at else None,
+        'delete_url': url_for('delete_screening', screening_id=screening.id),
+    }
+
+@app.route("/api/employer/jobs")
+def employer_jobs_api():
+    """Jobs of the logged-in employer. Filters: q (title/company), status. sort: newest|oldest|title"""
+    employer = current_employer()
+    if not employer:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    query = Job.query.filter(Job.employer_id == employer.id)
+    q = request.args.get('q', '').strip()
+    if q:
+        pattern = f"%{q}%"
+        query = query.filter(or_(Job.title.ilike(pattern), Job.company.ilike(pattern)))
+    status = request.args.get('status', '').strip()
+    if status:
+        query = query.filter(func.lower(Job.status) == status.lower())
+
+    sort = request.args.get('sort', 'newest')
+    if sort == 'title':
+        return keyset_page(query, Job.id, Job.title, False, serialize_job)
+    created_at = func.coalesce(Job.created_at, EPOCH)
+    return keyset_page(query, Job.id, created_at, sort != 'oldest', serialize_job, parse_datetime)
+
+@app.route("/api/employer/resumes")
+def employer_resumes_api():
+    """Resumes visible to the employer. Filters: q (owner/file name), source (applicant|screening). sort: newest|name"""
+    employer = current_employer()
+    if not employer:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    query = employer_resumes_query(employer)
+    q = request.args.get('q', '').strip()
+    if q:
+        pattern = f"%{q}%"
+        query = query.filter(or_(Resume.owner_name.ilike(pattern), Resume.filename.ilike(pattern)))
+    source = request.args.get('source', '')
+    if source == 'applicant':
+        query = query.filter(Resume.applicant_id.isnot(None))
+    elif source == 'screening':
+        query = query.filter(Resume.applicant_id.is_(None))
+
+    if request.args.get('sort') == 'name':
+        return keyset_page(query, Resume.id, Resume.owner_name, False, serialize_resume)
+    uploaded_at = func.coalesce(Resume.uploaded_at, EPOCH)
+    return keyset_page(query, Resume.id, uploaded_at, True, serialize_resume, parse_datetime)
+
+@app.route("/api/employer/screenings")
+def employer_screenings_api():
+    """Screenings done by the employer. Filters: q (applicant/skills), job_id, min_score. sort: newest|score"""
+    employer = current_employer()
+    if not employer:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    query = Screening.query.options(joinedload(Screening.job)).filter(Screening.employer_id == employer.id)
+    q = request.args.get('q', '').strip()
+    if q:
+        pattern = f"%{q}%"
+        query = query.filter(or_(
+            Screening.applicant_name.ilike(pattern),
+            Screening.applicant_email.ilike(pattern),
+            Screening.matched_skills.ilike(pattern)
+        ))
+    job_id = request.args.get('job_id', type=int)
+    if job_id:
+        query = query.filter(Screening.job_id == job_id)
+    min_score = request.args.get('min_score', type=float)
+    if min_score is not None:
+        query = query.filter(Screening.match_score > min_score)
+
+    if request.args.get('sort') == 'score':
+        match_score = func.coalesce(Screening.match_score, -1.0)
+        return keyset_page(query, Screening.id, match_score, True, serialize_screening)
+    screened_at = func.coalesce(Screening.screened_at, EPOCH)
+    return keyset_page(query, Screening.id, screened_at, True, serialize_screening, parse_datetime)
+
+# -------------------- CANDIDATE SEARCH --------------------
+# Full-text search over resume text, applicant skills and screening matched skills with
+# the database's own engine. The resume_search table (migration 0007, or
+# `flask rebuild-search-index`) holds one row per resume:
+#   - SQLite: an FTS5 table (rowid = resume id, porter stemming) ranked with bm25()
+#   - PostgreSQL: a weighted tsvector column with a GIN index, ranked with ts_rank_cd()
+# Rows are refreshed in the same transaction as the change, from a session after_flush
+# hook, whenever a resume, its applicant's skills, its screenings or its extracted text
+# change. Bulk statements bypass the session, so their callers refresh the resumes themselves.
+SEARCH_MAX_TERMS = 10
+SEARCH_SNIPPET_WORDS = 16
+SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 1.0)  # owner_name, skills, matched_skills, body
+SEARCH_HIGHLIGHT = ('\x02', '\x03')  # Snippet match markers, turned into <mark> after escaping
+
+RESUME_SEARCH_DDL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS resume_search USING fts5("
+        "owner_name, skills, matched_skills, body, tokenize='porter unicode61')",
+    ],
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS resume_search ("
+        "resume_id INTEGER PRIMARY KEY, owner_name TEXT, skills TEXT, matched_skills TEXT, body TEXT, "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(owner_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(skills, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(matched_skills, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(body, '')), 'C')) STORED)",
+        "CREATE INDEX IF NOT EXISTS ix_resume_search_document ON resume_search USING GIN (document)",
+    ],
+}
+
+# Lightweight handle for building queries: rowid on SQLite, resume_id/document on PostgreSQL
+resume_search = db.table('resume_search', *[db.column(name) for name in (
+    'rowid', 'resume_id', 'owner_name', 'skills', 'matched_skills', 'body', 'document')])
+
+_search_index_ready = {}
+
+def search_id_column(connection):
+    return 'rowid' if connection.dialect.name == 'sqlite' else 'resume_id'
+
+def search_index_ready(connection):
+    """True if this database supports candidate search and has the resume_search table."""
+    key = str(connection.engine.url)
+    if key not in _search_index_ready:
+        ready = connection.dialect.name in RESUME_SEARCH_DDL and db.inspect(connection).has_table('resume_search')
+        if not ready:
+            print("[WARN] Candidate search is off: resume_search table missing (run `flask db upgrade`)")
+        _search_index_ready[key] = ready
+    return _search_index_ready[key]
+
+def create_resume_search_table(connection):
+    for statement in RESUME_SEARCH_DDL.get(connection.dialect.name, []):
+        connection.execute(db.text(statement))
+    _search_index_ready.pop(str(connection.engine.url), None)
+
+def refresh_resume_search(connection, resume_ids):
+    """Rewrite the resume_search rows of these resumes from the current data (deleted resumes drop out)."""
+    resume_ids = sorted({resume_id for resume_id in resume_ids if resume_id})
+    if not resume_ids or not search_index_ready(connection):
+        return
+    id_column = search_id_column(connection)
+    connection.execute(db.text(f"DELETE FROM resume_search WHERE {id_column} IN :ids").bindparams(
+        db.bindparam('ids', expanding=True)), {'ids': resume_ids})
+
+    resumes = connection.execute(
+        db.select(Resume.id, Resume.filename, Resume.owner_name, Applicant.skills)
+        .outerjoin(Applicant, Applicant.user_id == Resume.applicant_id)
+        .where(Resume.id.in_(resume_ids))
+    ).all()
+    if not resumes:
+        return
+    matched = {}
+    for resume_id, skills in connection.execute(
+        db.select(Screening.resume_id, Screening.matched_skills).where(Screening.resume_id.in_(resume_ids))
+    ):
+        matched.setdefault(resume_id, {}).update(dict.fromkeys(skill for skill in (skills or "").split(", ") if skill))
+    hashes = {resume.id: resume_content_hash(resume.filename) for resume in resumes}
+    texts = dict(connection.execute(
+        db.select(ResumeText.content_hash, ResumeText.text).where(ResumeText.content_hash.in_(set(hashes.values())))
+    ).all())
+
+    connection.execute(
+        db.text(f"INSERT INTO resume_search ({id_column}, owner_name, skills, matched_skills, body) "
+                "VALUES (:resume_id, :owner_name, :skills, :matched_skills, :body)"),
+        [{
+            'resume_id': resume.id,
+            'owner_name': resume.owner_name,
+            'skills': resume.skills or "",
+            'matched_skills': ", ".join(matched.get(resume.id, ())),
+            'body': texts.get(hashes[resume.id], ""),
+        } for resume in resumes]
+    )
+
+@event.listens_for(db.session, "after_flush")
+def _refresh_changed_resume_search(session, flush_context):
+    resume_ids, applicant_ids, content_hashes = set(), set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Resume):
+            resume_ids.add(obj.id)
+        elif isinstance(obj, Screening):
+            resume_ids.add(obj.resume_id)
+        elif isinstance(obj, ResumeText) and obj in session.new:
+            content_hashes.add(obj.content_hash)
+        elif isinstance(obj, Applicant):
+            state = db.inspect(obj)
+            if state.attrs.skills.history.has_changes() or state.attrs.fullname.history.has_changes():
+                applicant_ids.add(obj.user_id)
+    if not (resume_ids or applicant_ids or content_hashes):
+        return
+
+    connection = session.connection()
+    if not search_index_ready(connection):
+        return
+    if applicant_ids or content_hashes:
+        resume_ids.update(connection.execute(db.select(Resume.id).where(or_(
+            Resume.applicant_id.in_(list(applicant_ids)),
+            Resume.filename.in_([f"{content_hash}.pdf" for content_hash in content_hashes])
+        ))).scalars())
+    refresh_resume_search(connection, resume_ids)
+
+def search_terms(q):
+    """Words of a search box query (letters and digits only, so they are safe in either query syntax)."""
+    return re.findall(r"[^\W_]+", q.lower())[:SEARCH_MAX_TERMS]
+
+def snippet_html(snippet):
+    """Escape a snippet from the database and turn its match markers into <mark> tags."""
+    start, stop = SEARCH_HIGHLIGHT
+    return str(escape(snippet or "")).replace(start, "<mark>").replace(stop, "</mark>")
+
+def resume_search_clauses(dialect, terms):
+    """(resume id, rank where lower is better, match condition, snippet) expressions for the backend."""
+    start, stop = SEARCH_HIGHLIGHT
+    if dialect == 'sqlite':
+        # Every word must match; the last one also as a prefix, so results follow the typing
+        fts_query = " ".join(f'"{term}"' for term in terms) + "*"
+        table = db.literal_column('resume_search')
+        return (
+            # rowid + 0 keeps "IN (...)" filters out of the FTS5 table, which would otherwise
+            # run the whole full-text query once per listed id
+            resume_search.c.rowid + 0,
+            func.bm25(table, *SEARCH_WEIGHTS),
+            table.op('MATCH')(fts_query),
+            func.snippet(table, -1, start, stop, '…', SEARCH_SNIPPET_WORDS),
+        )
+    ts_query = func.to_tsquery('english', " & ".join(terms) + ":*")
+    searched_text = func.concat_ws(' … ', resume_search.c.skills, resume_search.c.matched_skills, resume_search.c.body)
+    return (
+        resume_search.c.resume_id,
+        -func.ts_rank_cd(resume_search.c.document, ts_query),
+        resume_search.c.document.op('@@')(ts_query),
+        func.ts_headline('english', searched_text, ts_query,
+                         f'StartSel={start}, StopSel={stop}, MaxFragments=2, MaxWords={SEARCH_SNIPPET_WORDS}, MinWords=5'),
+    )
+
+@app.route("/api/employer/resumes/search")
+def employer_resume_search_api():
+    """
+    Full-text candidate search over the resumes visible to the employer. q: words to find
+    (all must match, the last one as a prefix). Best matches first, with a highlighted
+    snippet; paginated with ?after= cursors like the other lists.
+    """
+    employer = current_employer()
+    if not employer:
+        return jsonify({'error': 'Unauthorized'}), 401
+    terms = search_terms(request.args.get('q', ''))
+    if not terms:
+        return jsonify({'items': [], 'next_cursor': None})
+    connection = db.session.connection()
+    if not search_index_ready(connection):
+        return jsonify({'error': 'Candidate search is not available on this database.'}), 503
+
+    resume_id, rank, matches, snippet = resume_search_clauses(connection.dialect.name, terms)
+    # Same resumes as employer_resumes_query, as two id lists (cheaper than scanning resume)
+    applicant_ids, screened_resume_ids = employer_resume_sources(employer)
+    visible = or_(resume_id.in_(screened_resume_ids),
+                  resume_id.in_(db.select(Resume.id).where(Resume.applicant_id.in_(applicant_ids))))
+    hits = db.select(resume_id.label('resume_id'), rank.label('rank')).where(matches, visible).subquery()
+
+    # Rank (and id for ties) is the keyset, so the next page starts right after the last hit
+    limit = page_size_arg()
+    page = db.select(hits.c.resume_id, hits.c.rank)
+    after = decode_cursor(request.args.get('after'), float)
+    if after is not None:
+        page = page.where(tuple_(hits.c.rank, hits.c.resume_id) > after)
+    rows = db.session.execute(page.order_by(hits.c.rank, hits.c.resume_id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].resume_id)
+
+    # Snippets are only built for the hits on this page
+    page_ids = [row.resume_id for row in rows]
+    snippets = dict(db.session.execute(
+        db.select(resume_id, snippet).where(matches, resume_id.in_(page_ids))
+    ).all()) if page_ids else {}
+    resumes = {resume.id: resume for resume in Resume.query.filter(Resume.id.in_(page_ids))}
+    items = [
+        dict(serialize_resume(resumes[row.resume_id]), score=round(-row.rank, 4),
+             snippet_html=snippet_html(snippets.get(row.resume_id)))
+        for row in rows if row.resume_id in resumes
+    ]
+    return jsonify({'items': items, 'next_cursor': next_cursor})
+
+@app.cli.command("rebuild-search-index")
+@click.option("--batch-size", default=500, show_default=True, help="Resumes indexed per transaction.")
+def rebuild_search_index_command(batch_size):
+    """Create the candidate search table if needed and index every resume (extracting missing texts)."""
+    create_resume_search_table(db.session.connection())
+    db.session.commit()
+    if not search_index_ready(db.session.connection()):
+        print(f"[ERROR] Candidate search is not supported on {db.engine.dialect.name}")
+        return
+    indexed, last_id = 0, 0
+    while True:
+        resumes = Resume.query.filter(Resume.id > last_id).order_by(Resume.id).limit(batch_size).all()
+        if not resumes:
+            break
+        for resume in resumes:
+            filepath = resolve_resume_path(resume.filename)
+            if os.path.exists(filepath):
+                get_resume_text(filepath, content_hash=resume_content_hash(resume.filename))
+        db.session.flush()
+        refresh_resume_search(db.session.connection(), [resume.id for resume in resumes])
+        db.session.commit()
+        indexed += len(resumes)
+        last_id = resumes[-1].id
+    print(f"[OK] Indexed {indexed} resume(s) for candidate search")
+
 @app.route('/dashboard')
 @app.route('/applicant-dashboard')
 def applicant_dashboard():
@@ -579,15 +1840,24 @@ def applicant_dashboard():
         all()
     
     # 3. Calculate Stats
-    # Note: 'matches' logic requires the TFIDF/Cosine Similarity logic you've set up
-    jobs = Job.query.filter_by(status='Approved').order_by(Job.created_at.desc()).limit(10).all()
+    # Recommended jobs (TF-IDF against precomputed job vectors); latest approved jobs as fallback
+    try:
+        recommendations = recommend_jobs(applicant)
+    except Exception as e:
+        print(f"[ERROR] Job recommendation failed: {e}")
+        recommendations = []
+
+    if recommendations:
+        jobs = [job for job, _ in recommendations]
+    else:
+        jobs = Job.query.filter(is_approved_job()).order_by(Job.created_at.desc()).limit(10).all()
+    match_scores = {job.id: score for job, score in recommendations}
 
     # Prepare data for template
     applied_job_ids = {app.job_id for app in applications}
     num_interviews = Application.query.filter_by(applicant_id=applicant.user_id, status='Interview').count()
     
-    # Placeholder for a real ML match count
-    num_matches = 0 
+    num_matches = sum(1 for _, score in recommendations if score >= RECOMMENDATION_MIN_SCORE)
     
     # Calculate Profile Completion (simple logic for the progress bar)
     profile_score = 0
@@ -600,6 +1870,7 @@ def applicant_dashboard():
     return render_template('applicant_dashboard.html',
         applicant=applicant,
         jobs=jobs,
+        match_scores=match_scores,
         applications=applications, # Now efficiently loaded
         applied_job_ids=applied_job_ids,
         interviews=range(num_interviews),
@@ -609,45 +1880,165 @@ def applicant_dashboard():
 
 @app.route("/dashboard/admin")
 def admin_dashboard():
-    # Retrieve all records from the database
-    applicants_list = Applicant.query.all()
-    employers_list = Employer.query.all()
-    
-    # New: Fetch all resume objects
-    all_resumes = Resume.query.all() 
-
-    approved_jobs = Job.query.filter_by(status='approved').all()
-    pending_jobs = Job.query.filter_by(status='pending').all()
+    # Listings are fetched page by page from the /api/admin/* endpoints; only counts are loaded here
+    return render_template('admin_dashboard.html',
+                           stats=global_counts(),
+                           page_size=DEFAULT_PAGE_SIZE)
+
+# -------------------- ADMIN DASHBOARD API --------------------
+# Paginated, searchable listings for the admin dashboard, using the same keyset
+# cursors as the employer API. Search is a case-insensitive prefix match on
+# lower(column), so it can use the lower() indexes instead of scanning the table.
+# The /export endpoints stream every matching row as CSV without loading the table.
+ADMIN_EXPORT_BATCH_SIZE = 500
+
+def is_admin():
+    return session.get('role') == 'admin'
+
+def prefix_upper_bound(prefix):
+    """The smallest string after every string starting with prefix, or None if there is none."""
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        following = 0xE000  # Surrogates cannot be encoded
+    return prefix[:-1] + chr(following)
+
+def prefix_search(query, columns):
+    """
+    Keep rows where one of columns starts with ?q= (case-insensitive), written so the
+    lower(column) indexes serve it. SQLite never uses its (case-sensitive) indexes for
+    LIKE, so there it is the equivalent range. PostgreSQL turns LIKE 'abc%' into a range
+    on its text_pattern_ops indexes itself (a plain range would follow the collation).
+    """
+    q = request.args.get('q', '').strip().lower()
+    if not q:
+        return query
+    if db.engine.dialect.name != 'sqlite':
+        pattern = q.replace('/', '//').replace('%', '/%').replace('_', '/_') + '%'
+        return query.filter(or_(*[func.lower(column).like(pattern, escape='/') for column in columns]))
+    upper = prefix_upper_bound(q)
+    return query.filter(or_(*[
+        and_(func.lower(column) >= q, func.lower(column) < upper) if upper else func.lower(column) >= q
+        for column in columns
+    ]))
+
+def serialize_applicant(applicant):
+    return {
+        'id': applicant.id,
+        'fullname': applicant.fullname,
+        'email': applicant.email,
+        'skills': applicant.skills,
+        'experience': applicant.experience,
+        'target_job': applicant.target_job,
+    }
 
-    # Combine approved + pending for the dashboard detailed records table
-    all_jobs = approved_jobs + pending_jobs
+def serialize_employer(employer):
+    return {
+        'id': employer.id,
+        'fullname': employer.fullname,
+        'email': employer.email,
+        'company': employer.company,
+    }
 
-    # Calculate count for the Resume stat card
-    resume_count = len(all_resumes) 
+def serialize_admin_job(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'company': job.company,
+        'location': job.location,
+        'status': job.status,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'approve_url': url_for('approve_job', job_id=job.id),
+        'archive_url': url_for('archive_job', job_id=job.id),
+    }
 
-    # 🚨 CRITICAL DEBUGGING CHECK 🚨
-    print("-" * 50)
-    print(f"DEBUG: Applicants found: {len(applicants_list)}")
-    print(f"DEBUG: Employers found: {len(employers_list)}")
-    print(f"DEBUG: Jobs found: {len(all_jobs)}")
-    print(f"DEBUG: Resume count: {resume_count}")
-    print("-" * 50)
+def serialize_admin_resume(resume):
+    return {
+        'id': resume.id,
+        'filename': resume.filename,
+        'owner_name': resume.owner_name,
+        'applicant_id': resume.applicant_id,
+        'uploaded_at': resume.uploaded_at.isoformat() if resume.uploaded_at else None,
+    }
 
-    # Pass all necessary lists to the template
-    return render_template('admin_dashboard.html',
-                           applicants_list=applicants_list,
-                           employers_list=employers_list,
-                           approved_jobs=approved_jobs,
-                           pending_jobs=pending_jobs,
-                           all_jobs=all_jobs,
-                           resume_count=resume_count,
-                           all_resumes=all_resumes) # <--- MUST BE PASSED HERE
+def admin_listing(kind):
+    """(query, id column, {sort name: (expression, descending, parse_value)}, serializer) for a listing"""
+    if kind == 'applicants':
+        query = prefix_search(Applicant.query, [Applicant.fullname, Applicant.email])
+        sorts = {'name': (Applicant.fullname, False, None), 'newest': (Applicant.id, True, int)}
+        return query, Applicant.id, sorts, serialize_applicant
+    if kind == 'employers':
+        query = prefix_search(Employer.query, [Employer.fullname, Employer.email, Employer.company])
+        sorts = {'name': (Employer.fullname, False, None), 'newest': (Employer.id, True, int)}
+        return query, Employer.id, sorts, serialize_employer
+    if kind == 'jobs':
+        query = prefix_search(Job.query, [Job.title, Job.company])
+        status = request.args.get('status', '').strip().lower()
+        if status:
+            query = query.filter(func.lower(Job.status) == status)
+        else:
+            query = query.filter(func.lower(Job.status).in_(['approved', 'pending']))
+        sorts = {'newest': (func.coalesce(Job.created_at, EPOCH), True, parse_datetime),
+                 'title': (Job.title, False, None)}
+        return query, Job.id, sorts, serialize_admin_job
+    if kind == 'resumes':
+        query = prefix_search(Resume.query, [Resume.owner_name, Resume.filename])
+        sorts = {'newest': (func.coalesce(Resume.uploaded_at, EPOCH), True, parse_datetime),
+                 'name': (Resume.owner_name, False, None)}
+        return query, Resume.id, sorts, serialize_admin_resume
+    return None
+
+@app.route("/api/admin/<kind>")
+def admin_list_api(kind):
+    """One page of applicants|employers|jobs|resumes. Filters: q (prefix), status (jobs). sort: see admin_listing"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 401
+    listing = admin_listing(kind)
+    if listing is None:
+        return jsonify({'error': f'Unknown listing: {kind}'}), 404
+
+    query, id_column, sorts, serialize = listing
+    default_sort = next(iter(sorts))
+    sort_expression, descending, parse_value = sorts.get(request.args.get('sort', default_sort), sorts[default_sort])
+    return keyset_page(query, id_column, sort_expression, descending, serialize, parse_value)
+
+@app.route("/api/admin/<kind>/export")
+def admin_export_api(kind):
+    """Stream every matching row of a listing as CSV, fetched in batches of ADMIN_EXPORT_BATCH_SIZE"""
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 401
+    listing = admin_listing(kind)
+    if listing is None:
+        return jsonify({'error': f'Unknown listing: {kind}'}), 404
+
+    query, id_column, _, serialize = listing
+    statement = query.order_by(id_column).statement.execution_options(yield_per=ADMIN_EXPORT_BATCH_SIZE)
+
+    def generate():
+        buffer = io.StringIO()
+        writer = None
+        for record in db.session.execute(statement).scalars():
+            item = {key: value for key, value in serialize(record).items() if not key.endswith('_url')}
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(item))
+                writer.writeheader()
+            writer.writerow(item)
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={kind}.csv'})
 
 # -------------------- RESUMES --------------------
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    """Serve uploaded resumes from UPLOAD_FOLDER"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    """Serve uploaded resumes (and profile photos) from their storage folder"""
+    return send_from_directory(resume_directory(filename), filename)
 
 @app.route('/upload-resume', methods=['POST'])
 def upload_resume():
@@ -676,47 +2067,44 @@ def upload_resume():
         
         if file.filename != '' and allowed_file(file.filename):
             
-            # 2a. Save file to server (KEEP)
-            base_filename = secure_filename(file.filename)
-            # Use the applicant's ID for a unique name (as in your current code)
-            filename = f"{applicant_user_id}_{base_filename}" 
-            
-            upload_dir = app.config['UPLOAD_FOLDER']
-            if not os.path.exists(upload_dir):
-                os.makedirs(upload_dir)
-
-            filepath = os.path.join(upload_dir, filename)
-            file.save(filepath)
-            
-            # 2b. Update the main Applicant profile record (KEEP)
-            applicant.resume_filename = filename
-
-            # 2c. 🌟 SAVE TO RESUME TABLE - Connected to Applicant 🌟
+            # 2a. Save file to server, named by its content so re-uploads share one copy
             try:
-                # Check if resume already exists for this applicant (update instead of duplicate)
-                existing_resume = Resume.query.filter_by(applicant_id=applicant.user_id).first()
+                filename = store_resume_blob(file.stream, RESUME_MAX_BYTES)
+            except ValueError as e:
+                flash(f"Resume was not uploaded: {e}", "error")
+            else:
+                # 2b. Update the main Applicant profile record (KEEP)
+                applicant.resume_filename = filename
+                # Extract the text now (cached by content) so the resume is searchable right away
+                get_resume_text(resolve_resume_path(filename), content_hash=blob_content_hash(filename))
+
+                # 2c. 🌟 SAVE TO RESUME TABLE - Connected to Applicant 🌟
+                try:
+                    # Check if resume already exists for this applicant (update instead of duplicate)
+                    existing_resume = Resume.query.filter_by(applicant_id=applicant.user_id).first()
                 
-                if existing_resume:
-                    # Update existing resume record
-                    existing_resume.filename = filename
-                    existing_resume.owner_name = applicant.fullname
-                    existing_resume.uploaded_at = datetime.utcnow()
-                    print(f"[OK] Updated existing resume record: ID={existing_resume.id}, Applicant ID={applicant.user_id}")
-                else:
-                    # Create new resume record - Connected to Applicant
-                    new_resume = Resume(
-                        owner_name=applicant.fullname,  # Applicant's name
-                        filename=filename,  # Resume file name
-                        applicant_id=applicant.user_id,  # 🌟 Connect to Applicant via user_id
-                        uploaded_at=datetime.utcnow()  # Upload timestamp
-                    )
-                    db.session.add(new_resume)
-                    print(f"[OK] Created new resume record: Applicant ID={applicant.user_id}, Filename={filename}")
+                    if existing_resume:
+                        # Update existing resume record; the replaced file goes with its last reference
+                        release_resume_blob(existing_resume.filename)
+                        existing_resume.filename = filename
+                        existing_resume.owner_name = applicant.fullname
+                        existing_resume.uploaded_at = datetime.utcnow()
+                        print(f"[OK] Updated existing resume record: ID={existing_resume.id}, Applicant ID={applicant.user_id}")
+                    else:
+                        # Create new resume record - Connected to Applicant
+                        new_resume = Resume(
+                            owner_name=applicant.fullname,  # Applicant's name
+                            filename=filename,  # Resume file name
+                            applicant_id=applicant.user_id,  # 🌟 Connect to Applicant via user_id
+                            uploaded_at=datetime.utcnow()  # Upload timestamp
+                        )
+                        db.session.add(new_resume)
+                        print(f"[OK] Created new resume record: Applicant ID={applicant.user_id}, Filename={filename}")
                 
-            except Exception as e:
-                # Log an error but allow profile update to continue if possible
-                print(f"[ERROR] Error saving to 'resume' table: {e}")
-                flash("Resume could not be saved to database, but file was uploaded.", "warning")
+                except Exception as e:
+                    # Log an error but allow profile update to continue if possible
+                    print(f"[ERROR] Error saving to 'resume' table: {e}")
+                    flash("Resume could not be saved to database, but file was uploaded.", "warning")
 
 
         elif file.filename != '' and not allowed_file(file.filename):
@@ -737,9 +2125,9 @@ def upload_resume():
 
 @app.route("/download_resume/<filename>")
 def download_resume(filename):
-    """Download uploaded resumes from UPLOAD_FOLDER"""
+    """Download uploaded resumes from their storage folder"""
     try:
-        return send_from_directory(UPLOAD_FOLDER, filename, as_attachment=True)
+        return send_from_directory(resume_directory(filename), filename, as_attachment=True)
     except FileNotFoundError:
         flash("Resume file not found.", "error")
         return redirect(url_for("employer_dashboard"))
@@ -750,15 +2138,33 @@ def delete_resume(resume_id):
     # ✅ NEW LOGIC: Fetch and delete the Resume object
     resume = Resume.query.get(resume_id)
     if resume:
-        # Delete the file from the filesystem first
-        filepath = os.path.join(UPLOAD_FOLDER, resume.filename)
-        if os.path.exists(filepath):
-            os.remove(filepath)            
+        # Its screenings go with it; finished tasks keep their stored results, queued ones fail
+        screening_ids = [screening.id for screening in resume.screenings]
+        ScreeningTask.query.filter_by(resume_id=resume.id, status='queued').update(
+            {'status': 'failed', 'error': "Resume was deleted.", 'finished_at': datetime.utcnow()},
+            synchronize_session=False
+        )
+        ScreeningTask.query.filter_by(resume_id=resume.id).update({'resume_id': None}, synchronize_session=False)
+        if screening_ids:
+            ScreeningTask.query.filter(ScreeningTask.screening_id.in_(screening_ids)).update(
+                {'screening_id': None}, synchronize_session=False
+            )
+        for screening in resume.screenings:
+            db.session.delete(screening)
+
+        # Delete the file from the filesystem once no other resume shares it (after the commit)
+        release_resume_blob(resume.filename)
 
         # Delete the record from the database
         owner_name = resume.owner_name
         db.session.delete(resume)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] Could not delete resume {resume_id}: {e}")
+            flash("Resume could not be deleted. Please try again.", "error")
+            return redirect(url_for("employer_dashboard"))
       
         flash(f"{owner_name}'s resume deleted successfully.", "success")
     else:
@@ -814,6 +2220,9 @@ def submit_job():
     )
 
     db.session.add(new_job)
+    db.session.flush()  # to get new_job.id
+    refresh_job_vector(new_job)
+    index_job_skills(new_job)
     db.session.commit()
     flash(f"Job '{title}' added successfully!", "success")
     return redirect(url_for("employer_dashboard"))
@@ -840,6 +2249,8 @@ def edit_job(job_id):
         job.job_type = request.form.get("job_type")
         job.salary = request.form.get("salary")
         job.description = request.form.get("description")
+        refresh_job_vector(job)
+        index_job_skills(job)
         
         db.session.commit()
         
@@ -894,17 +2305,8 @@ def apply_job(job_id):
         flash("Job not found.", "error")
         return redirect(url_for('applicant_dashboard'))
 
-    # Check if applicant has already applied (prevents duplicate submissions)
-    existing_application = Application.query.filter_by(
-        applicant_id=applicant_user_id, 
-        job_id=job_id
-    ).first()
-
-    if existing_application:
-        flash(f"You have already applied for '{job.title}'. Status: {existing_application.status}", "warning")
-        return redirect(url_for('applicant_dashboard'))
-
     # 💾 Create and save the new application to Application table
+    # Duplicates are rejected by the unique (applicant_id, job_id) index
     try:
         new_application = Application(
             applicant_id=applicant_user_id,  # Connected to Applicant
@@ -918,6 +2320,11 @@ def apply_job(job_id):
         print(f"[OK] Application saved to database: ID={new_application.id}, Applicant ID={applicant_user_id}, Job ID={job_id}")
         # Flash message for toast/alert
         flash(f"Application for '{job.title}' submitted successfully! Saved to Job History.", "success")
+    except IntegrityError:
+        db.session.rollback()
+        existing_application = Application.query.filter_by(applicant_id=applicant_user_id, job_id=job_id).first()
+        status = existing_application.status if existing_application else "Submitted"
+        flash(f"You have already applied for '{job.title}'. Status: {status}", "warning")
     except Exception as e:
         db.session.rollback()
         print(f"[ERROR] Error saving application: {e}")
@@ -927,11 +2334,60 @@ def apply_job(job_id):
     return redirect(url_for('applicant_dashboard'))
 
 # -------------------- RESUME SCREENING --------------------
+def build_job_description_text(job):
+    """Combine title, description, and requirements of a job for better matching"""
+    job_description_text = f"{job.title}\n\n{job.description}"
+    if job.location:
+        job_description_text += f"\n\nLocation: {job.location}"
+    if job.job_type:
+        job_description_text += f"\n\nJob Type: {job.job_type}"
+    return job_description_text
+
+# Screenings are memoized per employer by (resume content hash, job content version,
+# SCORING_MODEL_VERSION): screening the same file against the same job text again reuses
+# the stored row, and a stale row (job text edited, new scoring version) is updated in place
+# instead of adding another. Bump SCORING_MODEL_VERSION whenever scoring changes.
+SCORING_MODEL_VERSION = os.getenv("SCORING_MODEL_VERSION", "1")
+
+def resume_content_hash(filename):
+    """SHA-256 of a stored resume file (read from a blob name without opening it), or None if it is missing."""
+    content_hash = blob_content_hash(filename)
+    if content_hash:
+        return content_hash
+    filepath = resolve_resume_path(filename)
+    return file_content_hash(filepath) if os.path.exists(filepath) else None
+
+def screening_job_version(job_description_text):
+    """Content version of a job description (the same as JobVector.content_version for a job)."""
+    return job_content_version(clean_text(job_description_text))
+
+def find_screening(employer_id, job, job_version, resume_hash):
+    """The employer's screening of this resume content against the job (or pasted description), current or stale."""
+    query = Screening.query.filter_by(employer_id=employer_id, resume_hash=resume_hash)
+    if job is not None:
+        query = query.filter_by(job_id=job.id)
+    else:
+        query = query.filter(Screening.job_id.is_(None), Screening.job_version == job_version)
+    return query.order_by(Screening.id).first()
+
+def is_current_screening(screening, job_version):
+    return screening.job_version == job_version and screening.scoring_version == SCORING_MODEL_VERSION
+
+def cached_screening(employer_id, job, job_description_text, resume_hash):
+    """The stored screening that is still valid for this resume content and job text, or None."""
+    if not resume_hash:
+        return None
+    job_version = screening_job_version(job_description_text)
+    screening = find_screening(employer_id, job, job_version, resume_hash)
+    if screening is not None and is_current_screening(screening, job_version):
+        return screening
+    return None
+
 @app.route('/screen-existing-resume', methods=['POST'])
 def screen_existing_resume():
     """
-    Screen an existing resume from the Resume table against a job.
-    All screening details will be saved to the Screening table.
+    Queue an existing resume from the Resume table for screening against a job.
+    The worker saves all screening details to the Screening table.
     """
     # 1. Authentication Check (Must be an employer)
     if 'user_id' not in session or session.get('role') != 'employer':
@@ -978,123 +2434,830 @@ def screen_existing_resume():
             flash("Unauthorized: You can only screen resumes against your own job posts.", "error")
             return redirect(url_for("employer_dashboard"))
         
-        # 6. Build job description text
-        job_description_text = f"{job.title}\n\n{job.description}"
-        if job.location:
-            job_description_text += f"\n\nLocation: {job.location}"
-        if job.job_type:
-            job_description_text += f"\n\nJob Type: {job.job_type}"
-        
-        # 7. Get resume file path and extract text
-        # Check if resume is in UPLOAD_FOLDER (applicant uploads) or SCREENING_FOLDER
-        resume_filepath = None
-        if resume.filename.startswith('screen_'):
-            resume_filepath = os.path.join(SCREENING_FOLDER, resume.filename)
-        else:
-            resume_filepath = os.path.join(app.config['UPLOAD_FOLDER'], resume.filename)
-        
-        if not os.path.exists(resume_filepath):
+        # 6. Check the file before queueing; the worker extracts and scores it
+        if not os.path.exists(resolve_resume_path(resume.filename)):
             flash(f"Resume file not found: {resume.filename}", "error")
             return redirect(url_for("employer_dashboard"))
-        
-        # 8. Extract resume text
-        resume_text = extract_text_from_pdf(resume_filepath)
-        email, phone = extract_contact_info(resume_text)
-        applicant_name = extract_applicant_name(resume_text)
-        
-        # Use resume owner name if extraction fails
-        if applicant_name == "Unknown Applicant" and resume.owner_name:
-            applicant_name = resume.owner_name
-        
-        # 9. Calculate match scores
-        matched_skills, match_score = calculate_ai_match_score(resume_text, job_description_text)
-        matched_professions = extract_professions(resume_text)
-        final_matched_skills = list(set(matched_skills + matched_professions))
-        
-        # 10. Create resume summary
-        resume_summary = resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-        
-        # 11. SAVE TO SCREENING TABLE - All details saved to database
-        new_screening = Screening(
-            resume_id=resume.id,  # Connected to Resume table
-            job_id=job_id,  # Connected to Job
-            employer_id=employer.id,  # Track which employer did the screening
-            
-            # Applicant Information (extracted from resume)
-            applicant_name=applicant_name,
-            applicant_email=email,
-            applicant_phone=phone,
-            
-            # Job Matching Details
-            job_description_text=job_description_text,  # Full job description used for matching
-            matched_skills=", ".join(final_matched_skills),  # All matched skills
-            match_score=match_score,  # AI match score percentage
-            
-            # Resume Summary for quick reference
-            resume_text_summary=resume_summary,
-            
-            # Timestamp is automatically set by default=datetime.utcnow
-        )
-        db.session.add(new_screening)
-        db.session.commit()
-        
-        print(f"[OK] Screening saved to Screening table: ID={new_screening.id}, Resume ID={resume.id}, Job ID={job_id}, Score={match_score}%")
-        flash(f"Resume screened successfully! Match Score: {match_score}% (Saved to Screening table)", "success")
-        
-        # 12. Prepare data for results page
-        highlighted_resume = resume_text
-        for skill in sorted(set(final_matched_skills), key=len, reverse=True):
-            try:
-                highlighted_resume = re.sub(
-                    rf"\b({re.escape(skill)})\b",
-                    r"<mark style='background:#FFD54F;padding:0.05rem 0.15rem;border-radius:0.15rem;'>\1</mark>",
-                    highlighted_resume,
-                    flags=re.IGNORECASE
-                )
-            except re.error:
-                continue
-        
-        all_jobs = Job.query.all()
-        matched_jobs = [j for j in all_jobs if any(skill.lower() in f"{j.title} {j.company} {j.description}".lower() for skill in final_matched_skills)]
-        
-        return render_template(
-            "ai_resume_result.html",
-            applicant_name=applicant_name,
-            email=email,
-            phone=phone,
-            score=match_score,
-            matched_skills=final_matched_skills,
-            skills_count=len(SKILL_KEYWORDS) + len(PROFESSIONS),
-            highlighted_resume=highlighted_resume,
-            resume_filename=resume.filename,
-            matched_jobs=matched_jobs
-        )
+
+        # 7. Same resume content and job text screened before: show the stored result at once
+        resume_hash = resume_content_hash(resume.filename)
+        cached = cached_screening(employer.id, job, build_job_description_text(job), resume_hash)
+        if cached is not None:
+            task = record_cached_screening(cached, resume_hash, employer_id=employer.id, job_id=job.id, resume_id=resume.id)
+            print(f"[OK] Screening reused: Task ID={task.id}, Screening ID={cached.id}, Resume ID={resume.id}, Job ID={job_id}")
+            return redirect(url_for("screening_task_page", task_id=task.id))
+
+        task = enqueue_screening_task(employer_id=employer.id, job_id=job.id, resume_id=resume.id)
+        print(f"[OK] Screening task queued: Task ID={task.id}, Resume ID={resume.id}, Job ID={job_id}")
+        return redirect(url_for("screening_task_page", task_id=task.id))
         
     except Exception as e:
         db.session.rollback()
         print(f"[ERROR] Error screening existing resume: {e}")
         flash(f"Error screening resume: {e}", "error")
         return redirect(url_for("employer_dashboard"))
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("WARNING: SpaCy model 'en_core_web_sm' not found. Screening will likely fail.")
-    pass # Allow the app to run, but log the warning
+
+@app.route('/jobs/<int:job_id>/screen-all', methods=['POST'])
+def screen_all_resumes(job_id):
+    """
+    Rank every stored resume (or a filtered subset) against one job in a single request.
+    All resumes are scored in one vectorized pass and the Screening rows are bulk inserted.
+    Optional form fields:
+      - scope: 'all' (default), 'applied' (only applicants of this job) or 'unscreened'
+      - resume_ids: restrict the batch to these Resume IDs
+    """
+    if 'user_id' not in session or session.get('role') != 'employer':
+        flash("Unauthorized access. Please log in as an employer.", "error")
+        return redirect(url_for("login"))
+
+    employer = Employer.query.filter_by(user_id=session['user_id']).first()
+    if not employer:
+        flash("Employer profile not found.", "error")
+        return redirect(url_for("employer_dashboard"))
+
+    job = Job.query.get(job_id)
+    if not job:
+        flash("Job not found.", "error")
+        return redirect(url_for("employer_dashboard"))
+
+    if job.employer_id != employer.id:
+        flash("Unauthorized: You can only screen resumes against your own job posts.", "error")
+        return redirect(url_for("employer_dashboard"))
+
+    try:
+        # 1. Select the resumes to screen
+        scope = request.form.get('scope', 'all')
+        query = Resume.query
+        if scope == 'applied':
+            query = query.join(Application, Application.applicant_id == Resume.applicant_id).\
+                filter(Application.job_id == job.id)
+        elif scope == 'unscreened':
+            screened_ids = db.session.query(Screening.resume_id).filter_by(job_id=job.id, employer_id=employer.id)
+            query = query.filter(Resume.id.not_in(screened_ids))
+
+        resume_ids = [int(rid) for rid in request.form.getlist('resume_ids') if rid.isdigit()]
+        if resume_ids:
+            query = query.filter(Resume.id.in_(resume_ids))
+
+        resumes = query.order_by(Resume.id).all()
+
+        # 2. Skip resume contents already screened against the current job text, and load
+        #    the texts of the rest (from the ResumeText cache where possible)
+        job_description_text = build_job_description_text(job)
+        job_version = screening_job_version(job_description_text)
+        stored = {
+            screening.resume_hash: screening
+            for screening in Screening.query.filter(
+                Screening.employer_id == employer.id, Screening.job_id == job.id, Screening.resume_hash.isnot(None)
+            )
+        }
+        batch, seen, reused = [], set(), 0
+        for resume in resumes:
+            resume_filepath = resolve_resume_path(resume.filename)
+            if not os.path.exists(resume_filepath):
+                print(f"[WARN] Skipping resume {resume.id}: file not found ({resume.filename})")
+                continue
+            resume_hash = resume_content_hash(resume.filename)
+            if resume_hash in seen:
+                continue
+            seen.add(resume_hash)
+            if resume_hash in stored and is_current_screening(stored[resume_hash], job_version):
+                reused += 1
+                continue
+            batch.append((resume, resume_hash, get_resume_text(resume_filepath, content_hash=resume_hash)))
+
+        if not batch:
+            if reused:
+                flash(f"All {reused} resumes were already screened against '{job.title}'.", "success")
+            else:
+                flash("No resumes available to screen for this job.", "warning")
+            return redirect(url_for("employer_dashboard"))
+
+        # 3. Score everything in one pass
+        resume_texts = [resume_text for _, _, resume_text in batch]
+        results = calculate_batch_match_scores(resume_texts, job_description_text, job=job,
+                                               resume_hashes=[resume_hash for _, resume_hash, _ in batch])
+        nlp = get_nlp()
+        docs = nlp.pipe(text.lower() for text in resume_texts) if nlp else [None] * len(resume_texts)
+
+        # 4. Build all Screening rows and write them with one bulk insert (and one bulk update of stale rows)
+        rows, stale_rows = [], []
+        for (resume, resume_hash, resume_text), (matched_skills, match_score), doc in zip(batch, results, docs):
+            email, phone = extract_contact_info(resume_text)
+            applicant_name = extract_applicant_name(resume_text)
+            if applicant_name == "Unknown Applicant" and resume.owner_name:
+                applicant_name = resume.owner_name
+
+            final_matched_skills = list(set(matched_skills + extract_professions(resume_text, doc=doc)))
+            row = {
+                'resume_id': resume.id,
+                'job_id': job.id,
+                'employer_id': employer.id,
+                'applicant_name': applicant_name,
+                'applicant_email': email,
+                'applicant_phone': phone,
+                'job_description_text': job_description_text,
+                'matched_skills': ", ".join(final_matched_skills),
+                'match_score': match_score,
+                'resume_text_summary': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text,
+                'resume_hash': resume_hash,
+                'job_version': job_version,
+                'scoring_version': SCORING_MODEL_VERSION,
+                'screened_at': datetime.utcnow(),
+            }
+            if resume_hash in stored:
+                stale_rows.append({**row, 'id': stored[resume_hash].id})
+            else:
+                rows.append(row)
+
+        if rows:
+            db.session.execute(insert(Screening), rows)
+        if stale_rows:
+            db.session.execute(update(Screening), stale_rows)
+        # Bulk statements bypass the session hooks: refresh the search rows of the batch here
+        refresh_resume_search(db.session.connection(), [resume.id for resume, _, _ in batch])
+        db.session.commit()
+        # Bulk inserts bypass mapper events
+        invalidate_counters(("employer", employer.id), GLOBAL_SCOPE)
+
+        scored = rows + stale_rows
+        best = max(scored, key=lambda row: row['match_score'])
+        print(f"[OK] Batch screening saved: Job ID={job.id}, Resumes={len(scored)}, Updated={len(stale_rows)}, "
+              f"Reused={reused}, Best={best['applicant_name']} ({best['match_score']}%)")
+        message = f"Screened {len(scored)} resumes against '{job.title}'. Top match: {best['applicant_name']} ({best['match_score']}%)"
+        if reused:
+            message += f" ({reused} unchanged resumes kept their earlier screening)"
+        flash(message, "success")
+    except Exception as e:
+        db.session.rollback()
+        print(f"[ERROR] Error in batch screening: {e}")
+        flash(f"Error screening resumes: {e}", "error")
+
+    return redirect(url_for("employer_dashboard"))
+# -------------------- SCREENING TASK QUEUE --------------------
+# Single-resume screenings run outside the request: the routes above only queue a
+# ScreeningTask row and redirect to a page that polls its status. Tasks are claimed
+# from the database with an atomic UPDATE, so any number of workers can share the
+# queue: SCREENING_INLINE_WORKERS threads inside each web process (default 1), and/or
+# `flask screening-worker --processes N` (then set SCREENING_INLINE_WORKERS=0).
+SCREENING_INLINE_WORKERS = int(os.getenv("SCREENING_INLINE_WORKERS", "1"))
+SCREENING_POLL_SECONDS = float(os.getenv("SCREENING_POLL_SECONDS", "2"))
+SCREENING_TASK_TIMEOUT_SECONDS = int(os.getenv("SCREENING_TASK_TIMEOUT_SECONDS", "600"))
+SCREENING_MAX_ATTEMPTS = 3
+
+_screening_wakeup = threading.Event()
+_screening_workers = {'pid': None, 'threads': []}
+_screening_workers_lock = threading.Lock()
+
+def screen_resume(resume, resume_text, job, job_description_text, employer_id, resume_hash=None):
+    """
+    Score one resume against a job (or a pasted description) and store its Screening row,
+    updating the employer's stale row for the same resume content if there is one.
+    Returns (screening, result) where result holds the applicant details and score.
+    """
+    email, phone = extract_contact_info(resume_text)
+    applicant_name = extract_applicant_name(resume_text)
+
+    # Use resume owner name if extraction fails
+    if applicant_name == "Unknown Applicant" and resume.owner_name:
+        applicant_name = resume.owner_name
+
+    # A job uses its precomputed vector, the resume its stored one
+    matched_skills, match_score = calculate_ai_match_score(resume_text, job_description_text, job=job,
+                                                           resume_hash=resume_hash)
+    final_matched_skills = list(set(matched_skills + extract_professions(resume_text)))
+
+    job_version = screening_job_version(job_description_text)
+    fields = {
+        'resume_id': resume.id,
+        'job_id': job.id if job else None,
+        'employer_id': employer_id,
+        'applicant_name': applicant_name,
+        'applicant_email': email,
+        'applicant_phone': phone,
+        'job_description_text': job_description_text,
+        'matched_skills': ", ".join(final_matched_skills),
+        'match_score': match_score,
+        'resume_text_summary': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text,
+        'resume_hash': resume_hash,
+        'job_version': job_version,
+        'scoring_version': SCORING_MODEL_VERSION,
+    }
+
+    screening = find_screening(employer_id, job, job_version, resume_hash) if resume_hash else None
+    if screening is None:
+        try:
+            # Savepoint: a concurrent worker may store the same screening meanwhile
+            with db.session.begin_nested():
+                screening = Screening(**fields)
+                db.session.add(screening)
+            return screening, screening_result(screening, resume.filename)
+        except IntegrityError:
+            screening = find_screening(employer_id, job, job_version, resume_hash)
+
+    # Upsert: refresh the stale row instead of adding a duplicate
+    for field, value in fields.items():
+        setattr(screening, field, value)
+    screening.screened_at = datetime.utcnow()
+    return screening, screening_result(screening, resume.filename)
+
+def screening_result(screening, resume_filename):
+    """Applicant details and score of a screening, as stored in ScreeningTask.result."""
+    return {
+        'applicant_name': screening.applicant_name,
+        'email': screening.applicant_email,
+        'phone': screening.applicant_phone,
+        'score': screening.match_score,
+        'matched_skills': [skill for skill in (screening.matched_skills or "").split(", ") if skill],
+        'resume_filename': resume_filename,
+    }
+
+def screening_page_result(screening, resume_filename, resume_text):
+    """Full context for ai_resume_result.html: the screening plus highlighted text and matching jobs."""
+    result = screening_result(screening, resume_filename)
+    result['highlighted_resume'] = str(highlight_resume(resume_text, result['matched_skills']))
+    result['matched_job_ids'] = [matched.id for matched in find_matching_jobs(result['matched_skills'])]
+    return result
+
+def record_cached_screening(screening, resume_hash, **fields):
+    """Store an already finished task for a memoized screening, so its result page shows at once."""
+    resume_filename = screening.resume.filename
+    resume_text = get_resume_text(resolve_resume_path(resume_filename), content_hash=resume_hash)
+    now = datetime.utcnow()
+    task = ScreeningTask(
+        status='done',
+        screening_id=screening.id,
+        result=json.dumps(screening_page_result(screening, resume_filename, resume_text)),
+        started_at=now,
+        finished_at=now,
+        **fields
+    )
+    db.session.add(task)
+    db.session.commit()
+    return task
+
+def task_upload_filenames(task):
+    """{blob filename: uploaded name} of the files uploaded for a task (empty when screening an existing resume)."""
+    if task.upload_filenames:
+        return json.loads(task.upload_filenames)
+    return {task.upload_filename: task.upload_filename} if task.upload_filename else {}
+
+def release_task_uploads(task):
+    """Release the uploaded files of a failed task that did not become a Resume."""
+    saved = set()
+    if task.upload_filenames and task.result:
+        saved = {entry['filename'] for entry in json.loads(task.result) if 'screening_id' in entry}
+    for filename in task_upload_filenames(task):
+        if filename not in saved:
+            release_resume_blob(filename)
+
+def task_job_description(task):
+    """(job, job_description_text) a task is screened against."""
+    if not task.job_id:
+        return None, task.job_description_text
+    job = db.session.get(Job, task.job_id)
+    if job is None:
+        raise ValueError("Job not found.")
+    return job, build_job_description_text(job)
+
+def run_bulk_screening_task(task, job, job_description_text):
+    """
+    Screen every file of a bulk upload. Texts are extracted in the process pool and each
+    file's Resume/Screening rows are committed as soon as it completes, together with the
+    task's per-file results, so progress is visible and a retried task skips finished files.
+    Files already screened against the same job text reuse their stored screening.
+    """
+    uploads = task_upload_filenames(task)
+    results = json.loads(task.result) if task.result else []
+    finished = {entry['filename'] for entry in results}
+
+    filepaths = []
+    for filename in uploads:
+        if filename in finished:
+            continue
+        screening = cached_screening(task.employer_id, job, job_description_text, blob_content_hash(filename))
+        if screening is None:
+            filepaths.append(resolve_resume_path(filename))
+            continue
+        release_resume_blob(filename)
+        results.append({
+            'filename': filename,
+            'name': uploads[filename],
+            'screening_id': screening.id,
+            'applicant_name': screening.applicant_name,
+            'score': screening.match_score,
+        })
+    task.result = json.dumps(results)
+    db.session.commit()
+
+    for filepath, resume_text, error in extract_resume_texts(filepaths):
+        filename = os.path.basename(filepath)
+        if error:
+            results.append({'filename': filename, 'name': uploads[filename], 'error': error})
+            release_resume_blob(filename)
+        else:
+            resume = Resume(filename=filename, owner_name=extract_applicant_name(resume_text))
+            db.session.add(resume)
+            db.session.flush()
+            screening, result = screen_resume(resume, resume_text, job, job_description_text, task.employer_id,
+                                              resume_hash=blob_content_hash(filename))
+            db.session.flush()
+            results.append({
+                'filename': filename,
+                'name': uploads[filename],
+                'screening_id': screening.id,
+                'applicant_name': result['applicant_name'],
+                'score': result['score'],
+            })
+        task.result = json.dumps(results)
+        db.session.commit()
+
+    task.status = 'done'
+    task.finished_at = datetime.utcnow()
+    db.session.commit()
+    screened = [entry for entry in results if 'score' in entry]
+    print(f"[OK] Bulk screening task {task.id} done: Screened={len(screened)}, Failed={len(results) - len(screened)}")
+
+def run_screening_task(task):
+    """Extract, score and save one claimed task; marks it done or failed."""
+    try:
+        job, job_description_text = task_job_description(task)
+
+        if task.upload_filenames:
+            run_bulk_screening_task(task, job, job_description_text)
+            return
+
+        if task.upload_filename:
+            resume_hash = blob_content_hash(task.upload_filename)
+            screening = cached_screening(task.employer_id, job, job_description_text, resume_hash)
+            if screening is not None:
+                # Screened before (e.g. uploaded twice): reuse the stored row and drop the upload's file reference
+                release_resume_blob(task.upload_filename)
+                resume = screening.resume
+                resume_text = get_resume_text(resolve_resume_path(resume.filename), content_hash=resume_hash)
+            else:
+                # Text is cached by file content, so a retried task skips PDF parsing
+                resume_text = get_resume_text(resolve_resume_path(task.upload_filename), content_hash=resume_hash)
+                # The upload's file reference passes to the new Resume
+                resume = Resume(filename=task.upload_filename, owner_name=extract_applicant_name(resume_text))
+                db.session.add(resume)
+                db.session.flush()
+        else:
+            resume = db.session.get(Resume, task.resume_id)
+            if resume is None:
+                raise ValueError("Resume not found in database.")
+            resume_filepath = resolve_resume_path(resume.filename)
+            if not os.path.exists(resume_filepath):
+                raise FileNotFoundError(f"Resume file not found: {resume.filename}")
+            resume_hash = resume_content_hash(resume.filename)
+            resume_text = get_resume_text(resume_filepath, content_hash=resume_hash)
+            screening = cached_screening(task.employer_id, job, job_description_text, resume_hash)
+
+        if screening is None:
+            screening, _ = screen_resume(resume, resume_text, job, job_description_text, task.employer_id,
+                                         resume_hash=resume_hash)
+            db.session.flush()
+        result = screening_page_result(screening, resume.filename, resume_text)
+
+        task.screening_id = screening.id
+        task.result = json.dumps(result)
+        task.status = 'done'
+        task.finished_at = datetime.utcnow()
+        db.session.commit()
+        print(f"[OK] Screening task {task.id} done: Screening ID={screening.id}, Applicant={result['applicant_name']}, Score={result['score']}%")
+    except OperationalError as e:
+        # Transient database error (lock contention, dropped connection): queue the task again
+        db.session.rollback()
+        retry = task.attempts < SCREENING_MAX_ATTEMPTS
+        print(f"[ERROR] Screening task {task.id} hit a database error ({'retrying' if retry else 'giving up'}): {e}")
+        task.status = 'queued' if retry else 'failed'
+        task.error = None if retry else str(e)
+        task.finished_at = None if retry else datetime.utcnow()
+        if not retry:
+            release_task_uploads(task)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[ERROR] Screening task {task.id} failed: {e}")
+        task.status = 'failed'
+        task.error = str(e)
+        task.finished_at = datetime.utcnow()
+        release_task_uploads(task)
+        db.session.commit()
+
+def claim_screening_task():
+    """Atomically move the oldest queued task to 'running' and return it, or None if the queue is empty."""
+    candidates = db.session.query(ScreeningTask.id).filter_by(status='queued').\
+        order_by(ScreeningTask.id).limit(10).all()
+    for (task_id,) in candidates:
+        claimed = ScreeningTask.query.filter_by(id=task_id, status='queued').update(
+            {'status': 'running', 'started_at': datetime.utcnow(), 'attempts': ScreeningTask.attempts + 1},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if claimed:
+            return db.session.get(ScreeningTask, task_id)
+    return None
+
+def requeue_stale_screening_tasks():
+    """Give tasks whose worker died mid-run another attempt, or fail them after SCREENING_MAX_ATTEMPTS."""
+    cutoff = datetime.utcnow() - timedelta(seconds=SCREENING_TASK_TIMEOUT_SECONDS)
+    stale = ScreeningTask.query.filter(ScreeningTask.status == 'running', ScreeningTask.started_at < cutoff)
+    stale.filter(ScreeningTask.attempts >= SCREENING_MAX_ATTEMPTS).update(
+        {'status': 'failed', 'error': 'Screening timed out.', 'finished_at': datetime.utcnow()},
+        synchronize_session=False
+    )
+    stale.filter(ScreeningTask.attempts < SCREENING_MAX_ATTEMPTS).update(
+        {'status': 'queued'}, synchronize_session=False
+    )
+    db.session.commit()
+
+def screening_worker_loop(stop_event=None):
+    """Process queued tasks until stop_event is set; sleeps between polls when the queue is empty."""
+    while not (stop_event and stop_event.is_set()):
+        _screening_wakeup.clear()
+        with app.app_context():
+            try:
+                task = claim_screening_task()
+                if task is not None:
+                    run_screening_task(task)
+                    continue
+                requeue_stale_screening_tasks()
+            except Exception as e:
+                db.session.rollback()
+                print(f"[ERROR] Screening worker: {e}")
+        _screening_wakeup.wait(SCREENING_POLL_SECONDS)
+
+def start_screening_workers():
+    """
+    Start this process's inline worker threads once (again after a fork). Called as each
+    gunicorn worker boots (gunicorn.conf.py), so tasks queued before a restart are picked
+    up, and again on enqueue and from the task pages for other servers.
+    """
+    if SCREENING_INLINE_WORKERS <= 0:
+        return
+    with _screening_workers_lock:
+        if _screening_workers['pid'] == os.getpid():
+            return
+        _screening_workers['pid'] = os.getpid()
+        _screening_workers['threads'] = [
+            threading.Thread(target=screening_worker_loop, daemon=True, name=f"screening-worker-{n}")
+            for n in range(SCREENING_INLINE_WORKERS)
+        ]
+        for thread in _screening_workers['threads']:
+            thread.start()
+
+def enqueue_screening_task(**fields):
+    """Store a queued ScreeningTask and wake a local worker."""
+    task = ScreeningTask(status='queued', **fields)
+    db.session.add(task)
+    db.session.commit()
+    start_screening_workers()
+    _screening_wakeup.set()
+    return task
+
+def current_employer_task(task_id):
+    employer = current_employer()
+    task = db.session.get(ScreeningTask, task_id)
+    if employer is None or task is None or task.employer_id != employer.id:
+        return None
+    return task
+
+@app.route('/screenings/tasks/<int:task_id>')
+def screening_task_page(task_id):
+    """Result page of a screening task; shows a polling page until the worker is done."""
+    if 'user_id' not in session or session.get('role') != 'employer':
+        flash("Unauthorized access. Please log in as an employer.", "error")
+        return redirect(url_for("login"))
+
+    task = current_employer_task(task_id)
+    if task is None:
+        flash("Screening not found.", "error")
+        return redirect(url_for("employer_dashboard"))
+    if task.status == 'queued':
+        start_screening_workers()
+
+    if task.status == 'failed':
+        flash(f"Error screening resume: {task.error}", "error")
+        return redirect(url_for("employer_dashboard"))
+
+    if task.status != 'done':
+        return render_template("screening_pending.html", task=task, progress=screening_task_progress(task))
+
+    if task.upload_filenames:
+        # Bulk uploads: the new screenings are listed on the dashboard
+        results = json.loads(task.result or '[]')
+        screened = [entry for entry in results if 'score' in entry]
+        failed = [entry['name'] for entry in results if 'error' in entry]
+        if screened:
+            best = max(screened, key=lambda entry: entry['score'])
+            flash(f"Screened {len(screened)} resumes. Top match: {best['applicant_name']} ({best['score']}%)", "success")
+        if failed:
+            flash(f"{len(failed)} file(s) could not be read: {', '.join(failed)}", "warning")
+        return redirect(url_for("employer_dashboard"))
+
+    result = json.loads(task.result)
+    matched_job_ids = result['matched_job_ids']
+    jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_(matched_job_ids))}
+    return render_template(
+        "ai_resume_result.html",
+        applicant_name=result['applicant_name'],
+        email=result['email'],
+        phone=result['phone'],
+        score=result['score'],
+        matched_skills=result['matched_skills'],
+        skills_count=len(get_skill_taxonomy()),
+        highlighted_resume=Markup(result['highlighted_resume']),
+        resume_filename=result['resume_filename'],
+        matched_jobs=[jobs_by_id[job_id] for job_id in matched_job_ids if job_id in jobs_by_id]
+    )
+
+def screening_task_progress(task):
+    """{'processed', 'total'} files of a bulk upload task, or None for single screenings."""
+    if not task.upload_filenames:
+        return None
+    return {
+        'processed': len(json.loads(task.result or '[]')),
+        'total': len(json.loads(task.upload_filenames)),
+    }
+
+@app.route('/api/screenings/tasks/<int:task_id>')
+def screening_task_status(task_id):
+    """Status of a screening task for polling: queued, running, done or failed"""
+    task = current_employer_task(task_id)
+    if task is None:
+        return jsonify({'error': 'Not found'}), 404
+    if task.status == 'queued':
+        start_screening_workers()
+    progress = screening_task_progress(task)
+    return jsonify({
+        'id': task.id,
+        'status': task.status,
+        'error': task.error,
+        'score': json.loads(task.result)['score'] if task.status == 'done' and progress is None else None,
+        'progress': progress,
+        'result_url': url_for('screening_task_page', task_id=task.id),
+    })
+
+def _screening_worker_process():
+    # Connections inherited from the parent must not be shared with the child
+    with app.app_context():
+        db.engine.dispose(close=False)
+    try:
+        screening_worker_loop()
+    except KeyboardInterrupt:
+        pass
+
+@app.cli.command("screening-worker")
+@click.option("--processes", default=os.cpu_count() or 1, show_default=True, help="Worker processes to run.")
+def screening_worker_command(processes):
+    """Run dedicated screening workers (use with SCREENING_INLINE_WORKERS=0 on the web processes)."""
+    print(f"[OK] Screening worker started with {processes} process(es)")
+    if processes <= 1:
+        _screening_worker_process()
+        return
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_screening_worker_process, daemon=True) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+# -------------------- EMAIL OUTBOX --------------------
+# queue_email() only stores an OutboxEmail row, so requests never wait on the mail server.
+# A sender thread in each web process (EMAIL_INLINE_SENDER=1, default) or a dedicated
+# `flask email-sender` process (then set EMAIL_INLINE_SENDER=0) claims batches of queued
+# rows with an atomic UPDATE and delivers them over one SMTP connection, kept open between
+# batches until it has been idle for SMTP_IDLE_SECONDS. Failed sends are retried with
+# exponential backoff; rejected recipients and malformed messages fail at once.
+EMAIL_INLINE_SENDER = os.getenv("EMAIL_INLINE_SENDER", "1") == "1"
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "5"))
+EMAIL_BATCH_SIZE = 20
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE_SECONDS = 10  # 10s, 20s, 40s, ... between attempts
+EMAIL_RETRY_MAX_SECONDS = 900
+EMAIL_SEND_TIMEOUT_SECONDS = 300  # A claimed row not finished by then is queued again
+SMTP_IDLE_SECONDS = 60
+SMTP_TIMEOUT_SECONDS = 30
+
+sent_emails = []  # Messages delivered by the 'memory' transport
+
+_email_wakeup = threading.Event()
+_email_sender = {'pid': None, 'thread': None}
+_email_sender_lock = threading.Lock()
+_smtp = {'connection': None, 'last_used': 0.0}
+
+def queue_email(recipient, subject, body, html=None):
+    """Add an email to the outbox and wake the local sender. Returns False if it could not be stored."""
+    try:
+        db.session.add(OutboxEmail(recipient=recipient, subject=subject, body=body, html=html))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[ERROR] Could not queue email to {recipient}: {e}")
+        return False
+    start_email_sender()
+    _email_wakeup.set()
+    return True
+
+def smtp_connection():
+    """The sender's SMTP connection, opened on first use and reused until it goes idle."""
+    connection = _smtp['connection']
+    if connection is not None and time.monotonic() - _smtp['last_used'] > SMTP_IDLE_SECONDS:
+        close_smtp_connection()
+        connection = None
+    if connection is None:
+        connection = mail.connect()
+        # Flask-Mail suppresses sending while testing: the message is only recorded
+        connection.host = None if connection.mail.suppress else connection.configure_host()
+        if connection.host is not None and connection.host.sock is not None:
+            connection.host.sock.settimeout(SMTP_TIMEOUT_SECONDS)
+        _smtp['connection'] = connection
+    return connection
+
+def close_smtp_connection():
+    connection, _smtp['connection'] = _smtp['connection'], None
+    if connection is not None and connection.host is not None:
+        try:
+            connection.host.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+def send_email_smtp(message):
+    try:
+        smtp_connection().send(message)
+    except (smtplib.SMTPServerDisconnected, ConnectionError):
+        # The server closed the reused connection: reconnect once
+        close_smtp_connection()
+        smtp_connection().send(message)
+    _smtp['last_used'] = time.monotonic()
+
+def send_email_console(message):
+    print(f"[OK] Email to {', '.join(message.recipients)}: {message.subject}\n{message.body}")
+
+def send_email_memory(message):
+    sent_emails.append(message)
+
+EMAIL_TRANSPORTS = {'smtp': send_email_smtp, 'console': send_email_console, 'memory': send_email_memory}
+if MAIL_TRANSPORT not in EMAIL_TRANSPORTS:
+    print(f"[WARN] Unknown MAIL_TRANSPORT '{MAIL_TRANSPORT}', using smtp")
+    MAIL_TRANSPORT = 'smtp'
+if MAIL_TRANSPORT == 'smtp' and not app.config['MAIL_DEFAULT_SENDER']:
+    print("[WARN] MAIL_USERNAME / MAIL_DEFAULT_SENDER not set: queued emails will fail until they are configured")
+
+def is_permanent_email_error(error):
+    """Errors a retry cannot fix: rejected recipients, bad headers and other 5xx replies (except login failures)."""
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, BadHeaderError)):
+        return True
+    return (isinstance(error, smtplib.SMTPResponseException) and not isinstance(error, smtplib.SMTPAuthenticationError)
+            and 500 <= error.smtp_code < 600)
+
+def claim_outbox_emails(limit=EMAIL_BATCH_SIZE):
+    """Atomically mark up to limit due emails as 'sending' for this sender and return them."""
+    now = datetime.utcnow()
+    due = [email_id for (email_id,) in db.session.query(OutboxEmail.id).filter(
+        OutboxEmail.status == 'queued', OutboxEmail.next_attempt_at <= now
+    ).order_by(OutboxEmail.id).limit(limit)]
+    if not due:
+        return []
+    token = uuid.uuid4().hex
+    claimed = OutboxEmail.query.filter(OutboxEmail.id.in_(due), OutboxEmail.status == 'queued').update(
+        {'status': 'sending', 'claim_token': token, 'claimed_at': now, 'attempts': OutboxEmail.attempts + 1},
+        synchronize_session=False
+    )
+    db.session.commit()
+    if not claimed:
+        return []
+    return OutboxEmail.query.filter_by(claim_token=token, status='sending').order_by(OutboxEmail.id).all()
+
+def send_outbox_batch():
+    """Deliver one claimed batch, committing each email's outcome. Returns the number of emails claimed."""
+    emails = claim_outbox_emails()
+    send = EMAIL_TRANSPORTS[MAIL_TRANSPORT]
+    for email in emails:
+        try:
+            send(Message(subject=email.subject, recipients=[email.recipient], body=email.body, html=email.html))
+        except Exception as e:
+            retry = not is_permanent_email_error(e) and email.attempts < EMAIL_MAX_ATTEMPTS
+            if retry:
+                delay = min(EMAIL_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1), EMAIL_RETRY_MAX_SECONDS)
+                email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            email.status = 'queued' if retry else 'failed'
+            email.error = str(e)
+            print(f"[ERROR] Email {email.id} to {email.recipient} failed ({'retrying' if retry else 'giving up'}): {e}")
+            if isinstance(e, (smtplib.SMTPException, OSError)) and not is_permanent_email_error(e):
+                close_smtp_connection()
+        else:
+            email.status = 'sent'
+            email.sent_at = datetime.utcnow()
+            email.error = None
+            email.body = email.html = None
+        db.session.commit()
+    if emails:
+        print(f"[OK] Email outbox: {sum(email.status == 'sent' for email in emails)}/{len(emails)} sent")
+    return len(emails)
+
+def requeue_stale_outbox_emails():
+    """Queue emails again whose sender died while they were claimed."""
+    cutoff = datetime.utcnow() - timedelta(seconds=EMAIL_SEND_TIMEOUT_SECONDS)
+    OutboxEmail.query.filter(OutboxEmail.status == 'sending', OutboxEmail.claimed_at < cutoff).update(
+        {'status': 'queued'}, synchronize_session=False
+    )
+    db.session.commit()
+
+def email_sender_loop(stop_event=None):
+    """Send due emails until stop_event is set; sleeps between polls when nothing is due."""
+    while not (stop_event and stop_event.is_set()):
+        _email_wakeup.clear()
+        with app.app_context():
+            try:
+                if send_outbox_batch():
+                    continue
+                requeue_stale_outbox_emails()
+            except Exception as e:
+                db.session.rollback()
+                print(f"[ERROR] Email sender: {e}")
+        if _smtp['connection'] is not None and time.monotonic() - _smtp['last_used'] > SMTP_IDLE_SECONDS:
+            close_smtp_connection()
+        _email_wakeup.wait(EMAIL_POLL_SECONDS)
+
+def start_email_sender():
+    """Start this process's sender thread once (again after a fork); gunicorn.conf.py calls it as each worker boots."""
+    if not EMAIL_INLINE_SENDER:
+        return
+    with _email_sender_lock:
+        if _email_sender['pid'] == os.getpid():
+            return
+        _email_sender['pid'] = os.getpid()
+        _email_sender['thread'] = threading.Thread(target=email_sender_loop, daemon=True, name="email-sender")
+        _email_sender['thread'].start()
+
+@app.cli.command("email-sender")
+def email_sender_command():
+    """Run a dedicated outbox sender (use with EMAIL_INLINE_SENDER=0 on the web processes)."""
+    print(f"[OK] Email sender started (transport: {MAIL_TRANSPORT})")
+    try:
+        email_sender_loop()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_smtp_connection()
+
+# -------------------- NLP MODEL --------------------
+# spaCy is imported and loaded on first use instead of at import time, so worker boot
+# stays fast. Only the NER component is kept; SPACY_NER_ENABLED=0 skips NER entirely
+# (professions then come from keyword matching alone). With SPACY_PRELOAD=1 the model
+# is loaded at import, and gunicorn.conf.py preloads the app in the master so all
+# workers share it copy-on-write.
+SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+SPACY_NER_ENABLED = os.getenv('SPACY_NER_ENABLED', '1').lower() not in ('0', 'false', 'no')
+SPACY_UNUSED_PIPES = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
+_nlp_state = {'nlp': None, 'loaded': False}
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """Return the shared NER-only spaCy pipeline, or None if NER is disabled or the model is missing."""
+    if not SPACY_NER_ENABLED:
+        return None
+    if not _nlp_state['loaded']:
+        with _nlp_lock:
+            if not _nlp_state['loaded']:
+                try:
+                    import spacy
+                    _nlp_state['nlp'] = spacy.load(SPACY_MODEL, exclude=SPACY_UNUSED_PIPES)
+                except (ImportError, OSError) as e:
+                    print(f"WARNING: SpaCy model '{SPACY_MODEL}' could not be loaded ({e}). Using keyword matching only.")
+                _nlp_state['loaded'] = True
+    return _nlp_state['nlp']
+
+if os.getenv('SPACY_PRELOAD', '0') == '1':
+    get_nlp()
 
 @app.route('/screenings/<filename>')
 def screened_file(filename):
-    """Serve screened resumes from SCREENING_FOLDER"""
+    """Serve screened resumes from their storage folder"""
     try:
-        # SCREENING_FOLDER must be defined globally (e.g., SCREENING_FOLDER = 'screened_resumes')
-        return send_from_directory(app.config['SCREENING_FOLDER'], filename)
+        return send_from_directory(resume_directory(filename), filename)
     except FileNotFoundError:
         return "File not found.", 404
 
+EXTRACTION_FAILED_TEXT = "Extraction Failed: File could not be read."
+
+def extract_pages_from_pdf(filepath, max_pages=None):
+    """Extract the text of every page (or the first max_pages) of a PDF file (raises on unreadable files)."""
+    reader = PdfReader(filepath)
+    return [page.extract_text() or "" for page in islice(reader.pages, max_pages)]
+
 def extract_text_from_pdf(filepath):
     """Extract text from PDF file, ensuring robustness."""
     try:
-        reader = PdfReader(filepath)
-        text = "".join(page.extract_text() or "" for page in reader.pages)
+        text = "".join(extract_pages_from_pdf(filepath))
         
         # Basic check: if extraction is weak, use a placeholder message.
         if len(text.strip()) < 100:
@@ -1104,26 +3267,1329 @@ def extract_text_from_pdf(filepath):
     except Exception as e:
         print(f"FATAL PDF READ ERROR for {filepath}: {e}")
         # Return a simple placeholder string to avoid crashing the NLP steps
-        return "Extraction Failed: File could not be read."
+        return EXTRACTION_FAILED_TEXT
+
+def file_content_hash(filepath, chunk_size=64 * 1024):
+    """SHA-256 hex digest of a file, read in chunks so large PDFs are not loaded at once."""
+    sha256 = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def get_resume_text(filepath, content_hash=None):
+    """
+    Return the extracted text of a resume PDF from the ResumeText cache.
+    The PDF is only parsed the first time its content hash is seen; every later
+    screening of the same file (under any name) reads the stored text instead.
+    """
+    if content_hash is None:
+        content_hash = blob_content_hash(os.path.basename(filepath)) or file_content_hash(filepath)
 
-def calculate_ai_match_score(resume_text, job_description):
-    """Calculate matched skills and TF-IDF similarity score"""
-    translator = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
-    resume_clean = resume_text.lower().translate(translator)
-    job_clean = job_description.lower().translate(translator)
+    cached = db.session.get(ResumeText, content_hash)
+    if cached:
+        return cached.text
 
-    # Match predefined skills
-    matched = [skill for skill in SKILL_KEYWORDS if re.search(r'\b' + re.escape(skill.lower()) + r'\b', resume_clean)]
     try:
+        pages = extract_pages_from_pdf(filepath)
+    except Exception as e:
+        print(f"FATAL PDF READ ERROR for {filepath}: {e}")
+        # Failed extractions are not cached so a fixed file can be retried
+        return EXTRACTION_FAILED_TEXT
+
+    text = "".join(pages).strip()
+    if len(text) < 100:
+        print(f"Warning: Extracted text from {filepath} is too short ({len(text)} chars).")
+    return store_resume_text(content_hash, pages)
+
+def store_resume_text(content_hash, pages):
+    """Cache the extracted pages of a file in ResumeText and return its text."""
+    text = "".join(pages).strip()
+    try:
+        # Savepoint: a concurrent worker may have cached the same file meanwhile
+        with db.session.begin_nested():
+            db.session.add(ResumeText(
+                content_hash=content_hash,
+                text=text,
+                pages=json.dumps(pages),
+                page_count=len(pages)
+            ))
+    except IntegrityError:
+        pass
+    return text
+
+PUNCTUATION_TRANSLATOR = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+
+def clean_text(text):
+    """Lowercase and replace punctuation with spaces before vectorizing"""
+    return text.lower().translate(PUNCTUATION_TRANSLATOR)
+
+# -------------------- PARALLEL PDF EXTRACTION --------------------
+# PyPDF2 is pure Python and holds the GIL, so bulk uploads extract their PDFs in a
+# process pool sized to the machine. Each file gets EXTRACTION_TIMEOUT_SECONDS (enforced
+# with SIGALRM inside the pool process; not available on Windows) and only its first
+# EXTRACTION_MAX_PAGES pages are read, so one malformed PDF cannot stall a batch.
+EXTRACTION_PROCESSES = int(os.getenv("EXTRACTION_PROCESSES", str(os.cpu_count() or 1)))
+EXTRACTION_TIMEOUT_SECONDS = int(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "30"))
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "20"))
+
+_extraction_pool = {'pid': None, 'executor': None}
+_extraction_pool_lock = threading.Lock()
+
+def _extraction_timed_out(signum, frame):
+    raise TimeoutError(f"Extraction timed out after {EXTRACTION_TIMEOUT_SECONDS}s")
+
+def _extract_pages_in_pool(filepath, max_pages, timeout):
+    """Runs in a pool process: returns (pages, None) or (None, error message) for one PDF."""
+    use_alarm = timeout > 0 and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _extraction_timed_out)
+        signal.alarm(timeout)
+    try:
+        return extract_pages_from_pdf(filepath, max_pages=max_pages), None
+    except Exception as e:
+        return None, str(e) or type(e).__name__
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+def get_extraction_pool():
+    """This process's extraction pool, created on first use (again after a fork)."""
+    with _extraction_pool_lock:
+        if _extraction_pool['executor'] is None or _extraction_pool['pid'] != os.getpid():
+            # fork: pool processes start without re-importing the app
+            context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+            _extraction_pool['executor'] = ProcessPoolExecutor(max_workers=max(EXTRACTION_PROCESSES, 1), mp_context=context)
+            _extraction_pool['pid'] = os.getpid()
+        return _extraction_pool['executor']
+
+def discard_extraction_pool():
+    """Drop a broken pool (a pool process died) so the next batch starts a new one."""
+    with _extraction_pool_lock:
+        executor, _extraction_pool['executor'] = _extraction_pool['executor'], None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def extract_resume_texts(filepaths):
+    """
+    Yield (filepath, text, error) for each file as soon as its text is available.
+    Files already in the ResumeText cache come first; the rest are extracted in the
+    process pool and cached by content hash when they complete.
+    """
+    pending = {}
+    for filepath in filepaths:
+        if not os.path.exists(filepath):
+            yield filepath, None, "File not found."
+            continue
+        content_hash = blob_content_hash(os.path.basename(filepath)) or file_content_hash(filepath)
+        cached = db.session.get(ResumeText, content_hash)
+        if cached:
+            yield filepath, cached.text, None
+        else:
+            pending[filepath] = content_hash
+
+    if not pending:
+        return
+
+    pool = get_extraction_pool()
+    futures = {
+        pool.submit(_extract_pages_in_pool, filepath, EXTRACTION_MAX_PAGES, EXTRACTION_TIMEOUT_SECONDS): filepath
+        for filepath in pending
+    }
+    for future in as_completed(futures):
+        filepath = futures[future]
+        try:
+            pages, error = future.result()
+        except BrokenProcessPool:
+            # A pool process was killed (e.g. out of memory); the files it still had fail with it
+            discard_extraction_pool()
+            pages, error = None, "Extraction process crashed."
+        if error:
+            print(f"FATAL PDF READ ERROR for {filepath}: {error}")
+            yield filepath, None, error
+            continue
+        yield filepath, store_resume_text(pending[filepath], pages), None
+
+# -------------------- TF-IDF MODEL --------------------
+# One vectorizer fitted over every stored resume and job description, so IDF weights
+# reflect the whole corpus. It is saved to disk, loaded once per worker, and refitted
+# in the background when older than TFIDF_REFRESH_SECONDS or when the corpus has doubled
+# (or on a schedule via `flask refit-tfidf`).
+MODEL_FOLDER = os.path.join(app.instance_path, "models")
+TFIDF_MODEL_PATH = os.path.join(MODEL_FOLDER, "tfidf_vectorizer.pkl")
+TFIDF_LOCK_PATH = os.path.join(MODEL_FOLDER, "tfidf_vectorizer.lock")  # One fit at a time across workers
+JOB_VECTOR_LOCK_PATH = os.path.join(MODEL_FOLDER, "job_vectors.lock")  # One job vector refresh at a time
+TFIDF_REFRESH_SECONDS = int(os.getenv('TFIDF_REFRESH_SECONDS', 6 * 60 * 60))
+TFIDF_RELOAD_CHECK_SECONDS = 60  # How often a worker looks for a model saved by another process
+JOB_VECTOR_CACHE_SIZE = 512
+
+class TfidfModel:
+    """A fitted corpus-wide TfidfVectorizer plus the metadata needed to cache against it."""
+
+    def __init__(self, vectorizer, version, fitted_at, n_documents):
+        self.vectorizer = vectorizer
+        self.version = version
+        self.fitted_at = fitted_at
+        self.n_documents = n_documents
+
+    def transform(self, cleaned_texts):
+        return self.vectorizer.transform(cleaned_texts)
+
+_tfidf_state = {'model': None, 'mtime': None, 'checked_at': 0.0, 'refitting': False,
+                'refreshing_jobs': False, 'jobs_refresh_started_at': 0.0}
+_tfidf_lock = threading.Lock()
+_job_vector_cache = {}
+
+@contextmanager
+def model_file_lock(path, blocking=True):
+    """
+    Cross-process lock for writing model files. Yields whether the lock is held: False only
+    when blocking=False and another process has it (always True where fcntl is missing).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+        yield True  # Closing the file releases the lock
+
+def iter_tfidf_corpus():
+    """Yield the cleaned text of every stored resume and job description."""
+    for (resume_text,) in db.session.query(ResumeText.text).yield_per(500):
+        yield clean_text(resume_text)
+    for job in Job.query.yield_per(500):
+        yield clean_text(build_job_description_text(job))
+
+def tfidf_model_mtime():
+    try:
+        return os.path.getmtime(TFIDF_MODEL_PATH)
+    except FileNotFoundError:
+        return None
+
+def load_tfidf_model():
+    """Load the saved model and make it the active one in this worker."""
+    mtime = os.path.getmtime(TFIDF_MODEL_PATH)
+    with open(TFIDF_MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    with _tfidf_lock:
+        _tfidf_state['model'] = model
+        _tfidf_state['mtime'] = mtime
+    return model
+
+def fit_tfidf_model(seen_mtime=None, wait=True):
+    """
+    Fit the corpus-wide vectorizer, save it to disk and make it the active model.
+    Only one process fits at a time. With wait=False a fit running elsewhere is not waited
+    for (returns None), and if the model file changed from seen_mtime (the stale or missing
+    model the caller saw) the model saved meanwhile is loaded instead of fitting again.
+    """
+    with model_file_lock(TFIDF_LOCK_PATH, blocking=wait) as acquired:
+        if not acquired:
+            return None  # Picked up from disk by the next reload check once saved
+        if not wait and tfidf_model_mtime() != seen_mtime:
+            return load_tfidf_model()
+
+        n_documents = ResumeText.query.count() + Job.query.count()
+        if n_documents < 2:
+            return None
+
         vectorizer = TfidfVectorizer(stop_words='english')
-        tfidf_matrix = vectorizer.fit_transform([resume_clean, job_clean])
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        score = round(similarity * 100, 2)
+        vectorizer.fit(iter_tfidf_corpus())
+
+        fitted_at = datetime.utcnow()
+        model = TfidfModel(vectorizer, fitted_at.strftime('%Y%m%d%H%M%S%f'), fitted_at, n_documents)
+
+        # Write to a temp file first so other workers never load a half-written model
+        tmp_path = f"{TFIDF_MODEL_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, TFIDF_MODEL_PATH)
+
+        with _tfidf_lock:
+            _tfidf_state['model'] = model
+            _tfidf_state['mtime'] = os.path.getmtime(TFIDF_MODEL_PATH)
+    print(f"[OK] TF-IDF model {model.version} fitted on {n_documents} documents ({len(vectorizer.vocabulary_)} terms)")
+    return model
+
+def _refit_tfidf_in_background(seen_mtime):
+    """Refit a stale model without blocking the request that noticed it."""
+    def run():
+        try:
+            with app.app_context():
+                model = fit_tfidf_model(seen_mtime, wait=False)
+                if model is not None:
+                    # Re-vectorize jobs here rather than in the first requests that need them
+                    refresh_job_vectors(model)
+        except Exception as e:
+            print(f"[ERROR] TF-IDF refit failed: {e}")
+        finally:
+            _tfidf_state['refitting'] = False
+
+    with _tfidf_lock:
+        if _tfidf_state['refitting']:
+            return
+        _tfidf_state['refitting'] = True
+    threading.Thread(target=run, name="tfidf-refit", daemon=True).start()
+
+def get_tfidf_model():
+    """
+    Return the active corpus-wide TF-IDF model, loading it from disk once per worker.
+    Returns None when no model exists and the corpus is too small to fit one.
+    """
+    now = time.time()
+    model = _tfidf_state['model']
+    if model is not None and now - _tfidf_state['checked_at'] < TFIDF_RELOAD_CHECK_SECONDS:
+        return model
+
+    _tfidf_state['checked_at'] = now
+    mtime = tfidf_model_mtime()
+    if mtime is None:
+        # Cold start: one worker fits, the others score without a model until it is saved
+        return fit_tfidf_model(None, wait=False)
+
+    if model is None or mtime != _tfidf_state['mtime']:
+        # First use in this worker, or another process saved a newer model
+        model = load_tfidf_model()
+
+    # Refit when the model is old or the corpus has doubled since it was fitted
+    n_documents = ResumeText.query.count() + Job.query.count()
+    if now - mtime > TFIDF_REFRESH_SECONDS or n_documents >= 2 * model.n_documents:
+        _refit_tfidf_in_background(mtime)
+    return model
+
+def get_job_vector(model, job_clean):
+    """TF-IDF vector of a cleaned job description, cached per model version."""
+    key = (model.version, hashlib.sha1(job_clean.encode('utf-8')).hexdigest())
+    job_vector = _job_vector_cache.get(key)
+    if job_vector is None:
+        if len(_job_vector_cache) >= JOB_VECTOR_CACHE_SIZE:
+            _job_vector_cache.clear()
+        job_vector = model.transform([job_clean])
+        _job_vector_cache[key] = job_vector
+    return job_vector
+
+def job_content_version(normalized_text):
+    return hashlib.sha1(normalized_text.encode('utf-8')).hexdigest()
+
+def serialize_vector(vector):
+    buffer = io.BytesIO()
+    sparse.save_npz(buffer, sparse.csr_matrix(vector))
+    return buffer.getvalue()
+
+def refresh_job_vector(job, model=None):
+    """
+    Compute and store the normalized text and TF-IDF vector of a job.
+    Does nothing when the stored row already matches the job text and model version.
+    The caller commits.
+    """
+    if model is None:
+        model = get_tfidf_model()
+    normalized_text = clean_text(build_job_description_text(job))
+    content_version = job_content_version(normalized_text)
+    model_version = model.version if model is not None else None
+
+    job_vector = JobVector.query.get(job.id)
+    if job_vector is None:
+        job_vector = JobVector(job_id=job.id)
+        db.session.add(job_vector)
+    elif job_vector.content_version == content_version and job_vector.model_version == model_version:
+        return job_vector
+
+    job_vector.normalized_text = normalized_text
+    job_vector.content_version = content_version
+    job_vector.model_version = model_version
+    job_vector.vector = serialize_vector(model.transform([normalized_text])) if model is not None else None
+    return job_vector
+
+def stale_job_vector_filter(model):
+    """Jobs (outer-joined with JobVector) that have no vector for this model."""
+    return or_(JobVector.job_id.is_(None), JobVector.model_version.is_(None), JobVector.model_version != model.version)
+
+def refresh_job_vectors(model, batch_size=500):
+    """
+    Re-vectorize every job without a vector for this model, committing per batch.
+    Returns how many were refreshed, or None if another process is already at it.
+    """
+    with model_file_lock(JOB_VECTOR_LOCK_PATH, blocking=False) as acquired:
+        if not acquired:
+            return None
+        refreshed, last_id = 0, 0
+        while True:
+            jobs = Job.query.outerjoin(JobVector, JobVector.job_id == Job.id).\
+                filter(Job.id > last_id, stale_job_vector_filter(model)).\
+                order_by(Job.id).limit(batch_size).all()
+            if not jobs:
+                return refreshed
+            for job in jobs:
+                refresh_job_vector(job, model)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # A request stored a first vector for one of these jobs meanwhile; it gets refreshed on use
+                db.session.rollback()
+            refreshed += len(jobs)
+            last_id = jobs[-1].id
+
+def _refresh_job_vectors_in_background(model):
+    """Refresh job vectors after a refit saved by another process, at most one attempt per minute."""
+    def run():
+        try:
+            with app.app_context():
+                refresh_job_vectors(model)
+        except Exception as e:
+            print(f"[ERROR] Job vector refresh failed: {e}")
+        finally:
+            _tfidf_state['refreshing_jobs'] = False
+
+    with _tfidf_lock:
+        if _tfidf_state['refreshing_jobs'] or time.time() - _tfidf_state['jobs_refresh_started_at'] < TFIDF_RELOAD_CHECK_SECONDS:
+            return
+        _tfidf_state.update(refreshing_jobs=True, jobs_refresh_started_at=time.time())
+    threading.Thread(target=run, name="job-vector-refresh", daemon=True).start()
+
+def get_stored_job_vector(job, model):
+    """
+    Stored TF-IDF vector of a job for the given model. A missing or stale row is vectorized
+    in memory and refreshed in the background: writing it here would hold SQLite's write
+    lock for the rest of the screening transaction and stall the other workers.
+    """
+    normalized_text = clean_text(build_job_description_text(job))
+    job_vector = db.session.get(JobVector, job.id)
+    if (job_vector is not None and job_vector.model_version == model.version
+            and job_vector.content_version == job_content_version(normalized_text)):
+        return job_vector.load_vector()
+    _refresh_job_vectors_in_background(model)
+    return get_job_vector(model, normalized_text)
+
+@app.cli.command("refit-tfidf")
+def refit_tfidf_command():
+    """Refit the corpus-wide TF-IDF model (run from cron to keep IDF weights current)."""
+    model = fit_tfidf_model()
+    if model is None:
+        print("Not enough resumes/jobs to fit a TF-IDF model yet.")
+        return
+    # Re-vectorize stored jobs now rather than lazily on their next screening
+    refresh_job_vectors(model)
+    build_resume_vectors(model)
+
+def calculate_ai_match_score(resume_text, job_description, job=None, resume_hash=None):
+    """
+    Calculate matched skills and TF-IDF similarity score.
+    When the Job is passed its precomputed vector is used instead of vectorizing job_description,
+    and with the resume's content hash its vector comes from the shared resume vector store.
+    """
+    resume_clean = clean_text(resume_text)
+    job_clean = clean_text(job_description)
+
+    # Match taxonomy skills (one pass over the raw text)
+    matched = get_skill_taxonomy().match_skills(resume_text)
+    try:
+        model = get_tfidf_model()
+        if model is not None:
+            # Vectors are L2-normalized, so the dot product is the cosine similarity
+            job_vector = get_stored_job_vector(job, model) if job is not None else get_job_vector(model, job_clean)
+            similarity = resume_similarities(model, job_vector, [resume_text], [resume_hash])[0]
+        else:
+            # Cold start (empty corpus): fall back to a two-document fit
+            vectorizer = TfidfVectorizer(stop_words='english')
+            tfidf_matrix = vectorizer.fit_transform([resume_clean, job_clean])
+            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        score = round(float(similarity) * 100, 2)
+    except OperationalError:
+        # Database errors (e.g. a locked SQLite file) are not a zero match; let the caller retry
+        raise
     except Exception as e:
         print("TF-IDF similarity error:", e)
         score = 0.0
     return matched, score
 
+def calculate_batch_match_scores(resume_texts, job_description, job=None, resume_hashes=None):
+    """
+    Score many resumes against one job description in a single vectorized pass.
+    Returns a list of (matched_skills, score) in the same order as resume_texts.
+    resume_hashes (content hashes, or None per resume) look vectors up in the resume vector store.
+    """
+    job_clean = clean_text(job_description)
+
+    taxonomy = get_skill_taxonomy()
+    matched = [taxonomy.match_skills(text) for text in resume_texts]
+    try:
+        model = get_tfidf_model()
+        # Rows are L2-normalized, so one sparse matrix-vector product gives every cosine similarity
+        if model is not None:
+            job_vector = get_stored_job_vector(job, model) if job is not None else get_job_vector(model, job_clean)
+            similarities = resume_similarities(model, job_vector, resume_texts, resume_hashes or [None] * len(resume_texts))
+        else:
+            vectorizer = TfidfVectorizer(stop_words='english')
+            tfidf_matrix = vectorizer.fit_transform([clean_text(text) for text in resume_texts] + [job_clean])
+            similarities = (tfidf_matrix[:-1] @ tfidf_matrix[-1].T).toarray().ravel()
+        scores = [round(float(similarity) * 100, 2) for similarity in similarities]
+    except Exception as e:
+        print("TF-IDF batch similarity error:", e)
+        scores = [0.0] * len(resume_texts)
+    return list(zip(matched, scores))
+
+# -------------------- RESUME VECTOR STORE --------------------
+# TF-IDF vectors of every stored resume text (ResumeText), kept on disk as CSR arrays:
+# float32 values, int32 column indices and row pointers, and the content hash of each row,
+# with rows sorted by hash. Every worker memory-maps the files read-only, so the page cache
+# holds one copy for all gunicorn workers and scoring a job against the whole store is one
+# sparse matrix-vector product over the mapping. (int32 matters: SciPy copies int64 index
+# arrays into int32 ones.)
+#
+# A segment belongs to one TF-IDF model version. After a refit a new segment is built in
+# the background, and until it is ready resumes are vectorized from their text as before.
+# Resumes missing from the segment are vectorized once and appended to its delta file,
+# which every worker reads forward; once the delta holds RESUME_VECTOR_DELTA_ROWS vectors
+# it is merged into a new segment in the background. The CURRENT file names the segment
+# to map, and workers re-map when it changes.
+RESUME_VECTOR_FOLDER = os.path.join(MODEL_FOLDER, "resume_vectors")
+RESUME_VECTOR_DELTA_ROWS = int(os.getenv('RESUME_VECTOR_DELTA_ROWS', 5000))
+RESUME_VECTOR_BATCH_SIZE = 1000  # Texts vectorized / rows copied at a time while writing a segment
+RESUME_VECTOR_FULL_PRODUCT_RATIO = 0.125  # Batches covering this share of the segment multiply all of it
+DELTA_RECORD_HEADER = struct.Struct('<64sI')  # Content hash, number of stored values
+
+def resume_vector_path(*parts):
+    return os.path.join(RESUME_VECTOR_FOLDER, *parts)
+
+def _map_array(path, dtype, length):
+    # np.memmap cannot map an empty file
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+
+class ResumeVectorSegment:
+    """A memory-mapped segment of resume vectors plus this worker's copy of its (small) delta."""
+
+    def __init__(self, name):
+        self.name = name
+        self.path = resume_vector_path(name)
+        with open(os.path.join(self.path, "meta.json")) as f:
+            meta = json.load(f)
+        self.model_version = meta['model_version']
+        self.n_features = meta['n_features']
+        rows, nnz = meta['rows'], meta['nnz']
+        self.hashes = _map_array(os.path.join(self.path, "hashes.bin"), 'S64', rows)
+        self.matrix = sparse.csr_matrix((
+            _map_array(os.path.join(self.path, "data.bin"), np.float32, nnz),
+            _map_array(os.path.join(self.path, "indices.bin"), np.int32, nnz),
+            _map_array(os.path.join(self.path, "indptr.bin"), np.int32, rows + 1),
+        ), shape=(rows, self.n_features), copy=False)
+        # Delta: content hash -> row of the delta matrix, replaced as a whole so readers need no lock
+        self.delta = ({}, sparse.csr_matrix((0, self.n_features), dtype=np.float32))
+        self.delta_offset = 0
+        self._delta_records = []
+        self._delta_lock = threading.Lock()
+
+    def read_delta(self):
+        """Pick up the vectors appended to the delta file since the last call."""
+        delta_path = os.path.join(self.path, "delta.bin")
+        with self._delta_lock:
+            try:
+                if os.path.getsize(delta_path) == self.delta_offset:
+                    return
+                with open(delta_path, 'rb') as f:
+                    f.seek(self.delta_offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            position = 0
+            while position + DELTA_RECORD_HEADER.size <= len(data):
+                content_hash, nnz = DELTA_RECORD_HEADER.unpack_from(data, position)
+                start = position + DELTA_RECORD_HEADER.size
+                if start + 8 * nnz > len(data):
+                    break  # A writer is halfway through this record
+                self._delta_records.append((
+                    content_hash,
+                    np.frombuffer(data, np.int32, nnz, start),
+                    np.frombuffer(data, np.float32, nnz, start + 4 * nnz),
+                ))
+                position = start + 8 * nnz
+            if position == 0:
+                return
+            self.delta_offset += position
+
+            # Two workers may append the same resume; the first vector wins
+            records = list({record[0]: record for record in reversed(self._delta_records)}.values())[::-1]
+            self._delta_records = records
+            indptr = np.zeros(len(records) + 1, dtype=np.int32)
+            np.cumsum([len(indices) for _, indices, _ in records], out=indptr[1:])
+            matrix = sparse.csr_matrix((
+                np.concatenate([values for _, _, values in records]),
+                np.concatenate([indices for _, indices, _ in records]),
+                indptr,
+            ), shape=(len(records), self.n_features))
+            self.delta = ({record[0]: row for row, record in enumerate(records)}, matrix)
+
+    def similarities(self, content_hashes, job_vector):
+        """
+        Dot products of the stored vectors of these content hashes with a dense job vector
+        (cosine similarities, as rows are L2-normalized); NaN where no vector is stored.
+        """
+        keys = np.array([content_hash or "" for content_hash in content_hashes], dtype='S64')
+        result = np.full(len(keys), np.nan)
+        if len(self.hashes):
+            rows = np.minimum(np.searchsorted(self.hashes, keys), len(self.hashes) - 1)
+            found = self.hashes[rows] == keys
+            if found.sum() >= RESUME_VECTOR_FULL_PRODUCT_RATIO * len(self.hashes):
+                # One product over the whole mapped matrix instead of copying out the rows
+                result[found] = (self.matrix @ job_vector)[rows[found]]
+            elif found.any():
+                result[found] = self.matrix[rows[found]] @ job_vector
+        delta_rows, delta_matrix = self.delta
+        in_delta = [position for position in np.flatnonzero(np.isnan(result)) if keys[position] in delta_rows]
+        if in_delta:
+            result[in_delta] = delta_matrix[[delta_rows[keys[position]] for position in in_delta]] @ job_vector
+        return result
+
+class _ResumeVectorWriter:
+    """Streams CSR rows into the files of a new segment."""
+
+    def __init__(self, name):
+        self.name = name
+        self.path = resume_vector_path(name)
+        os.makedirs(self.path)
+        self.files = {
+            part: open(os.path.join(self.path, f"{part}.bin"), 'wb')
+            for part in ("hashes", "indptr", "indices", "data")
+        }
+        self.files["indptr"].write(np.zeros(1, dtype=np.int32).tobytes())
+        self.rows = 0
+        self.nnz = 0
+        self.last_hash = b""
+        self.is_sorted = True
+
+    def write(self, content_hashes, matrix):
+        hashes = np.asarray(content_hashes, dtype='S64')
+        if len(hashes) == 0:
+            return
+        if hashes[0] <= self.last_hash or np.any(hashes[1:] <= hashes[:-1]):
+            self.is_sorted = False
+        self.last_hash = hashes[-1]
+        if self.nnz + matrix.nnz >= 2 ** 31:
+            raise ValueError("Resume vector segment exceeds 2^31 stored values")
+        self.files["hashes"].write(hashes.tobytes())
+        self.files["indptr"].write((matrix.indptr[1:] + self.nnz).astype(np.int32).tobytes())
+        self.files["indices"].write(matrix.indices.astype(np.int32).tobytes())
+        self.files["data"].write(matrix.data.astype(np.float32).tobytes())
+        self.rows += len(hashes)
+        self.nnz += matrix.nnz
+
+    def close(self, model_version, n_features):
+        for f in self.files.values():
+            f.close()
+        open(os.path.join(self.path, "delta.bin"), 'wb').close()
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump({'model_version': model_version, 'n_features': n_features,
+                       'rows': self.rows, 'nnz': self.nnz}, f)
+
+def write_sorted_resume_vectors(model_version, n_features, sources):
+    """
+    Write the rows of sources, a list of (content hashes, CSR matrix) with earlier sources
+    winning for a repeated hash, as a new segment sorted by hash. Returns its name.
+    """
+    hashes = np.concatenate([np.asarray(source_hashes, dtype='S64') for source_hashes, _ in sources])
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = sorted_hashes[1:] != sorted_hashes[:-1]
+    order, sorted_hashes = order[keep], sorted_hashes[keep]
+    offsets = np.cumsum([0] + [matrix.shape[0] for _, matrix in sources])
+
+    writer = _ResumeVectorWriter(f"{model_version}-{uuid.uuid4().hex[:8]}")
+    for start in range(0, len(order), RESUME_VECTOR_BATCH_SIZE):
+        rows = order[start:start + RESUME_VECTOR_BATCH_SIZE]
+        parts, positions = [], []
+        for source, (_, matrix) in enumerate(sources):
+            in_source = (rows >= offsets[source]) & (rows < offsets[source + 1])
+            if in_source.any():
+                parts.append(matrix[rows[in_source] - offsets[source]])
+                positions.append(np.flatnonzero(in_source))
+        block = sparse.vstack(parts, format='csr')[np.argsort(np.concatenate(positions))]
+        writer.write(sorted_hashes[start:start + RESUME_VECTOR_BATCH_SIZE], block)
+    writer.close(model_version, n_features)
+    return writer.name
+
+def current_resume_vector_segment_name():
+    try:
+        with open(resume_vector_path("CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def switch_resume_vector_segment(name, previous=None):
+    """
+    Make a written segment current and delete the segments it replaces. Vectors appended
+    to previous (the segment it was compacted from) after it was read are carried over.
+    Call with the build lock held, so no other segment is being written.
+    """
+    with model_file_lock(resume_vector_path("store.lock")):
+        if previous is not None and current_resume_vector_segment_name() == previous.name:
+            with open(os.path.join(previous.path, "delta.bin"), 'rb') as f:
+                f.seek(previous.delta_offset)
+                tail = f.read()
+            with open(resume_vector_path(name, "delta.bin"), 'ab') as f:
+                f.write(tail)
+        tmp_path = resume_vector_path(f"CURRENT.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(name)
+        os.replace(tmp_path, resume_vector_path("CURRENT"))
+    # Workers still mapping an old segment keep reading it until they re-map
+    for entry in os.listdir(RESUME_VECTOR_FOLDER):
+        if entry != name and os.path.isdir(resume_vector_path(entry)):
+            shutil.rmtree(resume_vector_path(entry), ignore_errors=True)
+
+def append_resume_vectors(segment, content_hashes, matrix):
+    """
+    Append new resume vectors (CSR rows) to the segment's delta for every worker to reuse.
+    Returns False if the segment was replaced meanwhile (the vectors are then dropped).
+    """
+    matrix = sparse.csr_matrix(matrix)
+    records = []
+    for row, content_hash in enumerate(content_hashes):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        records += [
+            DELTA_RECORD_HEADER.pack(content_hash.encode('ascii'), int(end - start)),
+            matrix.indices[start:end].astype(np.int32).tobytes(),
+            matrix.data[start:end].astype(np.float32).tobytes(),
+        ]
+    with model_file_lock(resume_vector_path("store.lock")):
+        if current_resume_vector_segment_name() != segment.name:
+            return False
+        with open(os.path.join(segment.path, "delta.bin"), 'ab') as f:
+            f.write(b"".join(records))
+    return True
+
+def build_resume_vectors(model):
+    """
+    Vectorize every stored resume text with model into a new current segment. Returns the
+    segment name, or None if another process is already building or compacting.
+    """
+    with model_file_lock(resume_vector_path("build.lock"), blocking=False) as acquired:
+        if not acquired:
+            return None
+        n_features = len(model.vectorizer.vocabulary_)
+        writer = _ResumeVectorWriter(f"{model.version}-{uuid.uuid4().hex[:8]}")
+        query = (db.session.query(ResumeText.content_hash, ResumeText.text)
+                 .order_by(ResumeText.content_hash).yield_per(RESUME_VECTOR_BATCH_SIZE))
+        rows = iter(query)
+        while batch := list(islice(rows, RESUME_VECTOR_BATCH_SIZE)):
+            content_hashes, texts = zip(*batch)
+            writer.write(content_hashes, model.transform([clean_text(text) for text in texts]))
+        writer.close(model.version, n_features)
+        name = writer.name
+        if not writer.is_sorted:
+            # The database collates hashes differently from byte order; sort in a second pass
+            unsorted = ResumeVectorSegment(writer.name)
+            name = write_sorted_resume_vectors(model.version, n_features, [(unsorted.hashes, unsorted.matrix)])
+        switch_resume_vector_segment(name)
+        print(f"[OK] Resume vectors built for {writer.rows} resumes (model {model.version})")
+        return name
+
+def compact_resume_vectors():
+    """Merge the current segment's delta into a new segment. Returns its name, or None if there was nothing to do."""
+    with model_file_lock(resume_vector_path("build.lock"), blocking=False) as acquired:
+        name = current_resume_vector_segment_name()
+        if not acquired or name is None:
+            return None
+        segment = ResumeVectorSegment(name)
+        segment.read_delta()
+        delta_rows, delta_matrix = segment.delta
+        if not delta_rows:
+            return None
+        name = write_sorted_resume_vectors(segment.model_version, segment.n_features, [
+            (segment.hashes, segment.matrix),
+            (list(delta_rows), delta_matrix),
+        ])
+        switch_resume_vector_segment(name, previous=segment)
+        print(f"[OK] Resume vector delta compacted ({len(delta_rows)} vectors)")
+        return name
+
+_resume_vector_state = {'segment': None, 'current_mtime': None, 'started_at': 0.0, 'running': False}
+_resume_vector_lock = threading.Lock()
+
+def _run_resume_vector_task_in_background(task, *args):
+    """Run a build/compaction in a daemon thread, at most one per worker and one attempt per minute."""
+    with _resume_vector_lock:
+        if _resume_vector_state['running'] or time.time() - _resume_vector_state['started_at'] < TFIDF_RELOAD_CHECK_SECONDS:
+            return
+        _resume_vector_state.update(running=True, started_at=time.time())
+
+    def run():
+        try:
+            with app.app_context():
+                task(*args)
+        except Exception as e:
+            print(f"[ERROR] Resume vector {task.__name__} failed: {e}")
+        finally:
+            _resume_vector_state['running'] = False
+
+    threading.Thread(target=run, name="resume-vectors", daemon=True).start()
+
+def get_resume_vector_segment(model):
+    """
+    This worker's mapping of the current resume vector segment, caught up with its delta,
+    or None while there is no segment for this model version (one is then built in the background).
+    """
+    try:
+        mtime = os.path.getmtime(resume_vector_path("CURRENT"))
+    except FileNotFoundError:
+        mtime = None
+    with _resume_vector_lock:
+        segment = _resume_vector_state['segment']
+        if mtime != _resume_vector_state['current_mtime']:
+            name = current_resume_vector_segment_name()
+            if name is None:
+                segment = None
+            elif segment is None or segment.name != name:
+                try:
+                    segment = ResumeVectorSegment(name)
+                except FileNotFoundError:
+                    # Replaced again while mapping it; try once more on the next call
+                    segment, mtime = None, None
+            _resume_vector_state.update(segment=segment, current_mtime=mtime)
+    if segment is not None and segment.model_version == model.version:
+        segment.read_delta()
+        return segment
+    _run_resume_vector_task_in_background(build_resume_vectors, model)
+    return None
+
+def resume_similarities(model, job_vector, resume_texts, resume_hashes):
+    """
+    Cosine similarity of each resume with a job's TF-IDF vector. Resumes with a content hash
+    in the shared vector store are not vectorized again (a large batch is one product over
+    the mapped matrix); the others are vectorized now and appended to the store.
+    """
+    job_dense = job_vector.toarray().ravel().astype(np.float32)
+    segment = get_resume_vector_segment(model) if any(resume_hashes) else None
+    if segment is not None:
+        similarities = segment.similarities(resume_hashes, job_dense)
+    else:
+        similarities = np.full(len(resume_texts), np.nan)
+
+    missing = np.flatnonzero(np.isnan(similarities))
+    if len(missing):
+        resume_matrix = model.transform([clean_text(resume_texts[position]) for position in missing])
+        similarities[missing] = resume_matrix @ job_dense
+        new_rows = [row for row, position in enumerate(missing) if resume_hashes[position]]
+        if segment is not None and new_rows:
+            appended = append_resume_vectors(
+                segment, [resume_hashes[missing[row]] for row in new_rows], resume_matrix[new_rows])
+            if appended and len(segment.delta[0]) + len(new_rows) >= RESUME_VECTOR_DELTA_ROWS:
+                _run_resume_vector_task_in_background(compact_resume_vectors)
+    return similarities
+
+@app.cli.command("rebuild-resume-vectors")
+def rebuild_resume_vectors_command():
+    """Re-vectorize every stored resume with the current TF-IDF model into a new shared segment."""
+    model = get_tfidf_model()
+    if model is None:
+        print("No TF-IDF model fitted yet.")
+        return
+    if build_resume_vectors(model) is None:
+        print("Another process is already building the resume vectors.")
+
+# -------------------- CANDIDATE RANKING --------------------
+# "Best K resumes for this job" without scoring every resume: a BM25 inverted index
+# (term -> postings of document number and term frequency) over every extracted resume
+# text, held in memory by each worker and queried term-at-a-time. From
+# RANKING_PRUNE_MIN_DOCUMENTS resumes on, queries use max-score pruning: terms go in
+# decreasing order of their best possible contribution; once the terms left cannot lift an
+# unseen resume above the current K-th score, the remaining (usually long, common-word)
+# posting lists are only probed for the resumes still in the running. Below that, scoring
+# every posting is as fast (benchmark_ranking.py: no gain at 20k resumes, 10-20% faster at
+# 50k-100k with 80-term job descriptions), so the pruning bookkeeping is skipped.
+#
+# On disk (MODEL_FOLDER) the index is a pickled snapshot plus an append-only journal of
+# JSON lines: {"add": resume id, "hash": content hash, "terms": {term: frequency}} or
+# {"remove": resume id}. Committed resume uploads, replacements and deletes are appended
+# by the session hooks below; every worker loads the snapshot as it starts (gunicorn.conf.py)
+# and reads the journal forward before each query, and the worker that finds it long (or
+# many documents deleted) folds it into a new snapshot. Writers hold an flock on
+# RANKING_LOCK_PATH. As in Lucene, deleted documents still count in document frequencies
+# until compaction.
+RANKING_INDEX_PATH = os.path.join(MODEL_FOLDER, "ranking_index.pkl")
+RANKING_JOURNAL_PATH = os.path.join(MODEL_FOLDER, "ranking_index.journal")
+RANKING_LOCK_PATH = os.path.join(MODEL_FOLDER, "ranking_index.lock")
+RANKING_COMPACT_ENTRIES = int(os.getenv('RANKING_COMPACT_ENTRIES', 2000))  # Journal entries before compaction
+RANKING_COMPACT_DELETED_RATIO = 0.2
+RANKING_PRELOAD = os.getenv('RANKING_PRELOAD', '1') == '1'  # Load the index when a gunicorn worker starts, not on first use
+RANKING_PRUNE_MIN_DOCUMENTS = int(os.getenv('RANKING_PRUNE_MIN_DOCUMENTS', 50000))
+RANKING_DEFAULT_K = 50
+RANKING_MAX_K = 500
+BM25_K1 = 1.2
+BM25_B = 0.75
+RANKING_TOKEN_PATTERN = re.compile(r"\b\w\w+\b")  # Same words as TfidfVectorizer
+
+def ranking_terms(text):
+    """Index terms of a text: lowercase words of 2+ characters without English stop words."""
+    return [term for term in RANKING_TOKEN_PATTERN.findall(clean_text(text)) if term not in ENGLISH_STOP_WORDS]
+
+class RankingIndex:
+    """BM25 inverted index over resume texts. Documents are numbered in insertion order; deleted ones are tombstoned."""
+
+    def __init__(self):
+        self.token = uuid.uuid4().hex  # Also in the header of the journal that continues this snapshot
+        self.postings = {}  # term -> (document numbers ascending, term frequencies)
+        self.term_bounds = {}  # term -> [highest term frequency, shortest document length] in its postings
+        self.resume_ids = array('i')  # document number -> resume id
+        self.lengths = array('I')  # document number -> number of terms
+        self.live = bytearray()  # document number -> 1, or 0 once deleted
+        self.documents = {}  # resume id -> (document number, content hash) of live documents
+        self.total_length = 0  # of live documents
+        self.deleted = 0
+        self.journal_entries = 0  # applied since the snapshot was written
+
+    def add(self, resume_id, content_hash, term_counts):
+        current = self.documents.get(resume_id)
+        if current is not None:
+            if current[1] == content_hash:
+                return
+            self.remove(resume_id)
+        document = len(self.resume_ids)
+        length = sum(term_counts.values())
+        self.resume_ids.append(resume_id)
+        self.lengths.append(length)
+        self.live.append(1)
+        self.documents[resume_id] = (document, content_hash)
+        self.total_length += length
+        for term, count in term_counts.items():
+            count = min(count, 0xFFFF)
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = (array('i'), array('H'))
+                self.term_bounds[term] = [count, length]
+            else:
+                bounds = self.term_bounds[term]
+                bounds[0] = max(bounds[0], count)
+                bounds[1] = min(bounds[1], length)
+            postings[0].append(document)
+            postings[1].append(count)
+
+    def remove(self, resume_id):
+        current = self.documents.pop(resume_id, None)
+        if current is not None:
+            self.live[current[0]] = 0
+            self.total_length -= self.lengths[current[0]]
+            self.deleted += 1
+
+    def apply(self, entry):
+        """Apply one journal entry (idempotent, so replaying an entry twice is harmless)."""
+        if 'add' in entry:
+            self.add(entry['add'], entry['hash'], entry['terms'])
+        else:
+            self.remove(entry['remove'])
+        self.journal_entries += 1
+
+    def needs_compaction(self):
+        return (self.journal_entries >= RANKING_COMPACT_ENTRIES
+                or self.deleted > RANKING_COMPACT_DELETED_RATIO * max(len(self.resume_ids), 1))
+
+    def compacted(self):
+        """A copy without the deleted documents (renumbered), with exact frequencies and bounds."""
+        index = RankingIndex()
+        live = np.frombuffer(self.live, dtype=np.bool_)
+        renumbered = np.cumsum(live) - 1
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        index.resume_ids = array('i', np.frombuffer(self.resume_ids, dtype=np.int32)[live].tobytes())
+        index.lengths = array('I', lengths[live].tobytes())
+        index.live = bytearray(b"\x01") * len(index.resume_ids)
+        index.documents = {resume_id: (int(renumbered[document]), content_hash)
+                           for resume_id, (document, content_hash) in self.documents.items()}
+        index.total_length = self.total_length
+        for term, (documents, counts) in self.postings.items():
+            documents = np.frombuffer(documents, dtype=np.int32)
+            keep = live[documents]
+            if not keep.any():
+                continue
+            documents, counts = documents[keep], np.frombuffer(counts, dtype=np.uint16)[keep]
+            index.postings[term] = (array('i', renumbered[documents].astype(np.int32).tobytes()),
+                                    array('H', counts.tobytes()))
+            index.term_bounds[term] = [int(counts.max()), int(lengths[documents].min())]
+        return index
+
+    def document_mask(self, resume_ids):
+        """Boolean array by document number, True for the documents of these resumes."""
+        mask = np.zeros(len(self.resume_ids), dtype=np.bool_)
+        documents = [self.documents[resume_id][0] for resume_id in resume_ids if resume_id in self.documents]
+        mask[documents] = True
+        return mask
+
+    def top_k(self, terms, k, allowed=None, prune=None):
+        """
+        (resume id, BM25 score) of the k best live documents for the query terms, best first.
+        allowed: boolean array by document number limiting the candidates.
+        prune: max-score pruning on (True) or off (False, every posting is scored); by default
+        on from RANKING_PRUNE_MIN_DOCUMENTS documents. The results are the same either way.
+        """
+        if not self.documents or k <= 0:
+            return []
+        n_documents = len(self.resume_ids)
+        if prune is None:
+            prune = n_documents >= RANKING_PRUNE_MIN_DOCUMENTS
+        average_length = self.total_length / len(self.documents) or 1.0
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        mask = np.frombuffer(self.live, dtype=np.bool_) if self.deleted else None
+        if allowed is not None:
+            mask = allowed if mask is None else mask & allowed
+
+        query = []
+        for term in set(terms):
+            if term not in self.postings:
+                continue
+            frequency = len(self.postings[term][0])
+            idf = math.log(1 + (n_documents - frequency + 0.5) / (frequency + 0.5))
+            # Term frequency saturates and long documents are damped, so the highest frequency
+            # at the shortest length bounds every posting of the term
+            max_count, min_length = self.term_bounds[term]
+            bound = idf * max_count * (BM25_K1 + 1) / (
+                max_count + BM25_K1 * (1 - BM25_B + BM25_B * min_length / average_length))
+            query.append((bound, idf, term))
+        query.sort(reverse=True)
+
+        # Best score the terms after each one can still add (summed from the end: a running
+        # difference can drift below zero)
+        remaining = list(accumulate(reversed([bound for bound, _, _ in query[1:]]), initial=0.0))[::-1]
+        # No score can exceed the bounds of the terms read so far
+        ceilings = list(accumulate(bound for bound, _, _ in query))
+        scores = np.zeros(n_documents)
+        candidates = None  # Once set, the only documents that can still reach the top k
+        floor = 0.0  # The final k-th best score is at least this
+        check_below = math.inf  # Prune the candidates again once the rest's bound is below this
+        for position, (bound, idf, term) in enumerate(query):
+            documents, counts = self.postings[term]
+            documents = np.frombuffer(documents, dtype=np.int32)
+            counts = np.frombuffer(counts, dtype=np.uint16)
+            if candidates is None:
+                if mask is not None:
+                    keep = mask[documents]
+                    documents, counts = documents[keep], counts[keep]
+            elif len(candidates) * 16 < len(documents):
+                # Few candidates left: binary-search them instead of reading the whole posting list
+                positions = np.searchsorted(documents, candidates)
+                found = positions < len(documents)
+                found[found] = documents[positions[found]] == candidates[found]
+                documents, counts = candidates[found], counts[positions[found]]
+            else:
+                keep = is_candidate[documents]
+                documents, counts = documents[keep], counts[keep]
+            counts = counts.astype(np.float64)
+            scores[documents] += idf * counts * (BM25_K1 + 1) / (
+                counts + BM25_K1 * (1 - BM25_B + BM25_B * lengths[documents] / average_length))
+
+            later = remaining[position]
+            if not prune or not later:
+                continue
+            if candidates is None:
+                if later >= ceilings[position]:
+                    continue  # Not even the best document so far could outscore an unseen one
+                # The k-th best among this term's documents is a floor for the k-th best overall,
+                # and scores only grow, so every floor found stays one
+                if len(documents) >= k:
+                    floor = max(floor, np.partition(scores[documents], len(documents) - k)[len(documents) - k])
+                if later < floor:
+                    # Documents not seen yet can no longer reach the top k. The exact k-th best
+                    # (one pass over all scores) leaves the fewest candidates.
+                    if n_documents > k:
+                        floor = np.partition(scores, n_documents - k)[n_documents - k]
+                    is_candidate = scores + later >= floor
+                    candidates = np.flatnonzero(is_candidate)
+                    check_below = later * 0.75
+            elif later < check_below and len(candidates) > k:
+                # Drop the candidates the rest can no longer lift to the k-th best
+                floor = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+                dropped = candidates[scores[candidates] + later < floor]
+                is_candidate[dropped] = False
+                candidates = candidates[is_candidate[candidates]]
+                check_below = later * 0.75
+
+        pool = candidates if candidates is not None else np.flatnonzero(scores)
+        pool = pool[scores[pool] > 0]
+        if len(pool) > k:
+            pool = pool[np.argpartition(-scores[pool], k - 1)[:k]]
+        resume_ids = np.frombuffer(self.resume_ids, dtype=np.int32)
+        best = pool[np.lexsort((resume_ids[pool], -scores[pool]))]  # Ties by resume id
+        return [(int(resume_ids[document]), float(scores[document])) for document in best]
+
+_ranking_state = {'index': None, 'offset': 0}
+_ranking_lock = threading.Lock()
+
+def read_ranking_journal(offset):
+    """(journal token, complete entries after offset, new offset); token is None when there is no journal."""
+    try:
+        with open(RANKING_JOURNAL_PATH, 'rb') as f:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                return None, [], 0
+            offset = max(offset, len(header))
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return None, [], 0
+    end = data.rfind(b"\n") + 1  # A writer may be halfway through the last line
+    entries = [json.loads(line) for line in data[:end].splitlines() if line]
+    return json.loads(header)['token'], entries, offset + end
+
+def save_ranking_index(index):
+    """
+    Write index as the snapshot and start an empty journal after it; returns the journal offset.
+    Hold model_file_lock(RANKING_LOCK_PATH).
+    """
+    index.journal_entries = 0
+    os.makedirs(MODEL_FOLDER, exist_ok=True)
+    # Temp file + rename, so readers never load a half-written file; the snapshot goes
+    # first, so a journal with a new token always has its snapshot in place
+    tmp_path = f"{RANKING_INDEX_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, RANKING_INDEX_PATH)
+    header = json.dumps({'token': index.token}).encode('utf-8') + b"\n"
+    tmp_path = f"{RANKING_JOURNAL_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+    os.replace(tmp_path, RANKING_JOURNAL_PATH)
+    return len(header)
+
+def append_ranking_journal(entries):
+    """Append committed index changes for every worker to apply (nothing to do before the first build)."""
+    lines = b"".join(json.dumps(entry).encode('utf-8') + b"\n" for entry in entries)
+    with model_file_lock(RANKING_LOCK_PATH):
+        if not os.path.exists(RANKING_JOURNAL_PATH):
+            return
+        with open(RANKING_JOURNAL_PATH, 'ab') as f:
+            f.write(lines)
+
+def ranking_journal_entries(connection, resume_ids):
+    """Journal entries bringing these resumes' documents up to date (removed when deleted or without text)."""
+    resume_ids = sorted(set(resume_ids))
+    hashes = {resume_id: resume_content_hash(filename) for resume_id, filename in connection.execute(
+        db.select(Resume.id, Resume.filename).where(Resume.id.in_(resume_ids)))}
+    texts = dict(connection.execute(
+        db.select(ResumeText.content_hash, ResumeText.text).where(ResumeText.content_hash.in_(set(hashes.values())))
+    ).all()) if hashes else {}
+    entries = []
+    for resume_id in resume_ids:
+        text = texts.get(hashes.get(resume_id))
+        if text is None:
+            entries.append({'remove': resume_id})
+        else:
+            entries.append({'add': resume_id, 'hash': hashes[resume_id], 'terms': Counter(ranking_terms(text))})
+    return entries
+
+def build_ranking_index(batch_size=500):
+    """A new index of every resume whose text has been extracted."""
+    index = RankingIndex()
+    last_id = 0
+    while True:
+        resume_ids = db.session.execute(
+            db.select(Resume.id).where(Resume.id > last_id).order_by(Resume.id).limit(batch_size)
+        ).scalars().all()
+        if not resume_ids:
+            break
+        for entry in ranking_journal_entries(db.session.connection(), resume_ids):
+            if 'add' in entry:
+                index.apply(entry)
+        last_id = resume_ids[-1]
+    return index
+
+def get_ranking_index():
+    """
+    This worker's ranking index, caught up with the journal. The snapshot is loaded on first
+    use (built from the database when there is none) and again after another worker compacts.
+    """
+    with _ranking_lock:
+        index = _ranking_state['index']
+        token, entries, offset = read_ranking_journal(_ranking_state['offset'] if index is not None else 0)
+        if token is None:
+            with model_file_lock(RANKING_LOCK_PATH):
+                if not os.path.exists(RANKING_JOURNAL_PATH):
+                    built = build_ranking_index()
+                    save_ranking_index(built)
+                    print(f"[OK] Ranking index built: {len(built.documents)} resumes, {len(built.postings)} terms")
+        if index is None or token != index.token:
+            # First use in this worker, or another worker wrote a new snapshot
+            with open(RANKING_INDEX_PATH, 'rb') as f:
+                index = pickle.load(f)
+            token, entries, offset = read_ranking_journal(0)
+            if token != index.token:
+                # Caught between a new snapshot and its journal; the snapshot has every change so far
+                entries, offset = [], 0
+        for entry in entries:
+            index.apply(entry)
+
+        if index.needs_compaction():
+            with model_file_lock(RANKING_LOCK_PATH):
+                # Fold in lines appended meanwhile, unless another worker compacted first
+                token, entries, offset = read_ranking_journal(offset)
+                if token == index.token:
+                    for entry in entries:
+                        index.apply(entry)
+                    index = index.compacted()
+                    offset = save_ranking_index(index)
+        _ranking_state['index'] = index
+        _ranking_state['offset'] = offset
+        return index
+
+def top_ranked_resumes(query_text, k, resume_ids=None):
+    """(resume id, BM25 score) of the k resumes best matching query_text, best first; resume_ids limits the candidates."""
+    index = get_ranking_index()
+    with _ranking_lock:
+        # Under the lock: appending to the index arrays while numpy views them would fail
+        allowed = index.document_mask(resume_ids) if resume_ids is not None else None
+        return index.top_k(ranking_terms(query_text), k, allowed)
+
+def sync_ranking_index():
+    """Journal the differences between the index and the resume table (e.g. rows changed by bulk statements)."""
+    index = get_ranking_index()
+    current = {resume_id: resume_content_hash(filename)
+               for resume_id, filename in db.session.execute(db.select(Resume.id, Resume.filename))}
+    with _ranking_lock:
+        stale = [resume_id for resume_id, content_hash in current.items()
+                 if index.documents.get(resume_id, (None, None))[1] != content_hash]
+        deleted = [resume_id for resume_id in index.documents if resume_id not in current]
+    entries = [{'remove': resume_id} for resume_id in deleted]
+    for start in range(0, len(stale), 500):
+        entries += [entry for entry in ranking_journal_entries(db.session.connection(), stale[start:start + 500])
+                    if 'add' in entry]
+    if entries:
+        append_ranking_journal(entries)
+        get_ranking_index()
+    return len(entries)
+
+def _preload_ranking_index():
+    try:
+        with app.app_context():
+            synced = sync_ranking_index()
+            if synced:
+                print(f"[OK] Ranking index caught up with {synced} resume change(s)")
+    except Exception as e:
+        print(f"[ERROR] Ranking index preload failed: {e}")
+
+def preload_ranking_index():
+    """Load and sync the ranking index in the background (gunicorn.conf.py calls this as each worker starts)."""
+    if RANKING_PRELOAD:
+        threading.Thread(target=_preload_ranking_index, name="ranking-preload", daemon=True).start()
+
+@event.listens_for(db.session, "after_flush")
+def _collect_ranking_changes(session, flush_context):
+    resume_ids, content_hashes = set(), set()
+    for obj in session.new:
+        if isinstance(obj, Resume):
+            resume_ids.add(obj.id)
+        elif isinstance(obj, ResumeText):
+            content_hashes.add(obj.content_hash)
+    for obj in session.dirty:
+        if isinstance(obj, Resume) and db.inspect(obj).attrs.filename.history.has_changes():
+            resume_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Resume):
+            resume_ids.add(obj.id)
+    if not (resume_ids or content_hashes):
+        return
+
+    # Entries are read now, inside the transaction, and journaled once it commits
+    connection = session.connection()
+    if content_hashes:
+        resume_ids.update(connection.execute(db.select(Resume.id).where(
+            Resume.filename.in_([f"{content_hash}.pdf" for content_hash in content_hashes])
+        )).scalars())
+    if resume_ids:
+        session.info.setdefault('ranking_journal', []).extend(ranking_journal_entries(connection, resume_ids))
+
+@event.listens_for(db.session, "after_commit")
+def _journal_ranking_changes(session):
+    if session.in_nested_transaction():
+        return  # A savepoint was released; wait for the real commit
+    entries = session.info.pop('ranking_journal', None)
+    if entries:
+        try:
+            append_ranking_journal(entries)
+        except OSError as e:
+            # The next worker start (or `flask rebuild-ranking-index`) picks the changes up from the database
+            print(f"[ERROR] Could not journal {len(entries)} ranking index change(s): {e}")
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _discard_ranking_changes(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('ranking_journal', None)
+
+@app.route("/api/employer/jobs/<int:job_id>/top-candidates")
+def employer_job_top_candidates_api(job_id):
+    """
+    The resumes that best match one of the employer's jobs (BM25 over the resume text),
+    best first. limit: how many (default RANKING_DEFAULT_K, at most RANKING_MAX_K).
+    Candidates are the employer's own resumes (as in /api/employer/resumes);
+    scope=applied keeps only applicants of the job, as in screen-all.
+    """
+    employer = current_employer()
+    if not employer:
+        return jsonify({'error': 'Unauthorized'}), 401
+    job = db.session.get(Job, job_id)
+    if job is None or job.employer_id != employer.id:
+        return jsonify({'error': 'Not found'}), 404
+
+    k = request.args.get('limit', RANKING_DEFAULT_K, type=int) or RANKING_DEFAULT_K
+    k = max(1, min(k, RANKING_MAX_K))
+    if request.args.get('scope') == 'applied':
+        candidates = db.select(Resume.id).join(Application, Application.applicant_id == Resume.applicant_id)\
+            .where(Application.job_id == job.id)
+    else:
+        applicant_ids, screened_resume_ids = employer_resume_sources(employer)
+        candidates = db.select(Resume.id).where(
+            or_(Resume.applicant_id.in_(applicant_ids), Resume.id.in_(screened_resume_ids)))
+    resume_ids = db.session.execute(candidates).scalars().all()
+    ranked = top_ranked_resumes(build_job_description_text(job), k, resume_ids)
+
+    resumes = {resume.id: resume for resume in Resume.query.filter(Resume.id.in_([resume_id for resume_id, _ in ranked]))}
+    items = [dict(serialize_resume(resumes[resume_id]), score=round(score, 4))
+             for resume_id, score in ranked if resume_id in resumes]
+    return jsonify({'items': items})
+
+@app.cli.command("rebuild-ranking-index")
+def rebuild_ranking_index_command():
+    """Rebuild the candidate ranking index from the extracted resume texts (workers reload it on their next query)."""
+    with model_file_lock(RANKING_LOCK_PATH):
+        index = build_ranking_index()
+        save_ranking_index(index)
+    print(f"[OK] Ranking index rebuilt: {len(index.documents)} resumes, {len(index.postings)} terms")
+
+HIGHLIGHT_MARK_STYLE = "background:#FFD54F;padding:0.05rem 0.15rem;border-radius:0.15rem;"
+
+@lru_cache(maxsize=256)
+def _highlight_matcher(terms):
+    return KeywordMatcher(terms)
+
+@app.template_filter('highlight_skills')
+def highlight_resume(resume_text, matched_skills):
+    """
+    Return the resume text as HTML with every matched skill (and its aliases) wrapped in <mark>.
+    All match spans are found in one pass, overlaps are merged, and the text between
+    them is HTML-escaped, so the result is returned as Markup (no |safe needed).
+    """
+    taxonomy = get_skill_taxonomy()
+    terms = tuple(sorted({alias for skill in matched_skills for alias in taxonomy.terms_for(skill.lower())}))
+    if not terms:
+        return escape(resume_text)
+
+    spans = []
+    for start, end, _ in _highlight_matcher(terms).finditer(resume_text):
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+
+    parts = []
+    position = 0
+    for start, end in spans:
+        parts.append(escape(resume_text[position:start]))
+        parts.append(f"<mark style='{HIGHLIGHT_MARK_STYLE}'>{escape(resume_text[start:end])}</mark>")
+        position = end
+    parts.append(escape(resume_text[position:]))
+    return Markup("".join(str(part) for part in parts))
+
 def extract_contact_info(text):
     """Extract email and phone number from resume"""
     emails = re.findall(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}", text)
@@ -1132,22 +4598,23 @@ def extract_contact_info(text):
     phone = phones[0] if phones else "Not detected"
     return email, phone
 
-def extract_professions(resume_text):
+def extract_professions(resume_text, doc=None):
     """Detect professions/job titles from resume"""
     resume_text_lower = resume_text.lower()
-    matched = set()
-    # Method 1: simple keyword matching
-    for prof in PROFESSIONS:
-        if prof in resume_text_lower:
-            matched.add(prof)
+    # Method 1: simple keyword matching (single pass)
+    taxonomy = get_skill_taxonomy()
+    matched = set(taxonomy.match_professions(resume_text_lower))
 
     # Method 2: optional NLP entity recognition for future enhancement
-    doc = nlp(resume_text_lower)
+    # (batch callers pass a doc produced by nlp.pipe)
+    if doc is None:
+        nlp = get_nlp()
+        if nlp is None:
+            return list(matched)
+        doc = nlp(resume_text_lower)
     for ent in doc.ents:
         if ent.label_ in ["ORG", "WORK_OF_ART", "PRODUCT"]:
-            for prof in PROFESSIONS:
-                if prof in ent.text.lower():
-                    matched.add(prof)
+            matched.update(taxonomy.match_professions(ent.text))
 
     return list(matched)
 
@@ -1177,13 +4644,13 @@ def upload_screening():
     # REMOVED: DUMMY_APPLICANT_ID = 1
 
     try:
-        # 2. Get form data and file
-        file = request.files.get('resume_file')
+        # 2. Get form data and files (several PDFs and/or ZIP archives make a bulk upload)
+        files = [f for f in request.files.getlist('resume_file') if f and f.filename]
         job_description_text = request.form.get('job_description', '').strip()
         job_id_str = request.form.get('job_id') # Optional: If the user selects a job
 
         # Basic Validation
-        if not file or file.filename == '':
+        if not files:
             flash("No resume file selected!", "error")
             return redirect(url_for("employer_dashboard"))
         
@@ -1207,118 +4674,121 @@ def upload_screening():
                     return redirect(url_for("employer_dashboard"))
                 
                 # Use the job's description, title, and other details for matching
-                # Combine title, description, and requirements for better matching
-                job_description_text = f"{selected_job.title}\n\n{selected_job.description}"
-                if selected_job.location:
-                    job_description_text += f"\n\nLocation: {selected_job.location}"
-                if selected_job.job_type:
-                    job_description_text += f"\n\nJob Type: {selected_job.job_type}"
+                job_description_text = build_job_description_text(selected_job)
         
         # Final validation: job description is required (either from form or from selected job)
         if not job_description_text:
             flash("Job Description is required for screening. Please select a job or paste a job description.", "error")
             return redirect(url_for("employer_dashboard"))
         
-        # 3. SAVE THE UPLOADED FILE
-        filename = secure_filename(f"screen_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{file.filename}")
-        filepath = os.path.join(SCREENING_FOLDER, filename)
-        
-        os.makedirs(SCREENING_FOLDER, exist_ok=True)
-        file.save(filepath)
+        if len(files) > 1 or files[0].filename.lower().endswith('.zip'):
+            return queue_bulk_screening(files, employer, selected_job, job_description_text)
+
+        # 3. SAVE THE UPLOADED FILE (shared with earlier uploads of the same content)
+        try:
+            filename = store_resume_blob(files[0].stream, RESUME_MAX_BYTES)
+        except ValueError as e:
+            flash(f"Resume was not uploaded: {e}", "error")
+            return redirect(url_for("employer_dashboard"))
 
-        # 4. PERFORM SCREENING LOGIC - EXTRACT DATA
-        resume_text = extract_text_from_pdf(filepath)
-        email, phone = extract_contact_info(resume_text)
-        applicant_name = extract_applicant_name(resume_text)
-        
-        # -----------------------------------------------------------------
+        # Same file screened against the same job text before: reuse the stored result and file
+        resume_hash = blob_content_hash(filename)
+        cached = cached_screening(employer.id, selected_job, job_description_text, resume_hash)
+        if cached is not None:
+            release_resume_blob(filename)
+            task = record_cached_screening(
+                cached, resume_hash,
+                employer_id=employer.id,
+                job_id=selected_job.id if selected_job else None,
+                job_description_text=None if selected_job else job_description_text
+            )
+            print(f"[OK] Screening reused: Task ID={task.id}, Screening ID={cached.id}, Job ID={job_id}")
+            return redirect(url_for("screening_task_page", task_id=task.id))
+
+        # 4. QUEUE THE SCREENING - extraction, scoring and the Resume/Screening rows happen in the worker
         # NOTE: For screening, we don't create Applicant records automatically
         # The screening is done on external resumes uploaded by employers
-        # -----------------------------------------------------------------
-        
-        # 4b. Calculate Scores
-        matched_skills, match_score = calculate_ai_match_score(resume_text, job_description_text)
-        matched_professions = extract_professions(resume_text)
-        final_matched_skills = list(set(matched_skills + matched_professions))
-        
-        # 5. CREATE A TEMPORARY RESUME RECORD (Now linked to a REAL Applicant ID)
-        new_resume = Resume(
-            filename=filename, 
-            owner_name=applicant_name
-        )
-        db.session.add(new_resume)
-        db.session.flush() # Get the new_resume.id before commit
-
-        # 6. SAVE SCREENING RECORD - All details saved to database
-        # Create resume text summary (first 500 characters for quick reference)
-        resume_summary = resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-        
-        new_screening = Screening(
-            resume_id=new_resume.id,  
-            job_id=job_id,
-            employer_id=employer.id,  # Track which employer did the screening
-            
-            # Applicant Information (extracted from resume)
-            applicant_name=applicant_name,
-            applicant_email=email,
-            applicant_phone=phone,
-            
-            # Job Matching Details
-            job_description_text=job_description_text,  # Full job description used for matching
-            matched_skills=", ".join(final_matched_skills),  # All matched skills
-            match_score=match_score,  # AI match score percentage
-            
-            # Resume Summary for quick reference
-            resume_text_summary=resume_summary,
-            
-            # Timestamp is automatically set by default=datetime.utcnow
-        )
-        db.session.add(new_screening)
-        db.session.commit() # Commit Resume and Screening records to database
-        
-        print(f"[OK] Screening saved to database: ID={new_screening.id}, Applicant={applicant_name}, Score={match_score}%, Job ID={job_id}")
-
-        # 7. Prepare data for the results page
-        flash(f"Screening successful! Match Score: {match_score}%", "success")
-
-
-        highlighted_resume = resume_text
-        for skill in sorted(set(final_matched_skills), key=len, reverse=True):
-            try:
-                highlighted_resume = re.sub(
-                    rf"\b({re.escape(skill)})\b",
-                    r"<mark style='background:#FFD54F;padding:0.05rem 0.15rem;border-radius:0.15rem;'>\1</mark>",
-                    highlighted_resume,
-                    flags=re.IGNORECASE
-                )
-            except re.error:
-                continue
-                
-        all_jobs = Job.query.all()
-        matched_jobs = [j for j in all_jobs if any(skill.lower() in f"{j.title} {j.company} {j.description}".lower() for skill in final_matched_skills)]
-
-        # Redirect to results page (or render it directly)
-        return render_template(
-            "ai_resume_result.html",
-            applicant_name=applicant_name,  
-            email=email,
-            phone=phone,
-            score=match_score,
-            matched_skills=final_matched_skills,
-            skills_count=len(SKILL_KEYWORDS) + len(PROFESSIONS),
-            highlighted_resume=highlighted_resume,
-            resume_filename=filename,
-            matched_jobs=matched_jobs
+        task = enqueue_screening_task(
+            employer_id=employer.id,
+            job_id=selected_job.id if selected_job else None,
+            job_description_text=None if selected_job else job_description_text,
+            upload_filename=filename
         )
+        print(f"[OK] Screening task queued: Task ID={task.id}, File={filename}, Job ID={job_id}")
+        return redirect(url_for("screening_task_page", task_id=task.id))
 
     except Exception as e: 
         db.session.rollback()
         print(f"FATAL SCREENING ERROR: {e}")
         # Optional: Delete the file if it was saved before the error
-        if 'filepath' in locals() and os.path.exists(filepath):
-            os.remove(filepath)
+        if 'filename' in locals():
+            discard_unreferenced_blob(filename)
         flash(f"A critical server error occurred during screening: {e}", "error")
         return redirect(url_for("employer_dashboard"))
+
+BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "200"))
+
+def save_bulk_upload(files):
+    """
+    Store the PDFs of a bulk upload in the blob store, unpacking ZIP archives, and return
+    {blob filename: uploaded name} (at most BULK_UPLOAD_MAX_FILES). Files with the same
+    content as an earlier file of the upload are screened once.
+    """
+    saved = {}
+
+    def store(name, stream):
+        try:
+            filename = store_resume_blob(stream, RESUME_MAX_BYTES)
+        except ValueError as e:
+            print(f"[WARN] Skipping {name} in bulk upload: {e}")
+            return
+        if filename in saved:
+            release_resume_blob(filename)
+            return
+        saved[filename] = secure_filename(name)
+
+    try:
+        for file in files:
+            if file.filename.lower().endswith('.zip'):
+                with zipfile.ZipFile(file.stream) as archive:
+                    for member in archive.infolist():
+                        name = os.path.basename(member.filename)
+                        # Skip folders, macOS metadata (._name) and oversized members
+                        if member.is_dir() or name.startswith('.') or not allowed_file(name):
+                            continue
+                        if member.file_size > RESUME_MAX_BYTES or len(saved) >= BULK_UPLOAD_MAX_FILES:
+                            continue
+                        with archive.open(member) as stream:
+                            store(name, stream)
+            elif allowed_file(file.filename) and len(saved) < BULK_UPLOAD_MAX_FILES:
+                store(file.filename, file.stream)
+    except Exception:
+        for filename in saved:
+            release_resume_blob(filename)
+        raise
+    return saved
+
+def queue_bulk_screening(files, employer, selected_job, job_description_text):
+    """Save a multi-file or ZIP upload and queue one task that screens every PDF in it."""
+    try:
+        filenames = save_bulk_upload(files)
+    except zipfile.BadZipFile:
+        flash("The uploaded ZIP archive could not be opened.", "error")
+        return redirect(url_for("employer_dashboard"))
+
+    if not filenames:
+        flash("No PDF resumes found in the upload.", "error")
+        return redirect(url_for("employer_dashboard"))
+
+    task = enqueue_screening_task(
+        employer_id=employer.id,
+        job_id=selected_job.id if selected_job else None,
+        job_description_text=None if selected_job else job_description_text,
+        upload_filenames=json.dumps(filenames)
+    )
+    print(f"[OK] Bulk screening task queued: Task ID={task.id}, Files={len(filenames)}, Job ID={task.job_id}")
+    return redirect(url_for("screening_task_page", task_id=task.id))
+
 # Make sure your helper function also uses clean, standard indentation
 def extract_applicant_name(resume_text):
     """Attempt to extract applicant name from the first few lines."""
@@ -1412,7 +4882,7 @@ def resume_screening_submit():
 @app.route("/download_screening/<filename>")
 def download_screening(filename):
     try:
-        return send_from_directory(SCREENING_FOLDER, filename, as_attachment=True)
+        return send_from_directory(resume_directory(filename), filename, as_attachment=True)
     except FileNotFoundError:
         flash("Screening file not found.", "error")
         return redirect(url_for("employer_dashboard"))
@@ -1519,10 +4989,13 @@ def edit_profile():
                         os.makedirs(upload_dir)
                     
                     filepath = os.path.join(upload_dir, unique_filename)
-                    photo_file.save(filepath)
-                    
-                    # Update applicant record
-                    applicant.photo_filename = unique_filename
+                    try:
+                        save_upload(photo_file.stream, filepath, PHOTO_MAX_BYTES, file_ext)
+                    except ValueError as e:
+                        flash(f"Photo was not uploaded: {e}", "error")
+                    else:
+                        # Update applicant record
+                        applicant.photo_filename = unique_filename
                 else:
                     flash("Invalid image format. Please upload PNG, JPG, JPEG, GIF, or WEBP.", "error")
         
@@ -1569,4 +5042,6 @@ if __name__ == "__main__":
     with app.app_context():
         # hash_plaintext_passwords()   <-- remove/comment this
         db.create_all()
+        create_resume_search_table(db.session.connection())
+        db.session.commit()
     app.run(debug=True)
@@ -0,0 +1,122 @@
+"""
+Query plans and timings for the hot lookup queries, with and without the
+indexes from migration 0001_hot_lookup_indexes.
+
+Usage:
+    python benchmark_indexes.py                      # scratch SQLite database
+    BENCH_DATABASE_URL=postgresql://... python benchmark_indexes.py
+
+The target database is filled with synthetic rows and its tables are dropped at
+the end, so never point it at a real database.
+"""
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+ROWS = int(os.getenv("BENCH_ROWS", "100000"))
+REPEAT = 200
+
+SCHEMA = [
+    'CREATE TABLE "User" (id INTEGER PRIMARY KEY, username VARCHAR(255), password VARCHAR(255), role VARCHAR(50))',
+    'CREATE TABLE applicant (id INTEGER PRIMARY KEY, user_id INTEGER, fullname VARCHAR(100), email VARCHAR(255))',
+    'CREATE TABLE employer (id INTEGER PRIMARY KEY, user_id INTEGER, fullname VARCHAR(100), email VARCHAR(100), company VARCHAR(100))',
+    'CREATE TABLE "Job" (id INTEGER PRIMARY KEY, title VARCHAR(150), status VARCHAR(20), employer_id INTEGER, created_at TIMESTAMP)',
+    'CREATE TABLE "Application" (id INTEGER PRIMARY KEY, applicant_id INTEGER, job_id INTEGER, status VARCHAR(50))',
+    'CREATE TABLE resume (id INTEGER PRIMARY KEY, applicant_id INTEGER, filename VARCHAR(255))',
+    'CREATE TABLE screening (id INTEGER PRIMARY KEY, employer_id INTEGER, match_score FLOAT, screened_at TIMESTAMP)',
+]
+
+INDEXES = [
+    'CREATE INDEX ix_user_username_lower ON "User" (lower(username))',
+    'CREATE INDEX ix_applicant_email_lower ON applicant (lower(email))',
+    'CREATE INDEX ix_employer_email_lower ON employer (lower(email))',
+    'CREATE INDEX ix_job_status_created_at ON "Job" (lower(status), created_at)',
+    'CREATE INDEX ix_job_employer_id ON "Job" (employer_id)',
+    'CREATE INDEX ix_resume_applicant_id ON resume (applicant_id)',
+    'CREATE INDEX ix_screening_employer_screened_at ON screening (employer_id, screened_at)',
+    'CREATE UNIQUE INDEX uq_application_applicant_job ON "Application" (applicant_id, job_id)',
+]
+
+# (label, SQL, parameters) mirroring the queries issued by app.py
+QUERIES = [
+    ("login: username lookup", 'SELECT id FROM "User" WHERE lower(username) = :v', lambda: {"v": f"user{random.randrange(ROWS)}"}),
+    ("signup: applicant email", "SELECT id FROM applicant WHERE lower(email) = :v", lambda: {"v": f"a{random.randrange(ROWS)}@x.com"}),
+    ("signup: employer email", "SELECT id FROM employer WHERE lower(email) = :v", lambda: {"v": f"e{random.randrange(ROWS // 10)}@x.com"}),
+    ("applicant dashboard: latest approved jobs",
+     'SELECT id FROM "Job" WHERE lower(status) = \'approved\' ORDER BY created_at DESC LIMIT 10', dict),
+    ("employer's jobs", 'SELECT id FROM "Job" WHERE employer_id = :v', lambda: {"v": random.randrange(ROWS // 10)}),
+    ("already applied?", 'SELECT id FROM "Application" WHERE applicant_id = :a AND job_id = :j',
+     lambda: {"a": random.randrange(ROWS), "j": random.randrange(ROWS)}),
+    ("applicant's resumes", "SELECT id FROM resume WHERE applicant_id = :v", lambda: {"v": random.randrange(ROWS)}),
+    ("employer's screenings, newest first",
+     "SELECT id FROM screening WHERE employer_id = :v ORDER BY screened_at DESC LIMIT 25", lambda: {"v": random.randrange(ROWS // 10)}),
+]
+
+
+def populate(conn):
+    employers = ROWS // 10
+    conn.execute(text('INSERT INTO "User" VALUES (:id, :u, :p, :r)'),
+                 [{"id": i, "u": f"User{i}", "p": "x", "r": "applicant"} for i in range(ROWS)])
+    conn.execute(text("INSERT INTO applicant VALUES (:id, :id, :n, :e)"),
+                 [{"id": i, "n": f"Applicant {i}", "e": f"A{i}@x.com"} for i in range(ROWS)])
+    conn.execute(text("INSERT INTO employer VALUES (:id, :id, :n, :e, :c)"),
+                 [{"id": i, "n": f"Employer {i}", "e": f"E{i}@x.com", "c": f"Company {i}"} for i in range(employers)])
+    conn.execute(text('INSERT INTO "Job" VALUES (:id, :t, :s, :e, :c)'),
+                 [{"id": i, "t": f"Job {i}", "s": random.choice(["Approved", "pending", "Rejected"]),
+                   "e": i % employers, "c": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00:00"} for i in range(ROWS)])
+    conn.execute(text('INSERT INTO "Application" VALUES (:id, :a, :j, \'Submitted\')'),
+                 [{"id": i, "a": i, "j": (i * 7) % ROWS} for i in range(ROWS)])
+    conn.execute(text("INSERT INTO resume VALUES (:id, :a, :f)"),
+                 [{"id": i, "a": i, "f": f"resume_{i}.pdf"} for i in range(ROWS)])
+    conn.execute(text("INSERT INTO screening VALUES (:id, :e, :s, :t)"),
+                 [{"id": i, "e": i % employers, "s": random.random() * 100,
+                   "t": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00:00"} for i in range(ROWS)])
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+        return "; ".join(row[-1] for row in rows)
+    rows = conn.execute(text("EXPLAIN " + sql), params).fetchall()
+    return rows[0][0]
+
+
+def run(conn, phase):
+    print(f"\n== {phase} ==")
+    for label, sql, make_params in QUERIES:
+        plan = explain(conn, sql, make_params())
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            conn.execute(text(sql), make_params()).fetchall()
+        per_query_ms = (time.perf_counter() - start) * 1000 / REPEAT
+        print(f"{label:38s} {per_query_ms:8.3f} ms  {plan}")
+
+
+def main():
+    url = os.getenv("BENCH_DATABASE_URL") or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(url)
+    print(f"{engine.dialect.name}, {ROWS} rows per table")
+
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        populate(conn)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+            run(conn, "before (primary keys only)")
+            for statement in INDEXES:
+                conn.execute(text(statement))
+            conn.execute(text("ANALYZE"))
+            run(conn, "after 0001_hot_lookup_indexes")
+    finally:
+        with engine.begin() as conn:
+            for table in ("screening", "resume", '"Application"', '"Job"', "employer", "applicant", '"User"'):
+                conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+if __name__ == "__main__":
+    main()
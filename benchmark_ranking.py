@@ -0,0 +1,75 @@
+"""
+Top-K candidate ranking latency over a large synthetic resume corpus: the BM25
+index with max-score pruning against scoring every posting, and a check that
+both return the same scores. Run it at several BENCH_ROWS to check where
+RANKING_PRUNE_MIN_DOCUMENTS should sit (pruning pays off from about 50k).
+
+Usage:
+    python benchmark_ranking.py
+
+Options (env): BENCH_ROWS resumes (default 100000), BENCH_K (default 50).
+Runs against an in-memory index (and an empty scratch SQLite database) only.
+"""
+import os
+import tempfile
+import time
+
+ROWS = int(os.getenv("BENCH_ROWS", "100000"))
+K = int(os.getenv("BENCH_K", "50"))
+REPEAT = 20
+VOCABULARY = 30000
+STOP_WORDS = 300  # Most common words, not indexed
+PROFESSIONS = 40
+PROFESSION_WORDS = 300
+RESUME_WORDS = (150, 100)  # General words, words of the resume's profession
+JOB_WORDS = (30, 60)
+
+
+def main():
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["RANKING_PRELOAD"] = "0"
+    from collections import Counter
+    import numpy as np
+    import app as smarthire
+
+    # Zipf-like general vocabulary as in natural text, plus a vocabulary per profession
+    # that resumes and job descriptions of that profession draw from
+    rng = np.random.default_rng(7)
+    words = np.array([f"w{n}" for n in range(VOCABULARY)])
+    weights = 1 / np.arange(STOP_WORDS + 1, STOP_WORDS + VOCABULARY + 1)
+    weights /= weights.sum()
+    professions = [rng.choice(VOCABULARY, PROFESSION_WORDS, replace=False) for _ in range(PROFESSIONS)]
+
+    def text(profession, general, specific):
+        sample = np.concatenate([rng.choice(VOCABULARY, general, p=weights),
+                                 professions[profession][rng.integers(0, PROFESSION_WORDS, specific)]])
+        return words[sample].tolist()
+
+    start = time.perf_counter()
+    index = smarthire.RankingIndex()
+    for resume_id in range(1, ROWS + 1):
+        index.add(resume_id, str(resume_id), Counter(text(resume_id % PROFESSIONS, *RESUME_WORDS)))
+    print(f"{ROWS} resumes, {len(index.postings)} terms, built in {time.perf_counter() - start:.1f}s")
+
+    queries = [text(n % PROFESSIONS, *JOB_WORDS) for n in range(REPEAT)]
+    for label, prune in (("exhaustive", False), ("max-score pruning", True)):
+        latencies = []
+        for terms in queries:
+            start = time.perf_counter()
+            index.top_k(terms, K, prune=prune)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"{label:20s} p50 {latencies[len(latencies) // 2] * 1000:8.1f} ms   max {latencies[-1] * 1000:8.1f} ms")
+
+    matches = sum(
+        [round(score, 6) for _, score in index.top_k(terms, K, prune=False)]
+        == [round(score, 6) for _, score in index.top_k(terms, K, prune=True)]
+        for terms in queries
+    )
+    print(f"top-{K} scores identical to exhaustive: {matches}/{REPEAT}")
+    default = "pruning" if ROWS >= smarthire.RANKING_PRUNE_MIN_DOCUMENTS else "exhaustive"
+    print(f"default at this size: {default} (RANKING_PRUNE_MIN_DOCUMENTS={smarthire.RANKING_PRUNE_MIN_DOCUMENTS})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Scoring one job against a large memory-mapped resume vector segment: one sparse
+matrix-vector product over the mapping, against vectorizing the same resumes
+from their text, and how much private (unshared) memory the worker gains.
+
+Usage:
+    python benchmark_resume_vectors.py
+
+Options (env): BENCH_ROWS resumes (default 500000), BENCH_TERMS stored terms per
+resume (default 150). Writes the segment into a scratch folder only.
+"""
+import os
+import tempfile
+import time
+
+ROWS = int(os.getenv("BENCH_ROWS", "500000"))
+TERMS = int(os.getenv("BENCH_TERMS", "150"))
+FEATURES = 50000
+TEXT_SAMPLE = 2000  # Resumes vectorized from text (the old path), scaled up to ROWS
+
+
+def private_memory_mb():
+    # Linux only: memory of this process not shared with other processes (or the page cache)
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return float("nan")
+    return sum(int(fields[key].split()[0]) for key in ("Private_Clean", "Private_Dirty", "Anonymous") if key in fields) / 1024
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "bench.db")
+    os.environ["RANKING_PRELOAD"] = "0"
+    import numpy as np
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    import app as smarthire
+    smarthire.RESUME_VECTOR_FOLDER = os.path.join(workdir, "resume_vectors")
+
+    rng = np.random.default_rng(7)
+    start = time.perf_counter()
+    writer = smarthire._ResumeVectorWriter("bench")
+    hashes = np.sort(np.array([f"{n:064x}" for n in range(ROWS)], dtype="S64"))
+    for first in range(0, ROWS, 10000):
+        rows = min(10000, ROWS - first)
+        block = sparse.random(rows, FEATURES, density=TERMS / FEATURES, format="csr", dtype=np.float32, random_state=rng)
+        block = sparse.csr_matrix(block.multiply(1 / np.sqrt(block.multiply(block).sum(axis=1))))
+        writer.write(hashes[first:first + rows], block)
+    writer.close("bench", FEATURES)
+    print(f"{ROWS} resumes x {TERMS} terms written in {time.perf_counter() - start:.1f}s")
+
+    segment = smarthire.ResumeVectorSegment("bench")
+    job_vector = np.zeros(FEATURES, dtype=np.float32)
+    job_vector[rng.choice(FEATURES, 60, replace=False)] = 1 / np.sqrt(60)
+    keys = [key.decode() for key in hashes]
+
+    segment.similarities(keys, job_vector)  # Warm the page cache
+    before = private_memory_mb()
+    latencies = []
+    for _ in range(5):
+        start = time.perf_counter()
+        segment.similarities(keys, job_vector)
+        latencies.append(time.perf_counter() - start)
+    print(f"mapped segment      {min(latencies) * 1000:9.1f} ms per job (hash lookup + one product), "
+          f"private memory +{private_memory_mb() - before:.1f} MB")
+
+    vocabulary = [f"w{n}" for n in range(FEATURES)]
+    texts = [" ".join(rng.choice(vocabulary, TERMS)) for _ in range(TEXT_SAMPLE)]
+    vectorizer = TfidfVectorizer().fit(texts)
+    start = time.perf_counter()
+    vectorizer.transform(texts)
+    elapsed = (time.perf_counter() - start) * ROWS / TEXT_SAMPLE
+    print(f"vectorizing text    {elapsed * 1000:9.1f} ms per job (extrapolated from {TEXT_SAMPLE} resumes)")
+    print(f"segment on disk     {sum(os.path.getsize(os.path.join(segment.path, f)) for f in os.listdir(segment.path)) / 2 ** 20:9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Candidate search latency over a large synthetic resume set, through the real
+/api/employer/resumes/search endpoint.
+
+Usage:
+    python benchmark_search.py                          # scratch SQLite (FTS5)
+    BENCH_DATABASE_URL=postgresql://... python benchmark_search.py
+
+Options (env): BENCH_ROWS resumes (default 100000).
+The target database is filled with test rows, so never point it at a real database.
+"""
+import os
+import random
+import tempfile
+import time
+
+ROWS = int(os.getenv("BENCH_ROWS", "100000"))
+REPEAT = 20
+BATCH = 5000
+
+SKILLS = ["python", "java", "javascript", "react", "flask", "django", "sql", "postgresql", "docker", "kubernetes",
+          "aws", "azure", "terraform", "linux", "networking", "excel", "accounting", "nursing", "marketing", "sales",
+          "tableau", "pandas", "spark", "golang", "rust", "figma", "photoshop", "seo", "recruitment", "payroll"]
+FILLER = ("experience team project managed developed responsible company years worked support customer data "
+          "system design reports business client training quality process service analysis university degree").split()
+
+# (label, query, extra parameters)
+QUERIES = [
+    ("common word", "python", {}),
+    ("two words", "python docker", {}),
+    ("prefix while typing", "kuber", {}),
+    ("rare word", "payroll tableau golang", {}),
+    ("no match", "blockchainz", {}),
+]
+
+
+def resume_text(rng):
+    words = rng.sample(SKILLS, 4) + [rng.choice(FILLER) for _ in range(150)]
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or "sqlite:///" + os.path.join(workdir, "bench.db")
+    os.environ.setdefault("SCREENING_INLINE_WORKERS", "0")
+    import app as smarthire
+    db = smarthire.db
+    rng = random.Random(7)
+
+    with smarthire.app.app_context():
+        db.create_all()
+        smarthire.create_resume_search_table(db.session.connection())
+        user = smarthire.User(username="bench_employer", password="x", role="employer")
+        db.session.add(user)
+        db.session.flush()
+        employer = smarthire.Employer(user_id=user.id, fullname="Bench", email="bench@example.com", company="Bench")
+        db.session.add(employer)
+        db.session.commit()
+        employer_user_id, employer_id = user.id, employer.id
+
+        start = time.perf_counter()
+        id_column = smarthire.search_id_column(db.session.connection())
+        for first in range(1, ROWS + 1, BATCH):
+            ids = range(first, min(first + BATCH, ROWS + 1))
+            texts = {i: resume_text(rng) for i in ids}
+            db.session.execute(smarthire.insert(smarthire.Resume), [
+                {"id": i, "filename": f"bench_{i}.pdf", "owner_name": f"Candidate {i}"} for i in ids])
+            # Every resume is visible to the employer through a screening
+            db.session.execute(smarthire.insert(smarthire.Screening), [
+                {"resume_id": i, "employer_id": employer_id, "job_description_text": "Bench", "matched_skills": ", ".join(texts[i].split()[:2]),
+                 "match_score": 50.0} for i in ids])
+            db.session.execute(db.text(
+                f"INSERT INTO resume_search ({id_column}, owner_name, skills, matched_skills, body) "
+                "VALUES (:id, :name, '', '', :body)"), [{"id": i, "name": f"Candidate {i}", "body": texts[i]} for i in ids])
+            db.session.commit()
+        backend = db.engine.dialect.name
+        print(f"{backend}, {ROWS} resumes indexed in {time.perf_counter() - start:.1f}s")
+
+    client = smarthire.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = employer_user_id
+        session["role"] = "employer"
+
+    for label, q, params in QUERIES:
+        timings, first_page = [], None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            response = client.get("/api/employer/resumes/search", query_string=dict(q=q, **params))
+            timings.append(time.perf_counter() - start)
+            first_page = response.get_json()
+        timings.sort()
+        next_ms = ""
+        if first_page.get("next_cursor"):
+            start = time.perf_counter()
+            client.get("/api/employer/resumes/search", query_string={"q": q, "after": first_page["next_cursor"]})
+            next_ms = f", page 2: {(time.perf_counter() - start) * 1000:.1f} ms"
+        print(f"{label:22s} p50 {timings[len(timings) // 2] * 1000:7.1f} ms, p95 {timings[int(len(timings) * 0.95)] * 1000:7.1f} ms"
+              f"  ({len(first_page['items'])} hits on page 1{next_ms})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,139 @@
-# db_connector.py - Save this file in the 'myproject' directory
+# db_connector.py - Pooled data-access helpers for reporting scripts
 
-import mysql.connector
-from mysql.connector import Error
+import os
+from flask import current_app, has_app_context
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
 
-# --- Configuration for XAMPP MySQL ---
-HOST = "localhost"
-USER = "root"
-PASSWORD = ""  # The default password in XAMPP is usually empty
-DATABASE = "smartHire" # Confirmed from your previous phpMyAdmin image
+# --- Configuration ---
+# Same database and pool settings as app.py. Inside the Flask app the app's engine
+# (and its pool) is shared; standalone scripts get one lazily created pooled engine.
+DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///instance/smarthire.db')
+# app.py's instance folder: Flask-SQLAlchemy resolves relative SQLite paths against it
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+STREAM_BATCH_SIZE = 1000
+
+_engine = None
+
+def resolve_database_url(database_url):
+    """The URL app.py connects to for database_url: relative SQLite paths point into its instance folder."""
+    url = make_url(database_url)
+    if url.drivername not in {'sqlite', 'sqlite+pysqlite'} or url.database in (None, '', ':memory:'):
+        return url
+    # The URL might look like sqlite:///file:path?uri=true
+    is_uri = url.query.get('uri', False)
+    path = url.database[5:] if is_uri else url.database
+    if os.path.isabs(path):
+        return url
+    path = os.path.join(INSTANCE_PATH, path)
+    return url.set(database=f"file:{path}" if is_uri else path)
+
+def get_engine():
+    """Return the app's SQLAlchemy engine inside an app context, otherwise a module-wide pooled engine."""
+    global _engine
+    if has_app_context() and 'sqlalchemy' in current_app.extensions:
+        return current_app.extensions['sqlalchemy'].engine
+    if _engine is None:
+        options = {}
+        if not DATABASE_URL.startswith('sqlite'):
+            options = {
+                'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+                'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+                'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+                'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+                'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+            }
+        _engine = create_engine(resolve_database_url(DATABASE_URL), **options)
+    return _engine
 
 def get_db_connection():
     """
-    Attempts to establish and return a new connection object to the 'smartHire' database.
-    Always returns a new connection object if successful, or None if it fails.
+    Check out a connection from the pool, or None if the database is unreachable.
+    Closing it returns it to the pool instead of tearing it down.
     """
     try:
-        conn = mysql.connector.connect(
-            host=HOST,
-            user=USER,
-            password=PASSWORD,
-            database=DATABASE
-        )
-        return conn
-    except Error as e:
+        return get_engine().connect()
+    except SQLAlchemyError as e:
         # Print a clear error message if the connection fails
         print("----------------------------------------------------------------------")
-        print("!!! Database Connection Error. Ensure XAMPP MySQL is RUNNING and")
-        print(f"!!! the database '{DATABASE}' exists. Error details: {e}")
+        print(f"!!! Database Connection Error for {get_engine().url!r}. Error details: {e}")
         print("----------------------------------------------------------------------")
         return None
 
-# Simple function to get data, using dictionary cursors for easy column access
+def _execute(conn, sql_query, params):
+    # Named parameters (:name with a dict) go through text(); a tuple/list keeps the driver's own
+    # placeholder style (%s / ?) like the old mysql.connector helper
+    if isinstance(params, (tuple, list)):
+        return conn.exec_driver_sql(sql_query, tuple(params))
+    return conn.execute(text(sql_query), params or {})
+
+# Simple function to get data, returning rows as dictionaries for easy column access
 def fetch_data(sql_query, params=None):
     """Executes a SELECT query and returns the results as a list of dictionaries."""
     conn = get_db_connection()
     results = []
 
     if conn is not None:
-        # Use dictionary=True so results are returned as dictionaries instead of tuples
-        cursor = conn.cursor(dictionary=True) 
         try:
-            cursor.execute(sql_query, params or ())
-            results = cursor.fetchall()
-        except Exception as e:
+            results = [dict(row) for row in _execute(conn, sql_query, params).mappings()]
+        except SQLAlchemyError as e:
             print(f"Database Query Error: {e}")
         finally:
-            cursor.close()
             conn.close()
-    
-    return results
\ No newline at end of file
+
+    return results
+
+def stream_data(sql_query, params=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    Yield the rows of a large SELECT as dictionaries without loading the whole result.
+    Uses a server-side cursor where the driver supports one (PostgreSQL, MySQL) and
+    fetches batch_size rows at a time.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        return
+
+    try:
+        conn = conn.execution_options(stream_results=True, yield_per=batch_size)
+        for row in _execute(conn, sql_query, params).mappings():
+            yield dict(row)
+    except SQLAlchemyError as e:
+        print(f"Database Query Error: {e}")
+    finally:
+        conn.close()
+
+def execute_many(sql_query, rows, batch_size=STREAM_BATCH_SIZE):
+    """
+    Run an INSERT/UPDATE/DELETE once per row (dicts for :name parameters, tuples for the
+    driver's placeholders) in batches of batch_size, all in one transaction.
+    Returns the number of affected rows, or None if it failed and was rolled back.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        return None
+
+    affected = 0
+    try:
+        with conn.begin():
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    affected += _execute_batch(conn, sql_query, batch)
+                    batch = []
+            if batch:
+                affected += _execute_batch(conn, sql_query, batch)
+        return affected
+    except SQLAlchemyError as e:
+        print(f"Database Write Error: {e}")
+        return None
+    finally:
+        conn.close()
+
+def _execute_batch(conn, sql_query, batch):
+    if isinstance(batch[0], (tuple, list)):
+        result = conn.exec_driver_sql(sql_query, [tuple(row) for row in batch])
+    else:
+        result = conn.execute(text(sql_query), batch)
+    return max(result.rowcount, 0)
@@ -0,0 +1,16 @@
+# gunicorn.conf.py - read automatically by `gunicorn app:app` (Procfile, render.yaml, Dockerfile)
+import os
+
+# SPACY_PRELOAD=1: import the app once in the master, which loads the spaCy model
+# before forking, so every worker shares the model memory copy-on-write instead
+# of loading its own copy.
+preload_app = os.getenv('SPACY_PRELOAD', '0') == '1'
+
+
+def post_worker_init(worker):
+    from app import preload_ranking_index, start_email_sender, start_screening_workers
+    # Pick up screening tasks and outbox emails queued (or requeued) before this worker started
+    start_screening_workers()
+    start_email_sender()
+    # Load the candidate ranking index as each worker starts (RANKING_PRELOAD=0: on first use)
+    preload_ranking_index()
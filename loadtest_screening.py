@@ -0,0 +1,134 @@
+"""
+Concurrent screening load test: several worker processes (like gunicorn
+workers) post /screen-existing-resume at the same time against one database.
+Each request queues a screening task for its own job (so none is served from
+the memoized screenings), and the clock stops once every task is finished by
+the workers' screening threads.
+
+Usage:
+    python loadtest_screening.py                          # scratch SQLite, tuned pragmas
+    SQLITE_JOURNAL_MODE=DELETE SQLITE_BUSY_TIMEOUT_MS=0 python loadtest_screening.py
+    LOADTEST_DATABASE_URL=postgresql://... python loadtest_screening.py
+
+Options (env): LOADTEST_WORKERS (default 4), LOADTEST_REQUESTS per worker (default 50),
+LOADTEST_TIMEOUT seconds to wait for the queued tasks (default 600).
+The target database is filled with test rows, so never point it at a real database.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+WORKERS = int(os.getenv("LOADTEST_WORKERS", "4"))
+REQUESTS = int(os.getenv("LOADTEST_REQUESTS", "50"))
+TIMEOUT = int(os.getenv("LOADTEST_TIMEOUT", "600"))
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "screenings", "JaneDoe_Resume.pdf")
+
+
+def worker(upload_folder, employer_user_id, resume_id, job_ids, start_event, done_barrier, results):
+    import app as smarthire
+    smarthire.app.config["UPLOAD_FOLDER"] = upload_folder
+    client = smarthire.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = employer_user_id
+        session["role"] = "employer"
+
+    start_event.wait()
+    latencies, task_ids, errors = [], [], 0
+    for job_id in job_ids:
+        start = time.perf_counter()
+        response = client.post("/screen-existing-resume", data={"resume_id": resume_id, "job_id": job_id})
+        latencies.append(time.perf_counter() - start)
+        # Success is a redirect to the task's page
+        location = response.headers.get("Location", "")
+        if response.status_code == 302 and "/screenings/tasks/" in location:
+            task_ids.append(int(location.rstrip("/").rsplit("/", 1)[-1]))
+        else:
+            errors += 1
+
+    # Wait for this process's screening threads (and the other workers') to finish the tasks
+    deadline = time.monotonic() + TIMEOUT
+    pending = set(task_ids)
+    while pending and time.monotonic() < deadline:
+        for task_id in list(pending):
+            if client.get(f"/api/screenings/tasks/{task_id}").get_json()["status"] in ("done", "failed"):
+                pending.discard(task_id)
+        time.sleep(0.2)
+    results.put((latencies, errors, len(pending)))
+    # Stay up until every worker is done: this process's threads may be running another worker's task
+    try:
+        done_barrier.wait(TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = os.getenv("LOADTEST_DATABASE_URL") or "sqlite:///" + os.path.join(workdir, "loadtest.db")
+    upload_folder = os.path.join(workdir, "uploads")
+    os.makedirs(upload_folder)
+    shutil.copy(SAMPLE_RESUME, os.path.join(upload_folder, "loadtest_resume.pdf"))
+
+    import app as smarthire
+    with smarthire.app.app_context():
+        db = smarthire.db
+        db.create_all()
+        user = smarthire.User(username="loadtest_employer", password="x", role="employer")
+        db.session.add(user)
+        db.session.flush()
+        employer = smarthire.Employer(user_id=user.id, fullname="Load Test", email="loadtest@example.com", company="Load Test")
+        db.session.add(employer)
+        db.session.flush()
+        # One job per request: repeats of the same resume and job are served from the memoized screening
+        jobs = [smarthire.Job(title=f"Python Developer {n}", company="Load Test", employer_id=employer.id, status="Approved",
+                              description=f"Python, Flask, SQL, Docker and AWS experience required (opening {n})")
+                for n in range(WORKERS * REQUESTS)]
+        resume = smarthire.Resume(filename="loadtest_resume.pdf", owner_name="Jane Doe")
+        db.session.add_all(jobs + [resume])
+        db.session.commit()
+        job_ids = [job.id for job in jobs]
+        user_id, resume_id = user.id, resume.id
+        before = smarthire.Screening.query.count()
+        backend = db.engine.dialect.name
+        db.engine.dispose()
+
+    context = multiprocessing.get_context("fork")
+    start_event, done_barrier, results = context.Event(), context.Barrier(WORKERS), context.Queue()
+    processes = [
+        context.Process(target=worker, args=(upload_folder, user_id, resume_id,
+                                             job_ids[n * REQUESTS:(n + 1) * REQUESTS], start_event, done_barrier, results))
+        for n in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(2)  # let every worker finish importing
+
+    start = time.perf_counter()
+    start_event.set()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    with smarthire.app.app_context():
+        saved = smarthire.Screening.query.count() - before
+
+    latencies = sorted(latency for worker_latencies, _, _ in outcomes for latency in worker_latencies)
+    total = WORKERS * REQUESTS
+    settings = ""
+    if backend == "sqlite":
+        settings = (f" journal_mode={smarthire.SQLITE_JOURNAL_MODE} busy_timeout={smarthire.SQLITE_BUSY_TIMEOUT_MS}ms"
+                    f" synchronous={smarthire.SQLITE_SYNCHRONOUS}")
+    print(f"{backend}{settings}, {WORKERS} workers x {REQUESTS} requests")
+    print(f"  throughput: {saved / elapsed:.1f} screenings/s saved ({elapsed:.2f}s until every task finished)")
+    print(f"  queueing latency p50: {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p95: {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms")
+    print(f"  saved: {saved}/{total}, failed responses: {sum(errors for _, errors, _ in outcomes)}, "
+          f"unfinished tasks: {sum(pending for _, _, pending in outcomes)}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""baseline schema: users, profiles, jobs, applications, resumes and screenings
+
+Revision ID: 0000_baseline_schema
+Revises:
+Create Date: 2026-10-18 04:20:11.402187
+
+The tables as db.create_all() made them before migrations were introduced, so
+`flask db upgrade` alone builds the whole schema on an empty database. Databases
+created with db.create_all() already have these tables and are left as they are;
+the later revisions bring them up to date.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0000_baseline_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'User' not in tables:
+        op.create_table(
+            'User',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=255), nullable=False),
+            sa.Column('password', sa.String(length=255), nullable=False),
+            sa.Column('role', sa.String(length=50), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'applicant' not in tables:
+        op.create_table(
+            'applicant',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('fullname', sa.String(length=100), nullable=False),
+            sa.Column('target_job', sa.String(length=255), nullable=True),
+            sa.Column('email', sa.String(length=255), nullable=True),
+            sa.Column('contact_number', sa.String(length=50), nullable=True),
+            sa.Column('skills', sa.Text(), nullable=True),
+            sa.Column('experience', sa.Integer(), nullable=True),
+            sa.Column('resume_filename', sa.String(length=255), nullable=True),
+            sa.Column('photo_filename', sa.String(length=255), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id'),
+        )
+
+    if 'employer' not in tables:
+        op.create_table(
+            'employer',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('fullname', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False),
+            sa.Column('company', sa.String(length=100), nullable=True),
+            sa.Column('phone', sa.String(length=20), nullable=True),
+            sa.Column('website', sa.String(length=100), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['User.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id'),
+        )
+
+    if 'resume' not in tables:
+        op.create_table(
+            'resume',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('owner_name', sa.String(length=255), nullable=False),
+            sa.Column('applicant_id', sa.Integer(), nullable=True),
+            sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['applicant_id'], ['applicant.user_id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'Job' not in tables:
+        op.create_table(
+            'Job',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=150), nullable=False),
+            sa.Column('company', sa.String(length=100), nullable=False),
+            sa.Column('description', sa.Text(), nullable=False),
+            sa.Column('location', sa.String(length=100), nullable=True),
+            sa.Column('job_type', sa.String(length=50), nullable=True),
+            sa.Column('salary', sa.String(length=50), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('employer_id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['employer_id'], ['employer.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'Application' not in tables:
+        op.create_table(
+            'Application',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('applicant_id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['applicant_id'], ['applicant.user_id']),
+            sa.ForeignKeyConstraint(['job_id'], ['Job.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'screening' not in tables:
+        op.create_table(
+            'screening',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('resume_id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.Integer(), nullable=True),
+            sa.Column('employer_id', sa.Integer(), nullable=True),
+            sa.Column('applicant_name', sa.String(length=150), nullable=True),
+            sa.Column('applicant_email', sa.String(length=150), nullable=True),
+            sa.Column('applicant_phone', sa.String(length=50), nullable=True),
+            sa.Column('job_description_text', sa.Text(), nullable=False),
+            sa.Column('matched_skills', sa.Text(), nullable=True),
+            sa.Column('match_score', sa.Float(), nullable=True),
+            sa.Column('resume_text_summary', sa.Text(), nullable=True),
+            sa.Column('screened_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['resume_id'], ['resume.id']),
+            sa.ForeignKeyConstraint(['job_id'], ['Job.id']),
+            sa.ForeignKeyConstraint(['employer_id'], ['employer.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def downgrade():
+    for table in ('screening', 'Application', 'Job', 'resume', 'employer', 'applicant', 'User'):
+        op.drop_table(table)
@@ -0,0 +1,72 @@
+"""index and constraint pack for hot lookup columns
+
+Revision ID: 0001_hot_lookup_indexes
+Revises: 0000_baseline_schema
+Create Date: 2026-10-18 04:30:25.039711
+
+Existing databases were created with db.create_all(), so this revision only
+adds what the models now declare in __table_args__. Indexes that already
+exist (e.g. on a database created after this change) are skipped, which makes it
+safe to run `flask db upgrade` on any of them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_hot_lookup_indexes'
+down_revision = '0000_baseline_schema'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns or SQL expressions, unique)
+INDEXES = [
+    ('ix_user_username_lower', 'User', [sa.text('lower(username)')], False),
+    ('ix_applicant_email_lower', 'applicant', [sa.text('lower(email)')], False),
+    ('ix_applicant_fullname_lower', 'applicant', [sa.text('lower(fullname)')], False),
+    ('ix_employer_email_lower', 'employer', [sa.text('lower(email)')], False),
+    ('ix_employer_fullname_lower', 'employer', [sa.text('lower(fullname)')], False),
+    ('ix_job_status_created_at', 'Job', [sa.text('lower(status)'), 'created_at'], False),
+    ('ix_job_employer_id', 'Job', ['employer_id'], False),
+    ('ix_resume_applicant_id', 'resume', ['applicant_id'], False),
+    ('ix_screening_employer_screened_at', 'screening', ['employer_id', 'screened_at'], False),
+    ('uq_application_applicant_job', 'Application', ['applicant_id', 'job_id'], True),
+]
+
+
+def _existing_indexes(inspector, table):
+    if inspector.bind.dialect.name == 'sqlite':
+        # SQLite reflection skips expression indexes, so read the names from the catalog
+        rows = inspector.bind.execute(
+            sa.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"), {'table': table}
+        )
+        return {row[0] for row in rows}
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Keep the oldest row of each duplicate (applicant_id, job_id) pair so the unique index can be built
+    op.execute(
+        'DELETE FROM "Application" WHERE id NOT IN '
+        '(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM "Application" '
+        'GROUP BY applicant_id, job_id) AS keep)'
+    )
+
+    for name, table, columns, unique in INDEXES:
+        if name in _existing_indexes(inspector, table):
+            continue
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    for name, table, _, _ in reversed(INDEXES):
+        if name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,53 @@
+"""screening task queue table
+
+Revision ID: 0002_screening_task
+Revises: 0001_hot_lookup_indexes
+Create Date: 2026-10-18 09:12:47.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_screening_task'
+down_revision = '0001_hot_lookup_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created with db.create_all() after this change already have the table
+    if 'screening_task' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'screening_task',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('employer_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=True),
+        sa.Column('job_description_text', sa.Text(), nullable=True),
+        sa.Column('resume_id', sa.Integer(), nullable=True),
+        sa.Column('upload_filename', sa.String(length=255), nullable=True),
+        sa.Column('screening_id', sa.Integer(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['employer_id'], ['employer.id']),
+        sa.ForeignKeyConstraint(['job_id'], ['Job.id']),
+        sa.ForeignKeyConstraint(['resume_id'], ['resume.id']),
+        sa.ForeignKeyConstraint(['screening_id'], ['screening.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_screening_task_status_id', 'screening_task', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    if 'screening_task' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.drop_index('ix_screening_task_status_id', table_name='screening_task')
+    op.drop_table('screening_task')
@@ -0,0 +1,31 @@
+"""bulk upload file list on screening tasks
+
+Revision ID: 0003_bulk_screening_uploads
+Revises: 0002_screening_task
+Create Date: 2026-10-18 11:40:03.264871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_bulk_screening_uploads'
+down_revision = '0002_screening_task'
+branch_labels = None
+depends_on = None
+
+
+def _columns():
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns('screening_task')}
+
+
+def upgrade():
+    if 'upload_filenames' not in _columns():
+        op.add_column('screening_task', sa.Column('upload_filenames', sa.Text(), nullable=True))
+
+
+def downgrade():
+    if 'upload_filenames' in _columns():
+        # Plain ALTER TABLE ... DROP COLUMN (SQLite 3.35+), no table rebuild needed
+        op.drop_column('screening_task', 'upload_filenames')
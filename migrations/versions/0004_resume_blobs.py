@@ -0,0 +1,37 @@
+"""content-addressed resume file store
+
+Revision ID: 0004_resume_blobs
+Revises: 0003_bulk_screening_uploads
+Create Date: 2026-10-18 14:05:52.730416
+
+Existing resume files keep their names until `flask dedupe-resume-files`
+moves them into the blob store and counts their references.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_resume_blobs'
+down_revision = '0003_bulk_screening_uploads'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'resume_blob' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'resume_blob',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash'),
+    )
+
+
+def downgrade():
+    if 'resume_blob' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table('resume_blob')
@@ -0,0 +1,50 @@
+"""memoization key on screenings
+
+Revision ID: 0005_screening_memo
+Revises: 0004_resume_blobs
+Create Date: 2026-10-18 16:22:41.508213
+
+Screenings saved before this revision have no resume hash, so they are never
+served from the memo and keep their rows; the next screening of the same resume
+and job stores a memoized row next to them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_screening_memo'
+down_revision = '0004_resume_blobs'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = [
+    ('resume_hash', sa.String(length=64)),
+    ('job_version', sa.String(length=40)),
+    ('scoring_version', sa.String(length=20)),
+]
+INDEX = 'uq_screening_employer_job_resume'
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {column['name'] for column in inspector.get_columns('screening')}
+    for name, type_ in COLUMNS:
+        if name not in existing:
+            op.add_column('screening', sa.Column(name, type_, nullable=True))
+    if INDEX not in {index['name'] for index in inspector.get_indexes('screening')}:
+        # NULL resume hashes (older rows) never collide, so no cleanup is needed first
+        op.create_index(INDEX, 'screening', ['employer_id', 'job_id', 'resume_hash'], unique=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if INDEX in {index['name'] for index in inspector.get_indexes('screening')}:
+        op.drop_index(INDEX, table_name='screening')
+    existing = {column['name'] for column in inspector.get_columns('screening')}
+    for name, _ in reversed(COLUMNS):
+        if name in existing:
+            # Plain ALTER TABLE ... DROP COLUMN (SQLite 3.35+), no table rebuild needed
+            op.drop_column('screening', name)
@@ -0,0 +1,50 @@
+"""candidate search index
+
+Revision ID: 0007_resume_search
+Revises: 0006_email_outbox
+Create Date: 2026-10-18 19:26:37.802145
+
+An FTS5 table on SQLite, a table with a weighted tsvector column and a GIN
+index on PostgreSQL (other databases get no search). Existing resumes are not
+indexed here: run `flask rebuild-search-index` after upgrading, which also
+extracts the texts of resumes that were never screened.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_resume_search'
+down_revision = '0006_email_outbox'
+branch_labels = None
+depends_on = None
+
+
+DDL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS resume_search USING fts5("
+        "owner_name, skills, matched_skills, body, tokenize='porter unicode61')",
+    ],
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS resume_search ("
+        "resume_id INTEGER PRIMARY KEY, owner_name TEXT, skills TEXT, matched_skills TEXT, body TEXT, "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(owner_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(skills, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(matched_skills, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(body, '')), 'C')) STORED)",
+        "CREATE INDEX IF NOT EXISTS ix_resume_search_document ON resume_search USING GIN (document)",
+    ],
+}
+
+
+def upgrade():
+    for statement in DDL.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name in DDL:
+        # The GIN index goes with the table
+        op.execute("DROP TABLE IF EXISTS resume_search")
@@ -0,0 +1,35 @@
+"""normalize resume upload timestamps
+
+Revision ID: 0008_resume_uploaded_at
+Revises: 0007_resume_search
+Create Date: 2026-10-19 09:12:05.418230
+
+resume.uploaded_at used to default to the database's now(), which SQLite stores
+as 'YYYY-MM-DD HH:MM:SS', while SQLAlchemy writes (and binds cursors as)
+'YYYY-MM-DD HH:MM:SS.ffffff'. The two formats do not compare correctly as text,
+so keyset pages of resumes uploaded in the same second repeated forever. The
+column now defaults to datetime.utcnow; this pads the older rows to the same
+format. Other databases store real timestamps and need nothing.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_resume_uploaded_at'
+down_revision = '0007_resume_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    op.execute("UPDATE resume SET uploaded_at = uploaded_at || '.000000' WHERE length(uploaded_at) = 19")
+
+
+def downgrade():
+    # The padded values are valid in both formats
+    pass
@@ -0,0 +1,76 @@
+"""lower() indexes for the admin prefix searches
+
+Revision ID: 0009_prefix_search_indexes
+Revises: 0008_resume_uploaded_at
+Create Date: 2026-10-19 10:03:47.120584
+
+The admin listings search name/email/company columns by prefix. Adds the
+missing lower() indexes (employer company, job title and company, resume owner
+and file name). On PostgreSQL every searched column's index is built with
+text_pattern_ops, which LIKE 'abc%' can use whatever the database collation;
+the plain lower() indexes from 0001 are rebuilt that way (they still serve the
+equality lookups).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_prefix_search_indexes'
+down_revision = '0008_resume_uploaded_at'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, column, created by 0001)
+INDEXES = [
+    ('ix_applicant_email_lower', 'applicant', 'email', True),
+    ('ix_applicant_fullname_lower', 'applicant', 'fullname', True),
+    ('ix_employer_email_lower', 'employer', 'email', True),
+    ('ix_employer_fullname_lower', 'employer', 'fullname', True),
+    ('ix_employer_company_lower', 'employer', 'company', False),
+    ('ix_job_title_lower', 'Job', 'title', False),
+    ('ix_job_company_lower', 'Job', 'company', False),
+    ('ix_resume_owner_name_lower', 'resume', 'owner_name', False),
+    ('ix_resume_filename_lower', 'resume', 'filename', False),
+]
+
+
+def _existing_indexes(bind, table):
+    """Index name -> definition (SQLite reflection skips expression indexes, so read the catalogs)."""
+    if bind.dialect.name == 'sqlite':
+        query = "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"
+    elif bind.dialect.name == 'postgresql':
+        query = "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = :table"
+    else:
+        return {index['name']: '' for index in sa.inspect(bind).get_indexes(table)}
+    return {name: definition or '' for name, definition in bind.execute(sa.text(query), {'table': table})}
+
+
+def _create(bind, name, table, column):
+    if bind.dialect.name == 'postgresql':
+        op.execute(f'CREATE INDEX {name} ON "{table}" (lower({column}) text_pattern_ops)')
+    else:
+        op.create_index(name, table, [sa.text(f'lower({column})')])
+
+
+def upgrade():
+    bind = op.get_bind()
+    for name, table, column, _ in INDEXES:
+        existing = _existing_indexes(bind, table)
+        if name in existing:
+            if bind.dialect.name != 'postgresql' or 'text_pattern_ops' in existing[name]:
+                continue
+            op.drop_index(name, table_name=table)
+        _create(bind, name, table, column)
+
+
+def downgrade():
+    bind = op.get_bind()
+    for name, table, column, from_0001 in reversed(INDEXES):
+        if name not in _existing_indexes(bind, table):
+            continue
+        op.drop_index(name, table_name=table)
+        if from_0001:
+            op.create_index(name, table, [sa.text(f'lower({column})')])
@@ -0,0 +1,68 @@
+"""resume text, job vector and job skill tables
+
+Revision ID: 0010_cache_tables
+Revises: 0009_prefix_search_indexes
+Create Date: 2026-10-19 11:40:22.907316
+
+These tables were only ever created by db.create_all(), so a database brought
+up to date with `flask db upgrade` alone was missing them. Databases that
+already have them (created with db.create_all()) are left as they are.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_cache_tables'
+down_revision = '0009_prefix_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'resume_text' not in tables:
+        op.create_table(
+            'resume_text',
+            sa.Column('content_hash', sa.String(length=64), nullable=False),
+            sa.Column('text', sa.Text(), nullable=False),
+            sa.Column('pages', sa.Text(), nullable=False),
+            sa.Column('page_count', sa.Integer(), nullable=True),
+            sa.Column('extracted_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('content_hash'),
+        )
+
+    if 'job_vector' not in tables:
+        op.create_table(
+            'job_vector',
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('content_version', sa.String(length=40), nullable=False),
+            sa.Column('model_version', sa.String(length=32), nullable=True),
+            sa.Column('normalized_text', sa.Text(), nullable=False),
+            sa.Column('vector', sa.LargeBinary(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['job_id'], ['Job.id']),
+            sa.PrimaryKeyConstraint('job_id'),
+        )
+
+    if 'job_skill' not in tables:
+        op.create_table(
+            'job_skill',
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('skill', sa.String(length=255), nullable=False),
+            sa.ForeignKeyConstraint(['job_id'], ['Job.id']),
+            sa.PrimaryKeyConstraint('job_id', 'skill'),
+        )
+        op.create_index('ix_job_skill_skill', 'job_skill', ['skill', 'job_id'], unique=False)
+
+
+def downgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'job_skill' in tables:
+        op.drop_index('ix_job_skill_skill', table_name='job_skill')
+        op.drop_table('job_skill')
+    for table in ('job_vector', 'resume_text'):
+        if table in tables:
+            op.drop_table(table)
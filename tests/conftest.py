@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+import pytest
+
+# app.py reads its configuration at import time
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+os.environ['RANKING_PRELOAD'] = '0'
+
+import app as smarthire  # noqa: E402
+
+MODEL_PATHS = ('TFIDF_MODEL_PATH', 'TFIDF_LOCK_PATH', 'JOB_VECTOR_LOCK_PATH',
+               'RANKING_INDEX_PATH', 'RANKING_JOURNAL_PATH', 'RANKING_LOCK_PATH')
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The Flask app on an empty database, with model files kept out of instance/."""
+    for name in MODEL_PATHS:
+        monkeypatch.setattr(smarthire, name, str(tmp_path / os.path.basename(getattr(smarthire, name))))
+    monkeypatch.setattr(smarthire, 'RESUME_VECTOR_FOLDER', str(tmp_path / 'resume_vectors'))
+    monkeypatch.setattr(smarthire, '_ranking_state', {'index': None, 'offset': 0})
+    monkeypatch.setattr(smarthire, '_counter_cache', {})
+    smarthire.app.config['TESTING'] = True
+    with smarthire.app.app_context():
+        smarthire.db.create_all()
+        yield smarthire.app
+        smarthire.db.session.remove()
+        smarthire.db.drop_all()
+
+
+@pytest.fixture
+def employer(app):
+    user = smarthire.User(username='employer', password='x', role='employer')
+    smarthire.db.session.add(user)
+    smarthire.db.session.flush()
+    employer = smarthire.Employer(user_id=user.id, fullname='Employer', email='employer@example.com', company='Acme')
+    smarthire.db.session.add(employer)
+    smarthire.db.session.commit()
+    return employer
+
+
+@pytest.fixture
+def employer_client(app, employer):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = employer.user_id
+        session['role'] = 'employer'
+    return client
+
+
+@pytest.fixture
+def blob_folder(tmp_path, monkeypatch):
+    """A scratch resume blob store instead of static/resume_blobs."""
+    folder = tmp_path / 'resume_blobs'
+    folder.mkdir()
+    monkeypatch.setattr(smarthire, 'RESUME_BLOB_FOLDER', str(folder))
+    return folder
@@ -0,0 +1,52 @@
+from sqlalchemy import text
+
+import app as smarthire
+
+
+def add_applicants(*names):
+    db = smarthire.db
+    for n, name in enumerate(names):
+        user = smarthire.User(username=f'applicant{n}', password='x', role='applicant')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(smarthire.Applicant(user_id=user.id, fullname=name, email=f'{name.split()[0].lower()}@example.com'))
+    db.session.commit()
+
+
+def admin_client(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['role'] = 'admin'
+    return client
+
+
+def test_prefix_search_is_case_insensitive_and_literal(app):
+    add_applicants('Ada Lovelace', 'adam Smith', 'Grace Hopper', 'Ad_min User', 'Adz%')
+    client = admin_client(app)
+
+    def names(q):
+        items = client.get('/api/admin/applicants', query_string={'q': q}).get_json()['items']
+        return sorted(item['fullname'] for item in items)
+
+    assert names('ADA') == ['Ada Lovelace', 'adam Smith']
+    assert names('grace@') == ['Grace Hopper']
+    assert names('ad_') == ['Ad_min User']
+    assert names('adz%') == ['Adz%']
+    assert names('zz') == []
+
+
+def test_prefix_search_uses_the_lower_indexes(app):
+    with app.test_request_context('/api/admin/applicants', query_string={'q': 'ada'}):
+        query, _, _, _ = smarthire.admin_listing('applicants')
+        statement = query.statement.compile(smarthire.db.engine, compile_kwargs={'literal_binds': True})
+        plan = " ".join(row[-1] for row in smarthire.db.session.execute(text(f"EXPLAIN QUERY PLAN {statement}")))
+
+    assert 'ix_applicant_fullname_lower' in plan and 'ix_applicant_email_lower' in plan
+    assert 'SCAN applicant' not in plan
+
+
+def test_prefix_upper_bound():
+    assert smarthire.prefix_upper_bound('ab') == 'ac'
+    assert smarthire.prefix_upper_bound('a\U0010ffff') == 'b'
+    assert smarthire.prefix_upper_bound('\U0010ffff') is None
@@ -0,0 +1,19 @@
+import app as smarthire
+
+
+def test_rescored_screening_updates_the_shortlist_count(employer):
+    db = smarthire.db
+    resume = smarthire.Resume(filename='resume.pdf', owner_name='Alice')
+    db.session.add(resume)
+    db.session.flush()
+    screening = smarthire.Screening(resume_id=resume.id, employer_id=employer.id, job_description_text='python',
+                                    match_score=smarthire.SHORTLIST_MIN_SCORE - 10)
+    db.session.add(screening)
+    db.session.commit()
+    assert smarthire.employer_counts(employer)['shortlisted'] == 0
+
+    # As screen_resume() does when it refreshes a stale screening in place
+    screening.match_score = smarthire.SHORTLIST_MIN_SCORE + 10
+    db.session.commit()
+
+    assert smarthire.employer_counts(employer)['shortlisted'] == 1
@@ -0,0 +1,62 @@
+import io
+import os
+
+import app as smarthire
+
+
+def store_resume(content=b'%PDF-1.4 resume'):
+    filename = smarthire.store_resume_blob(io.BytesIO(content), smarthire.RESUME_MAX_BYTES)
+    resume = smarthire.Resume(filename=filename, owner_name='Alice')
+    smarthire.db.session.add(resume)
+    smarthire.db.session.commit()
+    return resume
+
+
+def test_delete_resume_removes_its_screenings_and_file(employer, employer_client, blob_folder):
+    db = smarthire.db
+    resume = store_resume()
+    screening = smarthire.Screening(resume_id=resume.id, employer_id=employer.id, job_description_text='python')
+    db.session.add(screening)
+    db.session.flush()
+    done = smarthire.ScreeningTask(employer_id=employer.id, resume_id=resume.id, screening_id=screening.id, status='done')
+    queued = smarthire.ScreeningTask(employer_id=employer.id, resume_id=resume.id, status='queued')
+    db.session.add_all([done, queued])
+    db.session.commit()
+    resume_id, filepath = resume.id, blob_folder / resume.filename
+
+    response = employer_client.post(f'/delete_resume/{resume_id}')
+
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert db.session.get(smarthire.Resume, resume_id) is None
+    assert smarthire.Screening.query.count() == 0
+    assert smarthire.ResumeBlob.query.count() == 0
+    assert not filepath.exists()
+    assert (done.status, done.resume_id, done.screening_id) == ('done', None, None)
+    assert (queued.status, queued.resume_id) == ('failed', None)
+
+
+def test_released_file_is_kept_when_the_transaction_rolls_back(app, blob_folder):
+    resume = store_resume()
+    filepath = blob_folder / resume.filename
+
+    smarthire.release_resume_blob(resume.filename)
+    smarthire.db.session.delete(resume)
+    smarthire.db.session.flush()
+    assert filepath.exists()
+    smarthire.db.session.rollback()
+
+    assert filepath.exists()
+    assert smarthire.ResumeBlob.query.one().ref_count == 1
+    smarthire.db.session.commit()
+    assert filepath.exists()
+
+
+def test_file_released_and_stored_again_in_one_transaction_is_kept(app, blob_folder):
+    resume = store_resume()
+    smarthire.release_resume_blob(resume.filename)
+    resume.filename = smarthire.store_resume_blob(io.BytesIO(b'%PDF-1.4 resume'), smarthire.RESUME_MAX_BYTES)
+    smarthire.db.session.commit()
+
+    assert os.path.exists(blob_folder / resume.filename)
+    assert smarthire.ResumeBlob.query.one().ref_count == 1
@@ -0,0 +1,28 @@
+import random
+from collections import Counter
+
+import app as smarthire
+
+
+def build_index(n_documents, seed=7):
+    rng = random.Random(seed)
+    vocabulary = [f"w{n}" for n in range(400)]
+    index = smarthire.RankingIndex()
+    for resume_id in range(1, n_documents + 1):
+        words = rng.choices(vocabulary, weights=[1 / (rank + 1) for rank in range(len(vocabulary))], k=80)
+        index.add(resume_id, str(resume_id), Counter(words))
+    queries = [rng.sample(vocabulary, 40) for _ in range(10)]
+    return index, queries
+
+
+def test_pruned_top_k_matches_exhaustive_scoring():
+    index, queries = build_index(3000)
+    index.remove(5)  # Tombstoned documents are skipped either way
+    allowed = index.document_mask(range(1, 3001, 2))
+    for terms in queries:
+        for mask in (None, allowed):
+            exhaustive = index.top_k(terms, 20, mask, prune=False)
+            pruned = index.top_k(terms, 20, mask, prune=True)
+            assert [resume_id for resume_id, _ in pruned] == [resume_id for resume_id, _ in exhaustive]
+            assert [round(score, 9) for _, score in pruned] == [round(score, 9) for _, score in exhaustive]
+
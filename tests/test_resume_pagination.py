@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+import app as smarthire
+
+
+def add_screened_resumes(employer, count, uploaded_at=None):
+    db = smarthire.db
+    resumes = [smarthire.Resume(filename=f'resume_{n}.pdf', owner_name=f'Owner {n}') for n in range(count)]
+    if uploaded_at is not None:
+        for resume in resumes:
+            resume.uploaded_at = uploaded_at
+    db.session.add_all(resumes)
+    db.session.flush()
+    db.session.add_all(smarthire.Screening(resume_id=resume.id, employer_id=employer.id, job_description_text='python')
+                       for resume in resumes)
+    db.session.commit()
+    return [resume.id for resume in resumes]
+
+
+def collect_pages(client, limit, max_pages=20):
+    ids, after = [], None
+    for _ in range(max_pages):
+        params = {'limit': limit}
+        if after:
+            params['after'] = after
+        page = client.get('/api/employer/resumes', query_string=params).get_json()
+        ids += [item['id'] for item in page['items']]
+        after = page['next_cursor']
+        if after is None:
+            return ids
+    raise AssertionError(f"pagination did not end after {max_pages} pages: {ids}")
+
+
+def test_resumes_uploaded_in_the_same_second_page_once(employer, employer_client):
+    # Inserted together, so with a database-side now() they would share one stored second
+    resume_ids = add_screened_resumes(employer, 5)
+
+    assert sorted(collect_pages(employer_client, limit=2)) == sorted(resume_ids)
+
+
+def test_equal_upload_times_page_by_id(employer, employer_client):
+    resume_ids = add_screened_resumes(employer, 5, uploaded_at=datetime(2026, 1, 1, 10, 0, 0))
+
+    assert collect_pages(employer_client, limit=2) == sorted(resume_ids, reverse=True)
+
+
+def test_upload_time_defaults_to_microsecond_precision(employer):
+    add_screened_resumes(employer, 1)
+
+    stored = smarthire.db.session.execute(text("SELECT uploaded_at FROM resume")).scalar()
+    assert len(stored) == len('YYYY-MM-DD HH:MM:SS.ffffff')
@@ -0,0 +1,53 @@
+import hashlib
+
+import app as smarthire
+
+
+def add_applicant(username):
+    db = smarthire.db
+    user = smarthire.User(username=username, password='x', role='applicant')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(smarthire.Applicant(user_id=user.id, fullname=username, email=f'{username}@example.com'))
+    return user.id
+
+
+def add_resume(text, applicant_id=None):
+    db = smarthire.db
+    content_hash = hashlib.sha256(text.encode()).hexdigest()
+    db.session.add(smarthire.ResumeText(content_hash=content_hash, text=text, pages='[]', page_count=1))
+    resume = smarthire.Resume(filename=f'{content_hash}.pdf', owner_name=text.split()[0], applicant_id=applicant_id)
+    db.session.add(resume)
+    db.session.flush()
+    return resume.id
+
+
+def top_candidate_ids(client, job_id, **params):
+    response = client.get(f'/api/employer/jobs/{job_id}/top-candidates', query_string=params)
+    assert response.status_code == 200
+    return sorted(item['id'] for item in response.get_json()['items'])
+
+
+def test_top_candidates_only_rank_the_employers_resumes(employer, employer_client):
+    db = smarthire.db
+    job = smarthire.Job(title='Python Developer', company='Acme', description='python flask sql', employer_id=employer.id)
+    other_job = smarthire.Job(title='Python Developer', company='Acme', description='python flask', employer_id=employer.id)
+    db.session.add_all([job, other_job])
+    db.session.flush()
+
+    applicant_id = add_applicant('applied')
+    other_applicant_id = add_applicant('applied_elsewhere')
+    applied = add_resume('Alice python flask sql developer', applicant_id)
+    applied_elsewhere = add_resume('Bob python flask developer', other_applicant_id)
+    screened = add_resume('Carol python sql developer')
+    stranger = add_resume('Dave python flask sql developer')
+    db.session.add_all([
+        smarthire.Application(applicant_id=applicant_id, job_id=job.id, status='Submitted'),
+        smarthire.Application(applicant_id=other_applicant_id, job_id=other_job.id, status='Submitted'),
+        smarthire.Screening(resume_id=screened, employer_id=employer.id, job_description_text='python'),
+    ])
+    db.session.commit()
+
+    assert stranger not in top_candidate_ids(employer_client, job.id)
+    assert top_candidate_ids(employer_client, job.id) == sorted([applied, applied_elsewhere, screened])
+    assert top_candidate_ids(employer_client, job.id, scope='applied') == [applied]
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+import app as smarthire
+
+UPLOAD_BYTES = 40 * 1024 * 1024
+MAX_RSS_GROWTH_BYTES = 16 * 1024 * 1024
+
+
+def peak_rss_bytes():
+    with open('/proc/self/status') as f:
+        fields = dict(line.split(':', 1) for line in f if ':' in line)
+    return int(fields['VmHWM'].split()[0]) * 1024
+
+
+def reset_peak_rss():
+    # Linux: start the peak over from the current RSS
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pytest.skip("peak RSS cannot be reset on this platform")
+
+
+def test_large_upload_streams_to_disk_with_flat_memory(employer_client, blob_folder, tmp_path, monkeypatch):
+    monkeypatch.setattr(smarthire, 'RESUME_MAX_BYTES', 2 * UPLOAD_BYTES)
+    monkeypatch.setattr(smarthire, 'SCREENING_INLINE_WORKERS', 0)  # Only the upload is measured
+    upload_path = tmp_path / 'large.pdf'
+    chunk = b'\0' * (1024 * 1024)
+    with open(upload_path, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+        for _ in range(UPLOAD_BYTES // len(chunk)):
+            f.write(chunk)
+
+    reset_peak_rss()
+    before = peak_rss_bytes()
+    with open(upload_path, 'rb') as f:
+        response = employer_client.post('/upload_screening', data={
+            'resume_file': (f, 'large.pdf'), 'job_description': 'Python developer',
+        }, content_type='multipart/form-data')
+    growth = peak_rss_bytes() - before
+
+    assert response.status_code == 302
+    assert '/screenings/tasks/' in response.headers['Location']
+    assert [os.path.getsize(blob_folder / name) for name in os.listdir(blob_folder)] == [os.path.getsize(upload_path)]
+    assert growth < MAX_RSS_GROWTH_BYTES, f"peak RSS grew by {growth / 2 ** 20:.1f} MB"